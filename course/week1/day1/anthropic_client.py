@@ -1,35 +1,648 @@
 # anthropic_client.py
+import asyncio
+import contextvars
 import os
-from dataclasses import dataclass
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
 from dotenv import load_dotenv
-from anthropic import Anthropic, APIError
+from anthropic import Anthropic, AsyncAnthropic, APIError, DefaultHttpxClient, DefaultAsyncHttpxClient
+import httpx
+
+try:  # imported as course.week1.day1.anthropic_client
+    from .llm_metrics import LLMCall
+    from .resilience import (
+        CallStats, DeadlineExceeded, RetryPolicy, attempt_timeout, can_wait, remaining_s, retryable,
+    )
+    from .response_cache import ResponseCache, get_default_cache
+    from .tracing import current_span, span, start_span
+except ImportError:  # run from inside day1/
+    from llm_metrics import LLMCall
+    from resilience import CallStats, DeadlineExceeded, RetryPolicy, attempt_timeout, can_wait, remaining_s, retryable
+    from response_cache import ResponseCache, get_default_cache
+    from tracing import current_span, span, start_span
 
 # Load API key and settings from .env
 load_dotenv()
 
 DEFAULT_MODEL = os.getenv("CLAUDE_MODEL", "claude-3-5-sonnet-latest")
 
+# Connection pool settings for the shared SDK clients (one pool per api key/base url)
+POOL_MAX_CONNECTIONS = int(os.getenv("CLAUDE_POOL_MAX_CONNECTIONS", "20"))
+POOL_MAX_KEEPALIVE = int(os.getenv("CLAUDE_POOL_MAX_KEEPALIVE", "10"))
+POOL_KEEPALIVE_EXPIRY_S = float(os.getenv("CLAUDE_POOL_KEEPALIVE_EXPIRY_S", "30"))
+
+# Global cap on in-flight async Claude calls (per event loop)
+MAX_CONCURRENCY = int(os.getenv("CLAUDE_MAX_CONCURRENCY", "8"))
+
+# Registries: SDK clients keyed by (api_key, base_url), ClaudeClients by (api_key, model, base_url)
+_REGISTRY_LOCK = threading.Lock()
+_SDK_CLIENTS: Dict[Tuple[str, Optional[str]], Anthropic] = {}
+_CLIENTS: Dict[Tuple[str, str, Optional[str]], "ClaudeClient"] = {}
+_ASYNC_CLIENTS: Dict[Tuple[str, str, Optional[str]], "AsyncClaudeClient"] = {}
+
+# Hedged (duplicate) sync requests run here; the losing request finishes in the background
+_HEDGE_POOL = ThreadPoolExecutor(max_workers=POOL_MAX_CONNECTIONS, thread_name_prefix="claude-hedge")
+
+# Async SDK clients and semaphores are tied to the event loop that created them
+_ASYNC_SDK_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict]" = weakref.WeakKeyDictionary()
+_LIMITERS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=POOL_MAX_KEEPALIVE,
+        keepalive_expiry=POOL_KEEPALIVE_EXPIRY_S,
+    )
+
+
+def _pooled_sdk_client(api_key: str, base_url: Optional[str] = None) -> Anthropic:
+    """
+    Return the process-wide Anthropic SDK client for this key/base_url.
+    The underlying httpx pool keeps connections alive, so TLS handshakes
+    are paid once per connection instead of once per node call.
+    """
+    key = (api_key, base_url)
+    with _REGISTRY_LOCK:
+        sdk = _SDK_CLIENTS.get(key)
+        if sdk is None:
+            sdk = Anthropic(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=DefaultHttpxClient(limits=_pool_limits()),
+                max_retries=0,  # retries/backoff are ours (resilience.py)
+            )
+            _SDK_CLIENTS[key] = sdk
+        return sdk
+
+
+def _pooled_async_sdk_client(api_key: str, base_url: Optional[str] = None) -> AsyncAnthropic:
+    """Async twin of _pooled_sdk_client: one AsyncAnthropic per key/base_url per event loop."""
+    loop = asyncio.get_running_loop()
+    with _REGISTRY_LOCK:
+        per_loop = _ASYNC_SDK_CLIENTS.setdefault(loop, {})
+        sdk = per_loop.get((api_key, base_url))
+        if sdk is None:
+            sdk = AsyncAnthropic(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=DefaultAsyncHttpxClient(limits=_pool_limits()),
+                max_retries=0,
+            )
+            per_loop[(api_key, base_url)] = sdk
+        return sdk
+
+
+def _concurrency_limiter() -> asyncio.Semaphore:
+    """Semaphore shared by every AsyncClaudeClient on the running loop."""
+    loop = asyncio.get_running_loop()
+    with _REGISTRY_LOCK:
+        sem = _LIMITERS.get(loop)
+        if sem is None:
+            sem = _LIMITERS[loop] = asyncio.Semaphore(MAX_CONCURRENCY)
+        return sem
+
+
+def _text_of(msg) -> str:
+    # Anthropic returns a list of content blocks
+    return "".join([blk.text for blk in msg.content if hasattr(blk, "text")])
+
+
+def _failure(e: APIError) -> RuntimeError:
+    """Error to raise once retrying is over (callers catch RuntimeError)."""
+    left = remaining_s()
+    if left is not None and left <= 0:
+        return DeadlineExceeded(f"Claude call deadline exceeded: {e}")
+    return RuntimeError(f"Claude error: {e}")
+
+
+def _next_retry(policy: RetryPolicy, stats: CallStats, retry: int, e: APIError, sp) -> float:
+    """Backoff before retry number `retry`, or raise if the error is final. The retry is an event on span sp."""
+    if not retryable(e) or retry >= policy.max_retries:
+        raise _failure(e) from e
+    sleep = policy.backoff_s(retry, e)
+    if not can_wait(sleep):
+        raise DeadlineExceeded(f"Claude call deadline exceeded after {retry + 1} attempts: {e}") from e
+    stats.count("retries")
+    sp.add_event("retry", error=type(e).__name__, status=getattr(e, "status_code", None), backoff_s=round(sleep, 3))
+    return sleep
+
+
+def _wait_s(seconds: Optional[float]) -> Optional[float]:
+    """`seconds` (None = no limit), capped by what is left of the call deadline."""
+    left = remaining_s()
+    if left is None:
+        return seconds
+    return max(0.0, left if seconds is None else min(seconds, left))
+
+
+def _expired() -> bool:
+    left = remaining_s()
+    return left is not None and left <= 0
+
+
+def _llm_span_name(node: str) -> str:
+    return f"llm.{node}"
+
+
+class TextStream:
+    """
+    Iterator over Claude text deltas that records timing and the full text.
+
+    The request goes out on the first next(); ttft_s is measured from there
+    to the first non-empty delta. After the last delta, `text` holds the
+    whole answer and on_done(stream) runs once (callers use it to finish
+    their metrics / result dicts).
+    """
+
+    def __init__(self, chunks: Iterator[str], on_done: Optional[Callable[["TextStream"], None]] = None):
+        self._chunks = chunks
+        self._on_done = on_done
+        self._parts: List[str] = []
+        self.started_at: Optional[float] = None
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def __iter__(self) -> Iterator[str]:
+        self.started_at = time.perf_counter()
+        for chunk in self._chunks:
+            if chunk:
+                self._mark(chunk)
+                yield chunk
+        self._finish()
+
+    def _mark(self, chunk: str) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self._parts.append(chunk)
+
+    def _finish(self) -> None:
+        self.finished_at = time.perf_counter()
+        if self.first_token_at is None:
+            self.first_token_at = self.finished_at
+        if self._on_done is not None:
+            self._on_done(self)
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    @property
+    def ttft_s(self) -> Optional[float]:
+        if self.started_at is None or self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def stream_s(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+class AsyncTextStream(TextStream):
+    """TextStream over an async iterator of deltas: `async for chunk in stream`."""
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        self.started_at = time.perf_counter()
+        async for chunk in self._chunks:
+            if chunk:
+                self._mark(chunk)
+                yield chunk
+        self._finish()
+
+
 @dataclass
 class ClaudeClient:
     api_key: str = os.getenv("ANTHROPIC_API_KEY", "")
     model: str = DEFAULT_MODEL
+    base_url: Optional[str] = os.getenv("ANTHROPIC_BASE_URL") or None
+    cache: Optional[ResponseCache] = None
+    policy: RetryPolicy = field(default_factory=RetryPolicy)
+
+    def __post_init__(self):
+        if not self.api_key:
+            raise RuntimeError("ANTHROPIC_API_KEY not set")
+        self.client = _pooled_sdk_client(self.api_key, self.base_url)
+        self.call_stats = CallStats()
+
+    def json_call(
+        self,
+        system: str,
+        user: str,
+        max_tokens: int = 800,
+        temperature: float = 0.2,
+        use_cache: bool = True,
+        timeout_s: Optional[float] = None,
+        node: str = "other",
+    ):
+        """
+        Return Claude JSON-like content (string). Keep prompts schema-first.
+        Identical calls are served from self.cache when one is attached;
+        pass use_cache=False to force a fresh answer.
+
+        Retries, per-attempt timeout (timeout_s overrides the policy's),
+        deadline and hedging follow self.policy (resilience.py). Raises
+        RuntimeError when Claude can't answer, DeadlineExceeded (a
+        RuntimeError) when the call_deadline() runs out first.
+
+        Tokens, cost and latency are recorded under `node` (llm_metrics.py),
+        and the call is an llm.<node> span of the current trace (tracing.py).
+        """
+        call = LLMCall(node, self.model)
+        with span(_llm_span_name(node)) as sp:
+            try:
+                return self._json_call(call, system, user, max_tokens, temperature, use_cache, timeout_s)
+            finally:
+                call.finish("error")  # no-op once it has finished
+                sp.set_attributes(**call.span_attributes())
+
+    def _json_call(self, call, system, user, max_tokens, temperature, use_cache, timeout_s) -> str:
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = ResponseCache.make_key(self.model, system, user, max_tokens, temperature)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                call.finish("cached")
+                return cached
+
+        text = self._create(self._policy(timeout_s), {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "system": system,
+            "messages": [{"role": "user", "content": user}],
+            "temperature": temperature,
+        }, call)
+
+        if cache_key is not None:
+            self.cache.set(cache_key, text)
+        return text
+
+    def _policy(self, timeout_s: Optional[float]) -> RetryPolicy:
+        return self.policy if timeout_s is None else replace(self.policy, timeout_s=timeout_s)
+
+    def _create(self, policy: RetryPolicy, request: Dict[str, Any], call: LLMCall) -> str:
+        retry = 0
+        while True:
+            t0 = time.perf_counter()
+            self.call_stats.count("attempts")
+            try:
+                text = self._hedged(policy, request, call) if policy.hedge else self._attempt(policy, request, call)
+            except APIError as e:
+                time.sleep(_next_retry(policy, self.call_stats, retry, e, current_span()))
+                retry += 1
+                continue
+            self.call_stats.record(time.perf_counter() - t0)
+            call.finish()
+            return text
+
+    def _attempt(self, policy: RetryPolicy, request: Dict[str, Any], call: LLMCall) -> str:
+        call.attempt()
+        msg = self.client.messages.create(**request, timeout=attempt_timeout(policy))
+        call.add_usage(msg.usage)
+        return _text_of(msg)
+
+    def _hedged(self, policy: RetryPolicy, request: Dict[str, Any], call: LLMCall) -> str:
+        """
+        Send the request; if it hasn't answered after the hedge threshold,
+        send a duplicate and return whichever succeeds first.
+        """
+        # Attempts run on pool threads: copy the context so they see call_deadline() and the current span
+        primary = _HEDGE_POOL.submit(contextvars.copy_context().run, self._attempt, policy, request, call)
+        done, _ = wait([primary], timeout=_wait_s(self.call_stats.hedge_after_s(policy)))
+        if done:
+            return primary.result()
+        if _expired():
+            raise DeadlineExceeded("Claude call deadline exceeded before the hedge was sent")
+        self.call_stats.count("hedges")
+        current_span().add_event("hedge")
+        backup = _HEDGE_POOL.submit(contextvars.copy_context().run, self._attempt, policy, request, call)
+        pending, error = {primary, backup}, None
+        while pending:
+            done, pending = wait(pending, timeout=_wait_s(None), return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded("Claude call deadline exceeded while hedging")
+            for fut in done:
+                if fut.exception() is None:
+                    if fut is backup:
+                        self.call_stats.count("hedge_wins")
+                        current_span().add_event("hedge_won")
+                    return fut.result()
+                error = error or fut.exception()
+        raise error
+
+    def stream_call(
+        self,
+        system: str,
+        user: str,
+        max_tokens: int = 800,
+        temperature: float = 0.2,
+        use_cache: bool = True,
+        on_done: Optional[Callable[[TextStream], None]] = None,
+        node: str = "other",
+    ) -> TextStream:
+        """
+        Streaming json_call: returns a TextStream of text deltas as Claude
+        writes them. Same cache as json_call (a cached answer arrives as one
+        chunk; a completed stream is cached for both). The call is accounted
+        to the track_usage() blocks and the span active here, even if read
+        elsewhere.
+        """
+        call = LLMCall(node, self.model, stream=True)
+        chunks = self._stream_chunks(system, user, max_tokens, temperature, use_cache, call, current_span())
+        return TextStream(chunks, on_done)
+
+    def _stream_chunks(self, system, user, max_tokens, temperature, use_cache, call, parent) -> Iterator[str]:
+        call.restart()
+        sp = start_span(_llm_span_name(call.node), parent=parent, stream=True)
+        try:
+            yield from self._stream_attempts(system, user, max_tokens, temperature, use_cache, call, sp)
+        except Exception as e:
+            sp.record_exception(e)
+            raise
+        finally:
+            call.finish("error")  # no-op after a normal end
+            sp.set_attributes(**call.span_attributes())
+            sp.end()
+
+    def _stream_attempts(self, system, user, max_tokens, temperature, use_cache, call, sp) -> Iterator[str]:
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = ResponseCache.make_key(self.model, system, user, max_tokens, temperature)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                call.finish("cached")
+                yield cached
+                return
+
+        # Retried like json_call until the first delta arrives; after that a
+        # failure would duplicate text already shown, so it is raised. No hedging.
+        parts, retry = [], 0
+        while True:
+            self.call_stats.count("attempts")
+            call.attempt()
+            try:
+                with self.client.messages.stream(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    system=system,
+                    messages=[{"role": "user", "content": user}],
+                    temperature=temperature,
+                    timeout=attempt_timeout(self.policy),
+                ) as stream:
+                    for chunk in stream.text_stream:
+                        if not parts:
+                            sp.add_event("first_token")
+                        parts.append(chunk)
+                        yield chunk
+                    call.add_usage(stream.get_final_message().usage)
+                break
+            except APIError as e:
+                if parts:
+                    raise _failure(e) from e
+                time.sleep(_next_retry(self.policy, self.call_stats, retry, e, sp))
+                retry += 1
+        call.finish()
+
+        if cache_key is not None:
+            self.cache.set(cache_key, "".join(parts))
+
+
+@dataclass
+class AsyncClaudeClient:
+    """
+    asyncio-native ClaudeClient: `await client.json_call(...)`.
+    All instances on a loop share one connection pool and the
+    CLAUDE_MAX_CONCURRENCY semaphore, so fan-out never floods the API.
+    """
+    api_key: str = os.getenv("ANTHROPIC_API_KEY", "")
+    model: str = DEFAULT_MODEL
+    base_url: Optional[str] = os.getenv("ANTHROPIC_BASE_URL") or None
+    cache: Optional[ResponseCache] = None
+    policy: RetryPolicy = field(default_factory=RetryPolicy)
 
     def __post_init__(self):
         if not self.api_key:
             raise RuntimeError("ANTHROPIC_API_KEY not set")
-        self.client = Anthropic(api_key=self.api_key)
+        self.call_stats = CallStats()
+
+    @property
+    def client(self) -> AsyncAnthropic:
+        return _pooled_async_sdk_client(self.api_key, self.base_url)
+
+    async def json_call(
+        self,
+        system: str,
+        user: str,
+        max_tokens: int = 800,
+        temperature: float = 0.2,
+        use_cache: bool = True,
+        timeout_s: Optional[float] = None,
+        node: str = "other",
+    ):
+        """Async json_call; same contract (cache, retries, deadline, hedging, metrics, span) as ClaudeClient.json_call."""
+        call = LLMCall(node, self.model)
+        with span(_llm_span_name(node)) as sp:
+            try:
+                return await self._json_call(call, system, user, max_tokens, temperature, use_cache, timeout_s)
+            finally:
+                call.finish("error")
+                sp.set_attributes(**call.span_attributes())
+
+    async def _json_call(self, call, system, user, max_tokens, temperature, use_cache, timeout_s) -> str:
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = ResponseCache.make_key(self.model, system, user, max_tokens, temperature)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                call.finish("cached")
+                return cached
+
+        policy = self.policy if timeout_s is None else replace(self.policy, timeout_s=timeout_s)
+        text = await self._create(policy, {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "system": system,
+            "messages": [{"role": "user", "content": user}],
+            "temperature": temperature,
+        }, call)
 
-    def json_call(self, system: str, user: str, max_tokens: int = 800):
-        """Return Claude JSON-like content (string). Keep prompts schema-first."""
+        if cache_key is not None:
+            self.cache.set(cache_key, text)
+        return text
+
+    async def _create(self, policy: RetryPolicy, request: Dict[str, Any], call: LLMCall) -> str:
+        retry = 0
+        while True:
+            t0 = time.perf_counter()
+            self.call_stats.count("attempts")
+            try:
+                async with _concurrency_limiter():  # held per attempt, not while backing off
+                    text = await (self._hedged(policy, request, call) if policy.hedge
+                                  else self._attempt(policy, request, call))
+            except APIError as e:
+                await asyncio.sleep(_next_retry(policy, self.call_stats, retry, e, current_span()))
+                retry += 1
+                continue
+            self.call_stats.record(time.perf_counter() - t0)
+            call.finish()
+            return text
+
+    async def _attempt(self, policy: RetryPolicy, request: Dict[str, Any], call: LLMCall) -> str:
+        call.attempt()
+        msg = await self.client.messages.create(**request, timeout=attempt_timeout(policy))
+        call.add_usage(msg.usage)
+        return _text_of(msg)
+
+    async def _hedged(self, policy: RetryPolicy, request: Dict[str, Any], call: LLMCall) -> str:
+        """Async hedging: like ClaudeClient._hedged, but the losing request is cancelled."""
+        primary = asyncio.ensure_future(self._attempt(policy, request, call))
+        done, _ = await asyncio.wait({primary}, timeout=_wait_s(self.call_stats.hedge_after_s(policy)))
+        if done:
+            return primary.result()
+        if _expired():
+            primary.cancel()
+            raise DeadlineExceeded("Claude call deadline exceeded before the hedge was sent")
+        self.call_stats.count("hedges")
+        current_span().add_event("hedge")
+        backup = asyncio.ensure_future(self._attempt(policy, request, call))
+        pending, error = {primary, backup}, None
         try:
-            msg = self.client.messages.create(
-                model=self.model,
-                max_tokens=max_tokens,
-                system=system,
-                messages=[{"role": "user", "content": user}],
-                temperature=0.2,
-            )
-            # Anthropic returns a list of content blocks
-            return "".join([blk.text for blk in msg.content if hasattr(blk, "text")])
-        except APIError as e:
-            raise RuntimeError(f"Claude error: {e}") from e
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=_wait_s(None),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise DeadlineExceeded("Claude call deadline exceeded while hedging")
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.call_stats.count("hedge_wins")
+                            current_span().add_event("hedge_won")
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stream_call(
+        self,
+        system: str,
+        user: str,
+        max_tokens: int = 800,
+        temperature: float = 0.2,
+        use_cache: bool = True,
+        on_done: Optional[Callable[[TextStream], None]] = None,
+        node: str = "other",
+    ) -> AsyncTextStream:
+        """Async stream_call: `async for chunk in client.stream_call(...)` (holds the concurrency slot while streaming)."""
+        call = LLMCall(node, self.model, stream=True)
+        chunks = self._stream_chunks(system, user, max_tokens, temperature, use_cache, call, current_span())
+        return AsyncTextStream(chunks, on_done)
+
+    async def _stream_chunks(self, system, user, max_tokens, temperature, use_cache, call, parent) -> AsyncIterator[str]:
+        call.restart()
+        sp = start_span(_llm_span_name(call.node), parent=parent, stream=True)
+        try:
+            async for chunk in self._stream_attempts(system, user, max_tokens, temperature, use_cache, call, sp):
+                yield chunk
+        except Exception as e:
+            sp.record_exception(e)
+            raise
+        finally:
+            call.finish("error")
+            sp.set_attributes(**call.span_attributes())
+            sp.end()
+
+    async def _stream_attempts(self, system, user, max_tokens, temperature, use_cache, call, sp) -> AsyncIterator[str]:
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = ResponseCache.make_key(self.model, system, user, max_tokens, temperature)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                call.finish("cached")
+                yield cached
+                return
+
+        parts, retry = [], 0
+        while True:
+            self.call_stats.count("attempts")
+            call.attempt()
+            try:
+                async with _concurrency_limiter():
+                    async with self.client.messages.stream(
+                        model=self.model,
+                        max_tokens=max_tokens,
+                        system=system,
+                        messages=[{"role": "user", "content": user}],
+                        temperature=temperature,
+                        timeout=attempt_timeout(self.policy),
+                    ) as stream:
+                        async for chunk in stream.text_stream:
+                            if not parts:
+                                sp.add_event("first_token")
+                            parts.append(chunk)
+                            yield chunk
+                        call.add_usage((await stream.get_final_message()).usage)
+                break
+            except APIError as e:
+                if parts:  # see ClaudeClient._stream_chunks
+                    raise _failure(e) from e
+                await asyncio.sleep(_next_retry(self.policy, self.call_stats, retry, e, sp))
+                retry += 1
+        call.finish()
+
+        if cache_key is not None:
+            self.cache.set(cache_key, "".join(parts))
+
+
+def get_client(model: Optional[str] = None, api_key: Optional[str] = None) -> ClaudeClient:
+    """
+    Shared, thread-safe ClaudeClient for nodes. Use this instead of ClaudeClient()
+    on hot paths so every node call reuses the same keep-alive connection pool.
+    The response cache from .env (CLAUDE_CACHE=1) is attached when enabled.
+    """
+    api_key = api_key or os.getenv("ANTHROPIC_API_KEY", "")
+    model = model or DEFAULT_MODEL
+    base_url = os.getenv("ANTHROPIC_BASE_URL") or None
+    key = (api_key, model, base_url)
+    with _REGISTRY_LOCK:
+        client = _CLIENTS.get(key)
+    if client is None:
+        client = ClaudeClient(api_key=api_key, model=model, base_url=base_url, cache=get_default_cache())
+        with _REGISTRY_LOCK:
+            client = _CLIENTS.setdefault(key, client)
+    return client
+
+
+def get_async_client(model: Optional[str] = None, api_key: Optional[str] = None) -> AsyncClaudeClient:
+    """Shared AsyncClaudeClient for async nodes (see get_client)."""
+    api_key = api_key or os.getenv("ANTHROPIC_API_KEY", "")
+    model = model or DEFAULT_MODEL
+    base_url = os.getenv("ANTHROPIC_BASE_URL") or None
+    key = (api_key, model, base_url)
+    with _REGISTRY_LOCK:
+        client = _ASYNC_CLIENTS.get(key)
+    if client is None:
+        client = AsyncClaudeClient(api_key=api_key, model=model, base_url=base_url, cache=get_default_cache())
+        with _REGISTRY_LOCK:
+            client = _ASYNC_CLIENTS.setdefault(key, client)
+    return client
+
+
+def reset_clients() -> None:
+    """Close pooled connections and empty the registries (tests/benchmarks)."""
+    with _REGISTRY_LOCK:
+        for sdk in _SDK_CLIENTS.values():
+            sdk.close()
+        _SDK_CLIENTS.clear()
+        _CLIENTS.clear()
+        # Async pools are closed with their event loop; just forget them here
+        _ASYNC_SDK_CLIENTS.clear()
+        _ASYNC_CLIENTS.clear()
+        _LIMITERS.clear()
@@ -0,0 +1,84 @@
+# bench_client_pool.py
+"""
+Micro-benchmark: per-call overhead of a fresh Anthropic client per node call
+vs. the shared pooled client from anthropic_client.get_client().
+
+Runs against a local stub server (no API key or network needed).
+
+Run:
+  python course/week1/day1/bench_client_pool.py --calls 200
+"""
+import argparse
+import os
+import statistics
+import time
+
+from anthropic import Anthropic
+
+from fake_anthropic_server import FakeAnthropicServer
+from anthropic_client import DEFAULT_MODEL, get_client, reset_clients
+
+SYSTEM = "You are a strict JSON generator. Only output valid JSON."
+USER = 'Return {"ok": true}'
+
+
+def _fresh_call(base_url: str) -> str:
+    """Old behaviour: every call builds its own SDK client + connection pool."""
+    sdk = Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"], base_url=base_url)
+    try:
+        msg = sdk.messages.create(
+            model=DEFAULT_MODEL,
+            max_tokens=50,
+            system=SYSTEM,
+            messages=[{"role": "user", "content": USER}],
+            temperature=0.2,
+        )
+        return "".join([blk.text for blk in msg.content if hasattr(blk, "text")])
+    finally:
+        sdk.close()
+
+
+def _pooled_call(base_url: str) -> str:
+    return get_client().json_call(SYSTEM, USER, max_tokens=50)
+
+
+def _time_calls(fn, base_url: str, n: int) -> list:
+    fn(base_url)  # warm-up (imports, first connection)
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn(base_url)
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+def _report(label: str, samples: list) -> None:
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[int(0.95 * (len(ms) - 1))]
+    print(f"{label:<22} mean={statistics.mean(ms):7.3f} ms  p50={statistics.median(ms):7.3f} ms  p95={p95:7.3f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Fresh vs pooled Claude client overhead.")
+    ap.add_argument("--calls", type=int, default=200, help="Calls per variant.")
+    args = ap.parse_args()
+
+    os.environ.setdefault("ANTHROPIC_API_KEY", "bench-key")
+    with FakeAnthropicServer() as srv:
+        os.environ["ANTHROPIC_BASE_URL"] = srv.base_url
+        reset_clients()
+
+        fresh = _time_calls(_fresh_call, srv.base_url, args.calls)
+        pooled = _time_calls(_pooled_call, srv.base_url, args.calls)
+
+        print(f"\nStub server: {srv.base_url}  ({srv.requests} requests served)\n")
+        _report("fresh client per call", fresh)
+        _report("pooled get_client()", pooled)
+        saved = statistics.mean(fresh) - statistics.mean(pooled)
+        print(f"\nSaved per call: {saved * 1000:.3f} ms "
+              f"(x3 per router -> BI flow: {saved * 3000:.3f} ms)")
+        reset_clients()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# check_claude_resilience.py
+"""
+Check ClaudeClient retries, timeouts, deadlines and hedging (resilience.py)
+against the local stub server with injected errors and slow replies:
+
+- 529 overloaded on the first attempts -> retried with backoff, then answers
+- 400 -> fails at once, no retry
+- a reply slower than the per-attempt timeout -> timed out and retried
+- call_deadline() -> gives up when the budget is spent instead of retrying,
+  also when the call is hedged
+- streaming -> an error before the first delta is retried
+- async client -> same retry behaviour
+- tail latency with 5% slow replies: hedging off vs on (p50/p95/p99)
+
+Exits nonzero on any failure. No API key or network needed.
+
+Run:
+  python course/week1/day1/check_claude_resilience.py --calls 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from fake_anthropic_server import FakeAnthropicServer
+from anthropic_client import AsyncClaudeClient, ClaudeClient
+from resilience import DeadlineExceeded, RetryPolicy, call_deadline
+
+SYSTEM = "You are a strict JSON generator. Only output valid JSON."
+USER = 'Return {"ok": true}'
+REPLY = '{"ok": true}'
+FAST = dict(backoff_base_s=0.02, backoff_max_s=0.1)  # keep the check quick
+
+
+def _client(srv, cls=ClaudeClient, **policy) -> ClaudeClient:
+    return cls(api_key="check-key", base_url=srv.base_url, policy=RetryPolicy(**{**FAST, **policy}))
+
+
+def _raises(fn, exc=RuntimeError) -> bool:
+    try:
+        fn()
+    except exc:
+        return True
+    return False
+
+
+def _percentiles(samples: list) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    pick = lambda q: ms[min(len(ms) - 1, int(q * len(ms)))]  # noqa: E731
+    return f"p50={pick(0.50):6.1f} ms  p95={pick(0.95):6.1f} ms  p99={pick(0.99):6.1f} ms"
+
+
+def _tail(calls: int, hedge: bool) -> tuple:
+    """Latencies of `calls` sequential json_calls with 5% of replies 20x slower."""
+    with FakeAnthropicServer(reply_text=REPLY, delay_s=0.01, slow_rate=0.05, slow_s=0.2, seed=11) as srv:
+        claude = _client(srv, hedge=hedge, hedge_after_s=0.05, hedge_min_samples=20)
+        out = []
+        for _ in range(calls):
+            t0 = time.perf_counter()
+            claude.json_call(SYSTEM, USER, max_tokens=50)
+            out.append(time.perf_counter() - t0)
+        return out, srv.requests, claude.call_stats.snapshot()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check Claude client retries, deadlines and hedging.")
+    ap.add_argument("--calls", type=int, default=200, help="Calls per tail-latency run.")
+    args = ap.parse_args()
+    checks = []
+
+    with FakeAnthropicServer(reply_text=REPLY, fail_first=2) as srv:
+        claude = _client(srv, max_retries=2)
+        ok = claude.json_call(SYSTEM, USER) == REPLY
+        checks.append((f"two 529s then success -> answered after {srv.requests} attempts", ok and srv.requests == 3))
+        checks.append(("retries counted", claude.call_stats.counters["retries"] == 2))
+
+    with FakeAnthropicServer(reply_text=REPLY, fail_first=5) as srv:
+        failed = _raises(lambda: _client(srv, max_retries=2).json_call(SYSTEM, USER))
+        checks.append((f"still failing after max_retries=2 -> RuntimeError ({srv.requests} attempts)",
+                       failed and srv.requests == 3))
+
+    with FakeAnthropicServer(reply_text=REPLY, fail_first=1, error_status=400) as srv:
+        failed = _raises(lambda: _client(srv).json_call(SYSTEM, USER))
+        checks.append((f"400 is not retried ({srv.requests} attempt)", failed and srv.requests == 1))
+
+    with FakeAnthropicServer(reply_text=REPLY, slow_rate=1.0, slow_s=0.5) as srv:
+        t0 = time.perf_counter()
+        failed = _raises(lambda: _client(srv, timeout_s=0.1, max_retries=1).json_call(SYSTEM, USER))
+        took = time.perf_counter() - t0
+        checks.append((f"slow replies time out per attempt and are retried ({srv.requests} attempts, {took:.2f} s)",
+                       failed and srv.requests == 2 and took < 0.45))
+
+    with FakeAnthropicServer(reply_text=REPLY, error_rate=1.0) as srv:
+        claude = _client(srv, max_retries=50, backoff_base_s=0.1, backoff_max_s=0.1)
+        t0 = time.perf_counter()
+        with call_deadline(0.3):
+            expired = _raises(lambda: claude.json_call(SYSTEM, USER), DeadlineExceeded)
+        took = time.perf_counter() - t0
+        checks.append((f"call_deadline(0.3) stops the retries -> DeadlineExceeded after {took:.2f} s",
+                       expired and took < 0.4))
+
+    with FakeAnthropicServer(reply_text=REPLY, slow_rate=1.0, slow_s=1.0) as srv:
+        t0 = time.perf_counter()
+        with call_deadline(0.2):
+            expired = _raises(lambda: _client(srv).json_call(SYSTEM, USER))
+        took = time.perf_counter() - t0
+        checks.append((f"deadline caps a single slow attempt ({took:.2f} s)", expired and took < 0.4))
+
+    with FakeAnthropicServer(reply_text=REPLY, delay_s=1.0) as srv:
+        t0 = time.perf_counter()
+        with call_deadline(0.3):
+            expired = _raises(lambda: _client(srv, hedge=True, hedge_after_s=0.05).json_call(SYSTEM, USER),
+                              DeadlineExceeded)
+        took = time.perf_counter() - t0
+        checks.append((f"hedged call keeps the deadline -> DeadlineExceeded after {took:.2f} s",
+                       expired and took < 0.45))
+
+    with FakeAnthropicServer(reply_text=REPLY, delay_s=1.0) as srv:
+        t0 = time.perf_counter()
+        with call_deadline(0.3):
+            expired = _raises(lambda: asyncio.run(
+                _client(srv, AsyncClaudeClient, hedge=True, hedge_after_s=0.05).json_call(SYSTEM, USER)),
+                DeadlineExceeded)
+        took = time.perf_counter() - t0
+        checks.append((f"async hedged call keeps the deadline ({took:.2f} s)", expired and took < 0.45))
+
+    with FakeAnthropicServer(reply_text="Segment 3 leads on p1.", fail_first=1) as srv:
+        text = "".join(_client(srv).stream_call(SYSTEM, USER))
+        checks.append((f"stream error before the first delta is retried ({srv.requests} attempts)",
+                       text == "Segment 3 leads on p1." and srv.requests == 2))
+
+    with FakeAnthropicServer(reply_text=REPLY, fail_first=2) as srv:
+        claude = _client(srv, AsyncClaudeClient, max_retries=2)
+        ok = asyncio.run(claude.json_call(SYSTEM, USER)) == REPLY
+        checks.append((f"async: two 529s then success ({srv.requests} attempts)", ok and srv.requests == 3))
+
+    with FakeAnthropicServer(reply_text=REPLY, delay_s=0.01, slow_rate=0.5, slow_s=0.3, seed=3) as srv:
+        claude = _client(srv, AsyncClaudeClient, hedge=True, hedge_after_s=0.05)
+
+        async def _calls():
+            return [await claude.json_call(SYSTEM, USER) for _ in range(10)]
+
+        ok = all(r == REPLY for r in asyncio.run(_calls()))
+        stats = claude.call_stats.snapshot()
+        checks.append((f"async hedging answers slow calls from the backup ({stats})",
+                       ok and stats.get("hedge_wins", 0) > 0))
+
+    plain, plain_requests, _ = _tail(args.calls, hedge=False)
+    hedged, hedged_requests, stats = _tail(args.calls, hedge=True)
+    p99 = lambda xs: sorted(xs)[min(len(xs) - 1, int(0.99 * len(xs)))]  # noqa: E731
+    checks.append(("hedging cuts p99 latency", p99(hedged) < p99(plain)))
+
+    failures = 0
+    for label, ok in checks:
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {label}")
+    print(f"→ no hedge  {_percentiles(plain)}  requests={plain_requests}")
+    print(f"→ hedged    {_percentiles(hedged)}  requests={hedged_requests}  "
+          f"(+{(hedged_requests - plain_requests) / plain_requests:.0%})  {stats}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("ANTHROPIC_API_KEY", "check-key")
+    main()
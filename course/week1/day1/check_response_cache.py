@@ -0,0 +1,129 @@
+# check_response_cache.py
+"""
+Check the Claude response cache (response_cache.py):
+
+- TTL: an entry is served until ttl_s, then missed and dropped
+- LRU: the memory tier keeps max_entries, evicting the least recently used
+- SQLite tier: a fresh cache on the same file (a restarted process) is
+  answered from disk, expired rows are not served, and the file is trimmed
+  to max_disk_entries
+- ClaudeClient: a repeated json_call / stream_call is answered from the
+  cache without a request; use_cache=False always asks Claude; with
+  CLAUDE_CACHE off get_default_cache() gives no cache at all
+
+Claude is the local stub server; the SQLite file is a throwaway temp file.
+Exits nonzero on any failure. No API key needed.
+
+Run:
+  python course/week1/day1/check_response_cache.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from fake_anthropic_server import FakeAnthropicServer
+from anthropic_client import ClaudeClient
+from response_cache import ResponseCache, get_default_cache
+
+SYSTEM = "You are a strict JSON generator. Only output valid JSON."
+USER = 'Return {"ok": true}'
+REPLY = '{"ok": true}'
+
+
+def _disk_rows(path: str) -> int:
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def check_ttl() -> list:
+    cache = ResponseCache(ttl_s=0.2)
+    cache.set("k", "v")
+    fresh = cache.get("k") == "v"
+    time.sleep(0.3)
+    expired = cache.get("k") is None
+    stats = cache.stats()
+    return [
+        ("served before ttl_s", fresh),
+        ("missed after ttl_s, and dropped from memory",
+         expired and stats["misses"] == 1 and stats["memory_entries"] == 0),
+    ]
+
+
+def check_lru() -> list:
+    cache = ResponseCache(max_entries=3)
+    for k in ("a", "b", "c"):
+        cache.set(k, k.upper())
+    cache.get("a")  # now most recently used; "b" is the oldest
+    cache.set("d", "D")
+    kept = {k: cache.get(k) for k in ("a", "b", "c", "d")}
+    stats = cache.stats()
+    return [
+        (f"max_entries=3: least recently used evicted ({sorted(k for k, v in kept.items() if v)} kept)",
+         kept == {"a": "A", "b": None, "c": "C", "d": "D"}),
+        ("evictions counted", stats["evictions"] == 1 and stats["memory_entries"] == 3),
+    ]
+
+
+def check_sqlite(folder: str) -> list:
+    path = os.path.join(folder, "cache.db")
+    ResponseCache(path=path).set("k", "v")
+    restarted = ResponseCache(path=path)
+    from_disk = restarted.get("k") == "v"
+    from_memory = restarted.get("k") == "v"
+    stats = restarted.stats()
+    checks = [(f"a restarted cache answers from disk, then memory (disk_hits={stats['disk_hits']}, "
+               f"memory_hits={stats['memory_hits']})",
+               from_disk and from_memory and stats["disk_hits"] == 1 and stats["memory_hits"] == 1)]
+
+    short = os.path.join(folder, "short.db")
+    ResponseCache(path=short, ttl_s=0.2).set("k", "v")
+    time.sleep(0.3)
+    expired = ResponseCache(path=short, ttl_s=0.2).get("k") is None
+    checks.append(("expired rows are not served from disk, and deleted", expired and _disk_rows(short) == 0))
+
+    trimmed = os.path.join(folder, "trimmed.db")
+    cache = ResponseCache(path=trimmed, max_entries=10, max_disk_entries=50)
+    for i in range(100):  # the 100th write trims the file
+        cache.set(f"k{i}", f"v{i}")
+    rows = _disk_rows(trimmed)
+    newest = ResponseCache(path=trimmed).get("k99") == "v99"
+    checks.append((f"disk tier trimmed to max_disk_entries=50 ({rows} rows), newest kept", rows == 50 and newest))
+    return checks
+
+
+def check_client() -> list:
+    with FakeAnthropicServer(reply_text=REPLY) as srv:
+        claude = ClaudeClient(api_key="check-key", base_url=srv.base_url, cache=ResponseCache())
+        first = claude.json_call(SYSTEM, USER)
+        again = claude.json_call(SYSTEM, USER)
+        cached = srv.requests == 1 and first == again == REPLY
+        streamed = "".join(claude.stream_call(SYSTEM, USER)) == REPLY and srv.requests == 1
+
+        fresh = claude.json_call(SYSTEM, USER, use_cache=False) == REPLY
+        fresh &= "".join(claude.stream_call(SYSTEM, USER, use_cache=False)) == REPLY
+        bypassed = fresh and srv.requests == 3
+
+    os.environ.pop("CLAUDE_CACHE", None)  # whatever .env says
+    return [
+        ("repeated json_call answered from the cache (1 request)", cached),
+        ("stream_call of a cached answer makes no request", streamed),
+        (f"use_cache=False always asks Claude ({srv.requests} requests)", bypassed),
+        ("CLAUDE_CACHE unset -> no default cache", get_default_cache() is None),
+    ]
+
+
+def main():
+    folder = tempfile.mkdtemp(prefix="response_cache_check_")
+    checks = check_ttl() + check_lru() + check_sqlite(folder) + check_client()
+
+    failures = 0
+    for label, ok in checks:
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {label}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# fake_anthropic_server.py
+"""
+Local stand-in for the Anthropic Messages API (POST /v1/messages).
+Used by the benchmarks so we can measure client overhead without network noise
+or API spend. delay_s adds a fixed server-side wait per message, to stand in
+for model latency when benchmarking pipelines around the calls.
+
+Requests with "stream": true get the Messages streaming (SSE) event
+sequence, reply_text split into word-sized deltas; delay_s is the time to
+the first delta and token_delay_s the gap between deltas. Non-streaming
+replies wait for the same total generation time before answering.
+Reported usage is ~4 characters per token of the prompt and the reply.
+
+Fault injection (for the retry/hedging checks): the first `fail_first`
+requests, then a random `error_rate` share of the rest, get an
+Anthropic-style error with `error_status` (529 overloaded by default);
+a random `slow_rate` share waits an extra `slow_s` before answering (a
+latency tail). `seed` makes the draws repeatable. `errors` counts the
+injected errors.
+
+Usage:
+    from fake_anthropic_server import FakeAnthropicServer
+    with FakeAnthropicServer(reply_text='{"ok": true}') as srv:
+        os.environ["ANTHROPIC_BASE_URL"] = srv.base_url
+        ...
+"""
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _input_tokens(req: dict) -> int:
+    """Rough prompt size (~4 chars per token) so usage differs between prompts."""
+    chars = len(str(req.get("system", ""))) + sum(len(str(m.get("content", ""))) for m in req.get("messages", []))
+    return max(1, chars // 4)
+
+
+def _message_body(text: str, model: str, input_tokens: int = 10) -> bytes:
+    return json.dumps({
+        "id": "msg_fake",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": input_tokens, "output_tokens": max(1, len(text) // 4)},
+    }).encode("utf-8")
+
+
+_ERROR_TYPES = {400: "invalid_request_error", 401: "authentication_error", 404: "not_found_error",
+                429: "rate_limit_error", 500: "api_error", 529: "overloaded_error"}
+
+
+def _error_body(status: int) -> bytes:
+    kind = _ERROR_TYPES.get(status, "api_error")
+    return json.dumps({"type": "error", "error": {"type": kind, "message": f"injected {kind}"}}).encode("utf-8")
+
+
+def _words(text: str) -> list:
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+def _stream_events(text: str, model: str, input_tokens: int = 10):
+    """(is_delta, event bytes) for one text block, as the Messages API streams it; deltas are word-sized."""
+    yield False, _sse("message_start", {"type": "message_start", "message": {
+        "id": "msg_fake", "type": "message", "role": "assistant", "model": model, "content": [],
+        "stop_reason": None, "stop_sequence": None, "usage": {"input_tokens": input_tokens, "output_tokens": 1},
+    }})
+    yield False, _sse("content_block_start", {"type": "content_block_start", "index": 0,
+                                              "content_block": {"type": "text", "text": ""}})
+    for word in _words(text):
+        yield True, _sse("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                 "delta": {"type": "text_delta", "text": word}})
+    yield False, _sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+    yield False, _sse("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                        "usage": {"output_tokens": max(1, len(text) // 4)}})
+    yield False, _sse("message_stop", {"type": "message_stop"})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive between calls
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        req = json.loads(self.rfile.read(length) or b"{}")
+        fail, extra_s = self.server.draw()
+        if fail:
+            self._error(self.server.error_status)
+            return
+        if self.server.delay_s or extra_s:
+            time.sleep(self.server.delay_s + extra_s)
+        if req.get("stream"):
+            self._stream(req)
+            return
+        if self.server.token_delay_s:  # same generation time as the streamed reply
+            time.sleep(self.server.token_delay_s * max(0, len(_words(self.server.reply_text)) - 1))
+        body = _message_body(self.server.reply_text, req.get("model", "fake"), _input_tokens(req))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int) -> None:
+        body = _error_body(status)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, req: dict) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        first = True
+        for is_delta, event in _stream_events(self.server.reply_text, req.get("model", "fake"), _input_tokens(req)):
+            if is_delta:
+                if not first and self.server.token_delay_s:
+                    time.sleep(self.server.token_delay_s)
+                first = False
+            self.wfile.write(f"{len(event):x}\r\n".encode("ascii") + event + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):  # keep benchmark output clean
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def draw(self):
+        """Count a request and decide its fate: (inject an error?, extra delay in seconds)."""
+        with self.lock:
+            self.requests += 1
+            fail = self.requests <= self.fail_first or self.rng.random() < self.error_rate
+            self.errors += fail
+            slow = not fail and self.rng.random() < self.slow_rate
+        return fail, self.slow_s if slow else 0.0
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on purpose (timeouts, hedged duplicates); only report real failures
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeAnthropicServer:
+    """Threaded local HTTP server that answers every message with reply_text."""
+
+    def __init__(self, reply_text: str = '{"ok": true}', host: str = "127.0.0.1", port: int = 0,
+                 delay_s: float = 0.0, token_delay_s: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 529, fail_first: int = 0, slow_rate: float = 0.0, slow_s: float = 0.0,
+                 seed: int = None):
+        self.httpd = _Server((host, port), _Handler)
+        self.httpd.reply_text = reply_text
+        self.httpd.requests = 0
+        self.httpd.errors = 0
+        self.httpd.delay_s = delay_s
+        self.httpd.token_delay_s = token_delay_s
+        self.httpd.error_rate = error_rate
+        self.httpd.error_status = error_status
+        self.httpd.fail_first = fail_first
+        self.httpd.slow_rate = slow_rate
+        self.httpd.slow_s = slow_s
+        self.httpd.rng = random.Random(seed)
+        self.httpd.lock = threading.Lock()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self) -> int:
+        return self.httpd.requests
+
+    @property
+    def errors(self) -> int:
+        return self.httpd.errors
+
+    def start(self) -> "FakeAnthropicServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,327 @@
+# llm_metrics.py
+"""
+Token, cost and latency accounting for every Claude call.
+
+ClaudeClient / AsyncClaudeClient record each json_call / stream_call here,
+tagged with the calling node (`json_call(..., node="router")`) and the
+model, using the `usage` block of the Messages response:
+
+- REGISTRY: process-wide counters and a latency histogram, labelled by
+  node and model - export with REGISTRY.to_json() or REGISTRY.to_prometheus()
+  (text exposition format, e.g. for a /metrics endpoint):
+    claude_calls_total{node,model,outcome}   outcome = ok | cached | error
+    claude_attempts_total{node,model}        incl. retries and hedges
+    claude_input_tokens_total{node,model}
+    claude_output_tokens_total{node,model}
+    claude_cost_usd_total{node,model}
+    claude_call_latency_seconds{node,model}  histogram
+- Per request: `with track_usage() as usage:` collects every call made
+  inside the block (any depth, threads started by LangGraph, asyncio tasks -
+  it is a contextvar); usage.summary() is the breakdown by node that
+  exec_bi and the router attach to their results as "llm_usage". A caller
+  that joined someone else's run (single_flight.py) gets shared_usage()
+  instead: zero calls of its own, the run's breakdown under "shared" - so
+  summing llm_usage over requests counts each Claude call once.
+
+Tokens of a hedged duplicate are counted too (they are billed); a
+cancelled async duplicate reports none, so its cost is missed.
+
+Cost uses list prices in USD per million tokens (PRICES, matched by model
+prefix); set CLAUDE_PRICES='{"my-model": [input, output]}' to add or
+override. Unknown models cost 0.
+
+Run (prints the prices used):
+  python course/week1/day1/llm_metrics.py --model claude-3-5-sonnet-latest
+
+Settings (.env): CLAUDE_PRICES
+"""
+import argparse
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# USD per million (input, output) tokens; longest matching prefix wins
+PRICES: Dict[str, Tuple[float, float]] = {
+    "claude-3-haiku": (0.25, 1.25),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-haiku-4": (1.00, 5.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-7-sonnet": (3.00, 15.00),
+    "claude-sonnet-4": (3.00, 15.00),
+    "claude-3-opus": (15.00, 75.00),
+    "claude-opus-4": (15.00, 75.00),
+    "claude-opus-4-5": (5.00, 25.00),
+}
+PRICES.update({k: tuple(v) for k, v in json.loads(os.getenv("CLAUDE_PRICES", "{}")).items()})
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_HELP = {
+    "claude_calls_total": "Claude calls by outcome (ok, cached, error).",
+    "claude_attempts_total": "HTTP attempts made for Claude calls, incl. retries and hedges.",
+    "claude_input_tokens_total": "Input tokens billed.",
+    "claude_output_tokens_total": "Output tokens billed.",
+    "claude_cost_usd_total": "Estimated cost in USD at list prices.",
+    "claude_call_latency_seconds": "Claude call latency, incl. retries (cached calls excluded).",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def price_of(model: str) -> Tuple[float, float]:
+    """(input, output) USD per million tokens for `model`; (0, 0) if unknown."""
+    best = max((p for p in PRICES if model.startswith(p)), key=len, default=None)
+    return PRICES[best] if best else (0.0, 0.0)
+
+
+def cost_usd(model: str, input_tokens: int, output_tokens: int) -> float:
+    price_in, price_out = price_of(model)
+    return (input_tokens * price_in + output_tokens * price_out) / 1_000_000
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms with string labels (Prometheus data model, no dependency)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = defaultdict(lambda: defaultdict(float))
+        self._histograms: Dict[str, Dict[Labels, List[float]]] = defaultdict(dict)  # bucket counts + [sum, count]
+
+    @staticmethod
+    def _labels(labels: Dict[str, str]) -> Labels:
+        return tuple(sorted(labels.items()))
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        with self._lock:
+            self._counters[name][self._labels(labels)] += value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = self._labels(labels)
+        with self._lock:
+            hist = self._histograms[name].get(key)
+            if hist is None:
+                hist = self._histograms[name][key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    hist[i] += 1
+            hist[-2] += value
+            hist[-1] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def to_json(self) -> Dict[str, Any]:
+        """{"counters": {name: [{labels, value}]}, "histograms": {name: [{labels, count, sum, buckets}]}}"""
+        with self._lock:
+            counters = {name: [{"labels": dict(k), "value": round(v, 6)} for k, v in series.items()]
+                        for name, series in self._counters.items()}
+            histograms = {name: [{"labels": dict(k), "count": h[-1], "sum": round(h[-2], 6),
+                                  "buckets": dict(zip(map(str, self.buckets), h[:len(self.buckets)]))}
+                                 for k, h in series.items()]
+                          for name, series in self._histograms.items()}
+        return {"counters": counters, "histograms": histograms}
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        def fmt(labels: Labels, extra: Labels = ()) -> str:
+            pairs = labels + extra
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines += [f"# HELP {name} {_HELP.get(name, name)}", f"# TYPE {name} counter"]
+                lines += [f"{name}{fmt(k)} {_num(v)}" for k, v in sorted(series.items())]
+            for name, series in sorted(self._histograms.items()):
+                lines += [f"# HELP {name} {_HELP.get(name, name)}", f"# TYPE {name} histogram"]
+                for k, h in sorted(series.items()):
+                    lines += [f"{name}_bucket{fmt(k, (('le', _num(b)),))} {h[i]}" for i, b in enumerate(self.buckets)]
+                    lines += [f"{name}_bucket{fmt(k, (('le', '+Inf'),))} {h[-1]}",
+                              f"{name}_sum{fmt(k)} {_num(h[-2])}",
+                              f"{name}_count{fmt(k)} {h[-1]}"]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _num(value: float) -> str:
+    if isinstance(value, float) and math.isfinite(value) and value != int(value):
+        return repr(round(value, 9))
+    return str(int(value))
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ---------- per-call records ----------
+
+class LLMCall:
+    """One json_call / stream_call: tokens of every attempt that answered, then its outcome."""
+
+    def __init__(self, node: str, model: str, stream: bool = False):
+        self.node = node
+        self.model = model
+        self.stream = stream
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.attempts = 0
+        self.outcome: Optional[str] = None
+        self.latency_s = 0.0
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        for scope in _SCOPES.get():
+            scope.add(self)
+
+    @property
+    def cost_usd(self) -> float:
+        return cost_usd(self.model, self.input_tokens, self.output_tokens)
+
+    def restart(self) -> None:
+        """Start the clock now (streams: when the first chunk is requested, not when built)."""
+        self._t0 = time.perf_counter()
+
+    def attempt(self) -> None:
+        with self._lock:
+            self.attempts += 1
+        REGISTRY.inc("claude_attempts_total", node=self.node, model=self.model)
+
+    def add_usage(self, usage: Any) -> None:
+        """Add a response's `usage` (input_tokens / output_tokens); None is ignored."""
+        if usage is None:
+            return
+        tokens_in = getattr(usage, "input_tokens", 0) or 0
+        tokens_out = getattr(usage, "output_tokens", 0) or 0
+        with self._lock:
+            self.input_tokens += tokens_in
+            self.output_tokens += tokens_out
+        REGISTRY.inc("claude_input_tokens_total", tokens_in, node=self.node, model=self.model)
+        REGISTRY.inc("claude_output_tokens_total", tokens_out, node=self.node, model=self.model)
+        REGISTRY.inc("claude_cost_usd_total", cost_usd(self.model, tokens_in, tokens_out),
+                     node=self.node, model=self.model)
+
+    def finish(self, outcome: str = "ok") -> None:
+        """Record the outcome and latency once (later calls are ignored)."""
+        with self._lock:
+            if self.outcome is not None:
+                return
+            self.outcome = outcome
+            self.latency_s = time.perf_counter() - self._t0
+        REGISTRY.inc("claude_calls_total", node=self.node, model=self.model, outcome=outcome)
+        if outcome != "cached":
+            REGISTRY.observe("claude_call_latency_seconds", self.latency_s, node=self.node, model=self.model)
+
+    def span_attributes(self) -> Dict[str, Any]:
+        """This call as tracing span attributes (OpenTelemetry gen_ai.* names where they exist)."""
+        return {
+            "gen_ai.system": "anthropic",
+            "gen_ai.request.model": self.model,
+            "gen_ai.usage.input_tokens": self.input_tokens,
+            "gen_ai.usage.output_tokens": self.output_tokens,
+            "llm.node": self.node,
+            "llm.outcome": self.outcome or "running",
+            "llm.attempts": self.attempts,
+            "llm.cost_usd": round(self.cost_usd, 6),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "node": self.node,
+            "model": self.model,
+            "stream": self.stream,
+            "outcome": self.outcome or "running",
+            "attempts": self.attempts,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "latency_s": round(self.latency_s, 4),
+        }
+
+
+class RequestUsage:
+    """The LLMCalls made under one track_usage() block."""
+
+    def __init__(self):
+        self._calls: List[LLMCall] = []
+        self._lock = threading.Lock()
+
+    def add(self, call: LLMCall) -> None:
+        with self._lock:
+            self._calls.append(call)
+
+    @property
+    def calls(self) -> List[LLMCall]:
+        with self._lock:
+            return list(self._calls)
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals plus a by_node breakdown (calls, tokens, cost, latency) and the individual calls."""
+        calls = [c.to_dict() for c in self.calls]
+        by_node: Dict[str, Dict[str, Any]] = {}
+        for c in calls:
+            node = by_node.setdefault(c["node"], {"calls": 0, "input_tokens": 0, "output_tokens": 0,
+                                                  "cost_usd": 0.0, "latency_s": 0.0})
+            node["calls"] += 1
+            for k in ("input_tokens", "output_tokens", "cost_usd", "latency_s"):
+                node[k] += c[k]
+        for node in by_node.values():
+            node["cost_usd"] = round(node["cost_usd"], 6)
+            node["latency_s"] = round(node["latency_s"], 4)
+        return {
+            "calls": len(calls),
+            "input_tokens": sum(c["input_tokens"] for c in calls),
+            "output_tokens": sum(c["output_tokens"] for c in calls),
+            "cost_usd": round(sum(c["cost_usd"] for c in calls), 6),
+            "llm_s": round(sum(c["latency_s"] for c in calls), 4),
+            "by_node": by_node,
+            "detail": calls,
+        }
+
+
+_SCOPES: contextvars.ContextVar[Tuple[RequestUsage, ...]] = contextvars.ContextVar("llm_usage_scopes", default=())
+
+
+@contextmanager
+def track_usage() -> Iterator[RequestUsage]:
+    """Collect the Claude calls made in this block; nested blocks each see their own and inner calls."""
+    usage = RequestUsage()
+    token = _SCOPES.set(_SCOPES.get() + (usage,))
+    try:
+        yield usage
+    finally:
+        _SCOPES.reset(token)
+
+
+def shared_usage(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """llm_usage for a coalesced caller: an empty summary, with the run's own summary under "shared"."""
+    return dict(RequestUsage().summary(), shared=summary)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Show the token prices used for cost accounting.")
+    ap.add_argument("--model", type=str, default=os.getenv("CLAUDE_MODEL", "claude-3-5-sonnet-latest"))
+    args = ap.parse_args()
+    price_in, price_out = price_of(args.model)
+    print(f"📦 {args.model}: ${price_in:.2f} / M input tokens, ${price_out:.2f} / M output tokens")
+    if not price_in and not price_out:
+        print("❌ no price known - add it with CLAUDE_PRICES")
+
+
+if __name__ == "__main__":
+    main()
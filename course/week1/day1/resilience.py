@@ -0,0 +1,152 @@
+# resilience.py
+"""
+Timeouts, retries, deadlines and hedging for ClaudeClient calls.
+
+- Per-attempt timeout (CLAUDE_TIMEOUT_S): a stuck request is abandoned
+  instead of holding a router flow for the SDK's 10-minute default.
+- Retries with exponential backoff and full jitter for the statuses that
+  are worth repeating (429 rate limit, 5xx, 529 overloaded, connection
+  errors and timeouts). Other 4xx fail at once. A `retry-after` header is
+  honoured when it asks for longer than the backoff.
+- Deadline: `with call_deadline(5.0): ...` caps every Claude call made
+  inside it (any depth, including graph nodes - it is a contextvar) to the
+  time left. Attempts get min(timeout, time left); no retry starts that
+  couldn't finish in time; running out raises DeadlineExceeded.
+- Hedging (CLAUDE_HEDGE=1, non-streaming calls only): if an attempt has not
+  answered after the p95 of recent call latencies (CLAUDE_HEDGE_AFTER_S
+  until enough samples are in), an identical second request is sent and the
+  first answer wins. It trims the latency tail for the price of a few
+  percent extra requests.
+
+The SDK's own retries are switched off (max_retries=0 in anthropic_client)
+so this is the only retry layer.
+
+Settings (.env): CLAUDE_TIMEOUT_S, CLAUDE_MAX_RETRIES, CLAUDE_BACKOFF_BASE_S,
+CLAUDE_BACKOFF_MAX_S, CLAUDE_HEDGE (1|0), CLAUDE_HEDGE_AFTER_S,
+CLAUDE_HEDGE_MIN_SAMPLES
+"""
+import contextvars
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+from anthropic import APIConnectionError, APIStatusError
+
+RETRYABLE_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+_DEADLINE: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("claude_deadline", default=None)
+
+
+class DeadlineExceeded(RuntimeError):
+    """The call_deadline() budget ran out before Claude answered."""
+
+
+@dataclass
+class RetryPolicy:
+    timeout_s: float = float(os.getenv("CLAUDE_TIMEOUT_S", "60"))
+    max_retries: int = int(os.getenv("CLAUDE_MAX_RETRIES", "2"))
+    backoff_base_s: float = float(os.getenv("CLAUDE_BACKOFF_BASE_S", "0.5"))
+    backoff_max_s: float = float(os.getenv("CLAUDE_BACKOFF_MAX_S", "8"))
+    hedge: bool = os.getenv("CLAUDE_HEDGE", "0") == "1"
+    hedge_after_s: float = float(os.getenv("CLAUDE_HEDGE_AFTER_S", "2.0"))
+    hedge_min_samples: int = int(os.getenv("CLAUDE_HEDGE_MIN_SAMPLES", "20"))
+
+    def backoff_s(self, retry: int, error: Optional[BaseException] = None) -> float:
+        """Full-jitter exponential backoff before retry number `retry` (0-based)."""
+        sleep = random.uniform(0.0, min(self.backoff_max_s, self.backoff_base_s * (2 ** retry)))
+        return max(sleep, min(_retry_after_s(error), self.backoff_max_s))
+
+
+def retryable(error: BaseException) -> bool:
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUSES
+    return isinstance(error, APIConnectionError)  # includes APITimeoutError
+
+
+def _retry_after_s(error: Optional[BaseException]) -> float:
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after", 0)) if response is not None else 0.0
+    except ValueError:  # HTTP-date form: fall back to our own backoff
+        return 0.0
+
+
+# ---------- deadlines ----------
+
+@contextmanager
+def call_deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Bound every Claude call in this block (and the code it calls) to `seconds` in total."""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _DEADLINE.get()
+    token = _DEADLINE.set(deadline if current is None else min(current, deadline))  # nested: tighter wins
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+def remaining_s() -> Optional[float]:
+    """Seconds left under the current call_deadline(), or None if there is none."""
+    deadline = _DEADLINE.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def attempt_timeout(policy: RetryPolicy) -> float:
+    """Timeout for the next attempt; raises DeadlineExceeded if nothing is left."""
+    left = remaining_s()
+    if left is None:
+        return policy.timeout_s
+    if left <= 0:
+        raise DeadlineExceeded("Claude call deadline exceeded")
+    return min(policy.timeout_s, left)
+
+
+def can_wait(seconds: float) -> bool:
+    """True if sleeping `seconds` still leaves time under the deadline for another attempt."""
+    left = remaining_s()
+    return left is None or seconds < left
+
+
+# ---------- stats ----------
+
+class CallStats:
+    """Latency window (for the hedge threshold) plus retry/hedge counters, per client."""
+
+    def __init__(self, window: int = 200):
+        self._latencies: "deque[float]" = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.counters: Counter = Counter()
+
+    def record(self, latency_s: float) -> None:
+        with self._lock:
+            self._latencies.append(latency_s)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def hedge_after_s(self, policy: RetryPolicy) -> float:
+        """p95 of recent latencies, or the configured default until there are enough."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < policy.hedge_min_samples:
+            return policy.hedge_after_s
+        return samples[min(len(samples) - 1, math.ceil(0.95 * len(samples)) - 1)]
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            samples = sorted(self._latencies)
+            out = dict(self.counters)
+        if samples:
+            out["p50_s"] = round(samples[len(samples) // 2], 4)
+            out["p95_s"] = round(samples[min(len(samples) - 1, math.ceil(0.95 * len(samples)) - 1)], 4)
+        return out
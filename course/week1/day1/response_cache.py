@@ -0,0 +1,155 @@
+# response_cache.py
+"""
+Content-addressed response cache for ClaudeClient.json_call.
+
+Two tiers:
+  - in-memory LRU (fast, per process)
+  - optional on-disk SQLite file (survives restarts, shared by processes)
+
+Entries expire after ttl_s seconds. Keys are SHA-256 hashes of the call inputs,
+so prompts never have to be stored as keys.
+
+Settings (.env):
+  CLAUDE_CACHE=1                       enable the default cache used by get_client()
+  CLAUDE_CACHE_MAX_ENTRIES=1024        in-memory LRU size cap
+  CLAUDE_CACHE_TTL_S=3600              time-to-live per entry
+  CLAUDE_CACHE_PATH=data/claude_cache.db   optional SQLite tier ("" = memory only)
+  CLAUDE_CACHE_MAX_DISK_ENTRIES=50000  SQLite tier size cap
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_s: float = 3600.0,
+        path: Optional[str] = None,
+        max_disk_entries: int = 50_000,
+    ):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.max_disk_entries = max_disk_entries
+        self._mem: "OrderedDict[str, tuple[float, str]]" = OrderedDict()  # key -> (created, value)
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "evictions": 0, "sets": 0}
+
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+
+    # ---------- keys ----------
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Stable hash of the call inputs (model, system, user, max_tokens, temperature, ...)."""
+        blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    # ---------- read / write ----------
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                created, value = hit
+                if now - created <= self.ttl_s:
+                    self._mem.move_to_end(key)
+                    self._counters["hits"] += 1
+                    self._counters["memory_hits"] += 1
+                    return value
+                del self._mem[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created = row
+                    if now - created <= self.ttl_s:
+                        self._remember(key, created, value)
+                        self._counters["hits"] += 1
+                        self._counters["disk_hits"] += 1
+                        return value
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            self._counters["sets"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)",
+                    (key, value, now),
+                )
+                # Trim the disk tier every so often rather than on every write
+                if self._counters["sets"] % 100 == 0:
+                    self._trim_disk(now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / total, 4) if total else 0.0,
+                "memory_entries": len(self._mem),
+            }
+
+    # ---------- internals (call with lock held) ----------
+    def _remember(self, key: str, created: float, value: str) -> None:
+        self._mem[key] = (created, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _trim_disk(self, now: float) -> None:
+        self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_s,))
+        self._db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM responses ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+
+
+_DEFAULT_CACHE: Optional[ResponseCache] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def get_default_cache() -> Optional[ResponseCache]:
+    """Process-wide cache configured from .env, or None when CLAUDE_CACHE is off."""
+    global _DEFAULT_CACHE
+    if os.getenv("CLAUDE_CACHE", "0").lower() not in ("1", "true", "yes"):
+        return None
+    with _DEFAULT_LOCK:
+        if _DEFAULT_CACHE is None:
+            _DEFAULT_CACHE = ResponseCache(
+                max_entries=int(os.getenv("CLAUDE_CACHE_MAX_ENTRIES", "1024")),
+                ttl_s=float(os.getenv("CLAUDE_CACHE_TTL_S", "3600")),
+                path=os.getenv("CLAUDE_CACHE_PATH", "") or None,
+                max_disk_entries=int(os.getenv("CLAUDE_CACHE_MAX_DISK_ENTRIES", "50000")),
+            )
+        return _DEFAULT_CACHE
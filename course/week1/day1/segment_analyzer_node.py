@@ -3,7 +3,7 @@
 Minimal LangGraph demo for Day 1:
 START -> segment_analyzer -> END
 
-- Calls Claude (via anthropic_client.ClaudeClient)
+- Calls Claude (via the shared anthropic_client.get_client())
 - Expects strict JSON back (response, insights, summary_table)
 - Returns a clean dict you can render in Streamlit later
 """
@@ -16,7 +16,7 @@ from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
 
 # Local Day 1 client wrapper
-from anthropic_client import ClaudeClient
+from anthropic_client import get_client
 
 
 # --------- Graph State ---------
@@ -35,7 +35,7 @@ def segment_analyzer(state: GS) -> Dict[str, Any]:
     Ask Claude for an exec-ready summary of a segment.
     Enforce JSON so downstream code is reliable.
     """
-    client = ClaudeClient()
+    client = get_client()
 
     user = f"""
 Return ONLY valid JSON matching:
@@ -60,6 +60,7 @@ Constraints:
         system="You are a strict JSON generator. Only output valid JSON.",
         user=user,
         max_tokens=700,
+        node="segment_analyzer",
     )
 
     # Parse JSON safely
@@ -0,0 +1,232 @@
+# single_flight.py
+"""
+Request coalescing ("single flight") for identical concurrent work.
+
+When several users ask the same question at the same moment, only the
+first caller (the leader) runs it; callers that arrive while it is in
+flight wait for that run and get the same result (or exception). Nothing
+is cached: once the run finishes the key is free again, so the next
+caller starts a fresh one.
+
+    FLIGHTS = SingleFlight("exec_bi")
+    value, shared = FLIGHTS.do(key, lambda: work())         # threads
+    value, shared = await FLIGHTS.ado(key, lambda: awork())  # asyncio (per event loop)
+
+`shared` is True for coalesced callers. timeout= bounds how long a
+coalesced caller waits (TimeoutError); the run itself goes on for the
+rest. The value object is shared too, so treat it as read-only -
+caller_result() gives each caller of a result-dict run its own deep copy,
+marked "coalesced", with a joiner's llm_usage zeroed (llm_metrics.py).
+
+SharedStream / AsyncSharedStream let several readers consume one text
+stream (e.g. one Claude explanation) - each subscribe() replays what was
+already received and then reads on; whichever reader is ahead pulls the
+next chunk, so no background thread is needed.
+
+stats() reports calls / leaders / coalesced / errors per group.
+
+Settings (.env): SINGLE_FLIGHT (1|0)
+"""
+import asyncio
+import copy
+import os
+import threading
+import weakref
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+try:  # imported as course.week1.day1.single_flight
+    from .llm_metrics import shared_usage
+except ImportError:  # run from inside day1/
+    from llm_metrics import shared_usage
+
+ENABLED = os.getenv("SINGLE_FLIGHT", "1") == "1"
+
+_GROUPS: "weakref.WeakValueDictionary[str, SingleFlight]" = weakref.WeakValueDictionary()
+
+
+def question_key(question: str) -> str:
+    """Case/whitespace-insensitive form of a question, for flight keys."""
+    return " ".join((question or "").split()).lower()
+
+
+def caller_result(result: Dict[str, Any], shared: bool) -> Dict[str, Any]:
+    """
+    One caller's copy of a run's result dict, with "coalesced": shared. Deep,
+    so a caller annotating its timings / rows / trace doesn't change the
+    others'. A joiner's "llm_usage" becomes shared_usage(): the Claude calls
+    were billed to the leader's request.
+    """
+    out = copy.deepcopy(result)
+    out["coalesced"] = shared
+    if shared and "llm_usage" in out:
+        out["llm_usage"] = shared_usage(out["llm_usage"])
+    return out
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """One in-flight execution per key; concurrent callers share it."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Task]]" = \
+            weakref.WeakKeyDictionary()
+        self.leaders = self.coalesced = self.errors = 0
+        _GROUPS[name] = self
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        Run fn() unless an identical call is in flight; returns (value, shared).
+        A coalesced caller waits at most `timeout` seconds, then raises TimeoutError.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"{self.name}: in-flight call not done after {timeout:.2f} s")
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]  # later callers start a fresh run
+            call.done.set()
+        return call.value, False
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]],
+                  timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        Async do(): coalesces callers on the same event loop. The run is a
+        task shielded from any one caller's cancellation, so a leader that
+        gives up doesn't cancel the others. `timeout` as in do().
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            tasks = self._tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            shared = task is not None
+            if shared:
+                self.coalesced += 1
+            else:
+                task = tasks[key] = loop.create_task(fn())
+                self.leaders += 1
+                task.add_done_callback(lambda t: self._finished(tasks, key, t))
+        if not shared:
+            return await asyncio.shield(task), False
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout), True
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"{self.name}: in-flight call not done after {timeout:.2f} s") from None
+
+    def _finished(self, tasks: Dict[Hashable, asyncio.Task], key: Hashable, task: asyncio.Task) -> None:
+        with self._lock:
+            if tasks.get(key) is task:
+                del tasks[key]
+            if not task.cancelled() and task.exception() is not None:
+                self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = self.leaders + self.coalesced
+            in_flight = len(self._calls) + sum(len(t) for t in self._tasks.values())
+            return {
+                "calls": calls,
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "in_flight": in_flight,
+                "coalesced_rate": round(self.coalesced / calls, 3) if calls else 0.0,
+            }
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    """stats() of every live SingleFlight group, by name."""
+    return {name: group.stats() for name, group in list(_GROUPS.items())}
+
+
+class SharedStream:
+    """Fan one iterator of text chunks out to any number of readers (threads)."""
+
+    def __init__(self, chunks: Iterable[str]):
+        self._source = iter(chunks)
+        self._buf: List[str] = []
+        self._done = False
+        self._error: Optional[Exception] = None
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Iterator[str]:
+        i = 0
+        while True:
+            if i < len(self._buf):
+                i += 1
+                yield self._buf[i - 1]
+                continue
+            with self._lock:
+                if i < len(self._buf):
+                    continue  # another reader pulled it meanwhile
+                if self._error is not None:
+                    raise self._error
+                if self._done:
+                    return
+                try:
+                    self._buf.append(next(self._source))
+                except StopIteration:
+                    self._done = True
+                except Exception as e:
+                    self._error = e
+
+
+class AsyncSharedStream:
+    """SharedStream for an async iterator, readers on one event loop."""
+
+    def __init__(self, chunks: AsyncIterator[str]):
+        self._source = chunks.__aiter__()
+        self._buf: List[str] = []
+        self._done = False
+        self._error: Optional[Exception] = None
+        self._lock = asyncio.Lock()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        i = 0
+        while True:
+            if i < len(self._buf):
+                i += 1
+                yield self._buf[i - 1]
+                continue
+            async with self._lock:
+                if i < len(self._buf):
+                    continue
+                if self._error is not None:
+                    raise self._error
+                if self._done:
+                    return
+                try:
+                    self._buf.append(await self._source.__anext__())
+                except StopAsyncIteration:
+                    self._done = True
+                except Exception as e:
+                    self._error = e
@@ -0,0 +1,352 @@
+# tracing.py
+"""
+Lightweight request tracing: nested spans for router -> node -> SQL -> LLM.
+
+    with span("sql.execute", template=name) as sp:
+        df = ...
+        sp.set_attribute("rows", len(df))
+
+A span opened with no active parent starts a new trace; when that root
+ends, the trace goes to EXPORTER (in memory, the last TRACING_KEEP
+traces). Parenting follows a contextvar, so spans opened in LangGraph
+worker threads and asyncio tasks land in the request's tree; for a plain
+thread pool submit with contextvars.copy_context().run. start_span(name,
+parent=...) opens a span without making it current (for streams that are
+read after the caller returned).
+
+sp.tree() is the nested view (ms offsets from the tree's root, durations,
+attributes, events) that exec_bi and the router attach to their results as
+"trace"; format_trace(tree) prints it, trace_summary(tree) is the one-line
+version used in dashboard captions.
+
+OpenTelemetry: ids, status, events and attributes follow the OTel data
+model (LLM spans use the gen_ai.* attribute names) and trace.to_otlp()
+gives OTLP/JSON. If opentelemetry-api is installed and TRACING_OTEL=1,
+every span is also mirrored to the global OTel tracer, so a configured
+OTel SDK exporter receives them.
+
+Run (traces a toy request and prints it):
+  python course/week1/day1/tracing.py
+
+Settings (.env): TRACING (1|0), TRACING_KEEP, TRACING_OTEL (1|0)
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ENABLED = os.getenv("TRACING", "1") == "1"
+KEEP = int(os.getenv("TRACING_KEEP", "100"))
+SERVICE_NAME = "ai-marketing-agents"
+
+try:  # optional: mirror spans to OpenTelemetry
+    from opentelemetry import trace as otel_trace
+    from opentelemetry.trace import Status, StatusCode
+    HAVE_OTEL = True
+except ImportError:
+    HAVE_OTEL = False
+OTEL = HAVE_OTEL and os.getenv("TRACING_OTEL", "0") == "1"
+
+_CURRENT: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("trace_span", default=None)
+
+
+class Trace:
+    """All spans of one request (one root)."""
+
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self._spans: List["Span"] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: "Span") -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    @property
+    def spans(self) -> List["Span"]:
+        with self._lock:
+            return list(self._spans)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON (ExportTraceServiceRequest) for this trace's finished spans."""
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+            "scopeSpans": [{"scope": {"name": __name__},
+                            "spans": [s.to_otlp() for s in self.spans if s.end_ns is not None]}],
+        }]}
+
+
+class Span:
+    def __init__(self, name: str, trace: Trace, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace = trace
+        self.parent_id = parent.span_id if parent is not None else None
+        self.span_id = secrets.token_hex(8)
+        self.attributes: Dict[str, Any] = dict(attributes)
+        self.events: List[Dict[str, Any]] = []
+        self.status = "unset"
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self._t0 = time.perf_counter()
+        self._t1: Optional[float] = None
+        self._otel = _otel_start(self, parent) if OTEL else None
+        trace.add(self)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self._t1 is None else (self._t1 - self._t0) * 1000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+        if self._otel is not None and value is not None:
+            self._otel.set_attribute(key, value)
+
+    def set_attributes(self, **attributes: Any) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append({"name": name, "at_ms": round((time.perf_counter() - self._t0) * 1000, 3),
+                            "time_ns": time.time_ns(), "attributes": attributes})
+        if self._otel is not None:
+            self._otel.add_event(name, attributes)
+
+    def record_exception(self, error: BaseException) -> None:
+        self.status, self.status_message = "error", f"{type(error).__name__}: {error}"[:300]
+        self.add_event("exception", **{"exception.type": type(error).__name__, "exception.message": str(error)[:300]})
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self._t1 = time.perf_counter()
+        self.end_ns = time.time_ns()
+        if self.status == "unset":
+            self.status = "ok"
+        if self._otel is not None:
+            if self.status == "error":
+                self._otel.set_status(Status(StatusCode.ERROR, self.status_message))
+            self._otel.end(end_time=self.end_ns)
+        if self.parent_id is None:
+            EXPORTER.export(self.trace)
+
+    def tree(self) -> Dict[str, Any]:
+        """This span and its descendants as nested dicts (times in ms from this span's start)."""
+        children: Dict[str, List[Span]] = {}
+        for s in self.trace.spans:
+            children.setdefault(s.parent_id, []).append(s)
+
+        def node(s: Span) -> Dict[str, Any]:
+            out = {
+                "name": s.name,
+                "start_ms": round((s._t0 - self._t0) * 1000, 3),
+                "duration_ms": None if s.duration_ms is None else round(s.duration_ms, 3),
+                "status": s.status,
+            }
+            if s.attributes:
+                out["attributes"] = dict(s.attributes)
+            if s.events:
+                out["events"] = [{"name": e["name"], "at_ms": e["at_ms"], **e["attributes"]} for e in s.events]
+            kids = sorted(children.get(s.span_id, []), key=lambda c: c._t0)
+            if kids:
+                out["children"] = [node(c) for c in kids]
+            return out
+
+        return dict(node(self), trace_id=self.trace.trace_id)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "events": [{"name": e["name"], "timeUnixNano": str(e["time_ns"]),
+                        "attributes": _otlp_attributes(e["attributes"])} for e in self.events],
+            "status": {"code": 2 if self.status == "error" else 1, "message": self.status_message},
+        }
+
+
+class _NoopSpan:
+    """Stand-in when TRACING=0: same methods, records nothing."""
+    name, attributes, duration_ms = "", {}, None
+
+    def set_attribute(self, key, value): pass
+    def set_attributes(self, **attributes): pass
+    def add_event(self, name, **attributes): pass
+    def record_exception(self, error): pass
+    def end(self): pass
+    def tree(self): return {}
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class InMemoryExporter:
+    """Keeps the last `keep` finished traces (root ended)."""
+
+    def __init__(self, keep: int = KEEP):
+        self._traces: "deque[Trace]" = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces.append(trace)
+
+    def traces(self) -> List[Trace]:
+        with self._lock:
+            return list(self._traces)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+
+EXPORTER = InMemoryExporter()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+def _otel_start(span: Span, parent: Optional[Span]):
+    context = otel_trace.set_span_in_context(parent._otel) if parent is not None and parent._otel else None
+    attributes = {k: v for k, v in span.attributes.items() if v is not None}
+    return otel_trace.get_tracer(__name__).start_span(span.name, context=context, attributes=attributes,
+                                                      start_time=span.start_ns)
+
+
+# ---------- API ----------
+
+def current_span():
+    """The active span (NOOP_SPAN outside any span or when tracing is off)."""
+    return _CURRENT.get() or NOOP_SPAN
+
+
+def start_span(name: str, parent: Any = None, **attributes: Any):
+    """
+    Open a span without making it current; call .end() when done. The
+    parent defaults to the current span (none -> a new trace).
+    """
+    if not ENABLED:
+        return NOOP_SPAN
+    parent = _CURRENT.get() if parent is None else parent
+    if isinstance(parent, _NoopSpan):
+        parent = None
+    return Span(name, parent.trace if parent is not None else Trace(), parent, attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Open a child of the current span (or a new trace) for the duration of the block."""
+    if not ENABLED:
+        yield NOOP_SPAN
+        return
+    sp = start_span(name, **attributes)
+    token = _CURRENT.set(sp)
+    try:
+        yield sp
+    except Exception as e:
+        sp.record_exception(e)
+        raise
+    finally:
+        _CURRENT.reset(token)
+        sp.end()
+
+
+def traced(name: str, fn: Callable) -> Callable:
+    """fn (sync or async) wrapped in span(name) - e.g. graph nodes."""
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            with span(name):
+                return await fn(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with span(name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+# ---------- views ----------
+
+def _walk(tree: Dict[str, Any], depth: int = 0) -> Iterator[tuple]:
+    yield depth, tree
+    for child in tree.get("children", []):
+        yield from _walk(child, depth + 1)
+
+
+def _ms(value: Optional[float]) -> str:
+    return "running" if value is None else f"{value:.0f} ms" if value >= 10 else f"{value:.1f} ms"
+
+
+# Left out of format_trace lines (long, or repeated on every LLM span)
+_QUIET = {"question", "gen_ai.system", "gen_ai.request.model", "llm.node"}
+
+
+def format_trace(tree: Dict[str, Any]) -> str:
+    """Indented text tree: name, start offset, duration, key attributes."""
+    lines = []
+    for depth, node in _walk(tree) if tree else ():
+        attrs = " ".join(f"{k}={v}" for k, v in node.get("attributes", {}).items()
+                         if k not in _QUIET and not isinstance(v, (dict, list)))
+        flag = " ❌" if node["status"] == "error" else ""
+        lines.append(f"{'  ' * depth}{node['name']}  +{node['start_ms']:.0f} ms  {_ms(node['duration_ms'])}{flag}"
+                     + (f"  [{attrs}]" if attrs else ""))
+    return "\n".join(lines)
+
+
+def trace_summary(tree: Dict[str, Any], top: int = 4) -> str:
+    """One line for captions: total, then the slowest leaf spans (where the time went)."""
+    if not tree:
+        return ""
+    leaves = [n for _, n in _walk(tree) if not n.get("children") and n is not tree and n["duration_ms"] is not None]
+    leaves.sort(key=lambda n: n["duration_ms"], reverse=True)
+    total = max([tree["duration_ms"] or 0.0] + [n["start_ms"] + n["duration_ms"] for n in leaves])
+    parts = [f"{n['name']} {_ms(n['duration_ms'])}" for n in leaves[:top]]
+    return f"Trace {_ms(total)}" + (": " + " · ".join(parts) if parts else "")
+
+
+def main():
+    with span("demo.request", question="What's the average p1 by segment?") as root:
+        with span("demo.select_template") as sp:
+            time.sleep(0.01)
+            sp.set_attribute("template", "avg_p1_by_segment")
+        with span("demo.sql", rows=5):
+            time.sleep(0.02)
+        with span("llm.demo") as sp:
+            time.sleep(0.03)
+            sp.add_event("first_token")
+    tree = root.tree()
+    print(format_trace(tree))
+    print(f"→ {trace_summary(tree)}")
+    print(f"→ {len(EXPORTER.traces())} trace(s) exported, {len(root.trace.to_otlp()['resourceSpans'][0]['scopeSpans'][0]['spans'])} spans")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# bench_features.py
+"""
+Feature-build benchmarks on synthetic data (never touches your DATABASE_URL).
+
+  memory   peak RSS and wall time of each full-build strategy
+           (pandas / stream / pushdown) at several transaction counts
+  scaling  wall time of --strategy parallel at 1, 2, 4, 8 workers
+  generate seed_sample_data throughput (rows/s), with and without the DB write
+  bulk     bulk_write methods per backend (rows/s): plain to_sql vs multi-row
+           INSERT vs SQLite executemany / Postgres COPY
+
+SQLite's page cache (64 MiB) and mmap window (256 MiB) count toward RSS,
+so every strategy climbs until those caps fill; after that only pandas
+keeps growing with the transaction count.
+
+Run:
+  python bench_features.py memory --tx 1000000 10000000
+  python bench_features.py scaling --tx 10000000 --workers 1 2 4 8
+  python bench_features.py generate --tx 1000000 10000000
+  python bench_features.py bulk --rows 1000000 --url postgresql://localhost/bench
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _child_seed(n_tx: int, n_leads: int, write: bool = True, seed: int = 42) -> None:
+    """Fill the scratch DATABASE_URL with seed_sample_data's generators (or only generate)."""
+    import contextlib
+    import io
+    import seed_sample_data as ssd
+
+    if write:
+        with contextlib.redirect_stdout(io.StringIO()):
+            r = ssd.seed_tables(n_leads, n_tx, seed)
+        print(json.dumps({"tx_s": round(r["tx_s"], 2)}))
+        return
+
+    t0 = time.perf_counter()
+    leads = ssd.make_leads_scored(n_leads, seed)
+    for _ in ssd.iter_transactions(leads, n_tx, seed + 100):
+        pass
+    print(json.dumps({"tx_s": round(time.perf_counter() - t0, 2)}))
+
+
+def _child_build(strategy: str, chunksize: int, workers: int = 1) -> None:
+    """Runs inside a fresh interpreter so ru_maxrss belongs to one build only."""
+    import contextlib
+    import io
+    import build_features as bf
+
+    t0 = time.perf_counter()
+    if strategy != "baseline":
+        with contextlib.redirect_stdout(io.StringIO()):
+            bf.build_full(strategy, chunksize=chunksize, workers=workers)
+    elapsed = time.perf_counter() - t0
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"strategy": strategy, "seconds": round(elapsed, 2), "peak_rss_mb": round(peak_kb / 1024, 1)}))
+
+
+def _run_child(url: str, *args: str) -> str:
+    """
+    Every step runs in its own interpreter, and this parent never imports
+    pandas: Linux carries ru_maxrss across fork+exec, so a fat parent would
+    inflate every child's reading.
+    """
+    env = dict(os.environ, DATABASE_URL=url)
+    out = subprocess.run([sys.executable, __file__, *args], cwd=HERE, env=env, capture_output=True, text=True)
+    if out.returncode != 0:
+        sys.exit(f"❌ {' '.join(args)} failed:\n{out.stderr[-2000:]}")
+    return out.stdout
+
+
+def bench_memory(sizes, chunksize: int, users_per_tx: float) -> None:
+    print(f"{'transactions':>14} {'strategy':>10} {'seconds':>9} {'peak RSS (MB)':>14}")
+    for n_tx in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            _run_child(url, "_seed", "--tx", str(n_tx), "--leads", str(max(1, int(n_tx * users_per_tx))))
+            for strategy in ("baseline", "pandas", "stream", "pushdown"):
+                out = _run_child(url, "_build", "--strategy", strategy, "--chunksize", str(chunksize))
+                r = json.loads(out.strip().splitlines()[-1])
+                print(f"{n_tx:>14,} {strategy:>10} {r['seconds']:>9} {r['peak_rss_mb']:>14}")
+
+
+def bench_generate(sizes, users_per_tx: float) -> None:
+    print(f"{'transactions':>14} {'generate rows/s':>16} {'generate+write rows/s':>22}")
+    for n_tx in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            leads = str(max(1, int(n_tx * users_per_tx)))
+            gen = json.loads(_run_child(url, "_seed", "--tx", str(n_tx), "--leads", leads, "--no-write"))["tx_s"]
+            full = json.loads(_run_child(url, "_seed", "--tx", str(n_tx), "--leads", leads))["tx_s"]
+            print(f"{n_tx:>14,} {n_tx / max(gen, 1e-9):>16,.0f} {n_tx / max(full, 1e-9):>22,.0f}")
+
+
+BULK_METHODS = {
+    "sqlite": ["pandas", "multi", "executemany"],
+    "postgresql": ["pandas", "multi", "copy"],
+}
+
+
+def bench_bulk(rows: int, urls) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        scratch = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["DATABASE_URL"] = scratch  # seed_sample_data binds its engine at import
+        from bulk_write import bulk_transaction, write_frame
+        from db_engine import dispose_engines, get_engine
+        from seed_sample_data import make_leads_scored, make_transactions
+
+        tx = make_transactions(make_leads_scored(max(1, rows // 20), 42), rows, 142)
+        print(f"rows: {rows:,}")
+        print(f"{'backend':>12} {'method':>12} {'seconds':>9} {'rows/s':>12}")
+        for url in [scratch, *urls]:
+            engine = get_engine(url)
+            dialect = engine.dialect.name
+            for method in BULK_METHODS.get(dialect, ["pandas", "multi"]):
+                t0 = time.perf_counter()
+                with bulk_transaction(engine) as conn:
+                    write_frame(tx, "bench_bulk_write", conn, method=method)
+                elapsed = time.perf_counter() - t0
+                print(f"{dialect:>12} {method:>12} {elapsed:>9.2f} {rows / elapsed:>12,.0f}")
+            with engine.begin() as conn:
+                conn.exec_driver_sql("DROP TABLE IF EXISTS bench_bulk_write")
+        dispose_engines()
+
+
+def bench_scaling(n_tx: int, worker_counts, chunksize: int, users_per_tx: float) -> None:
+    print(f"transactions: {n_tx:,}  CPUs: {os.cpu_count()}")
+    print(f"{'workers':>8} {'seconds':>9} {'speed-up':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        _run_child(url, "_seed", "--tx", str(n_tx), "--leads", str(max(1, int(n_tx * users_per_tx))))
+        base = None
+        for w in worker_counts:
+            out = _run_child(url, "_build", "--strategy", "parallel", "--chunksize", str(chunksize), "--workers", str(w))
+            seconds = json.loads(out.strip().splitlines()[-1])["seconds"]
+            base = base or seconds
+            print(f"{w:>8} {seconds:>9} {base / seconds:>8.2f}x")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Feature-build benchmarks.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    mem = sub.add_parser("memory", help="Peak RSS per full-build strategy.")
+    mem.add_argument("--tx", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    mem.add_argument("--users-per-tx", type=float, default=0.05, help="Leads generated per transaction.")
+    mem.add_argument("--chunksize", type=int, default=100_000)
+
+    scale = sub.add_parser("scaling", help="Parallel build time vs worker count.")
+    scale.add_argument("--tx", type=int, default=10_000_000)
+    scale.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    scale.add_argument("--users-per-tx", type=float, default=0.05, help="Leads generated per transaction.")
+    scale.add_argument("--chunksize", type=int, default=100_000)
+
+    gen = sub.add_parser("generate", help="Synthetic data generation throughput.")
+    gen.add_argument("--tx", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    gen.add_argument("--users-per-tx", type=float, default=0.05, help="Leads generated per transaction.")
+
+    bulk = sub.add_parser("bulk", help="Bulk write throughput per backend and method.")
+    bulk.add_argument("--rows", type=int, default=1_000_000)
+    bulk.add_argument("--url", action="append", default=[],
+                      help="Extra DATABASE_URL to benchmark (repeatable); a scratch SQLite file is always included.")
+
+    # internal: isolated child steps
+    seed = sub.add_parser("_seed")
+    seed.add_argument("--tx", type=int, required=True)
+    seed.add_argument("--leads", type=int, required=True)
+    seed.add_argument("--no-write", dest="write", action="store_false")
+    build = sub.add_parser("_build")
+    build.add_argument("--strategy", required=True)
+    build.add_argument("--chunksize", type=int, default=100_000)
+    build.add_argument("--workers", type=int, default=1)
+
+    args = ap.parse_args()
+    if args.cmd == "memory":
+        bench_memory(args.tx, args.chunksize, args.users_per_tx)
+    elif args.cmd == "scaling":
+        bench_scaling(args.tx, args.workers, args.chunksize, args.users_per_tx)
+    elif args.cmd == "generate":
+        bench_generate(args.tx, args.users_per_tx)
+    elif args.cmd == "bulk":
+        bench_bulk(args.rows, args.url)
+    elif args.cmd == "_seed":
+        _child_seed(args.tx, args.leads, args.write)
+    else:
+        _child_build(args.strategy, args.chunksize, args.workers)
+
+
+if __name__ == "__main__":
+    main()
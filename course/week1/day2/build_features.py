@@ -11,18 +11,53 @@ It creates a new table:
     with columns:
       user_email, p1, member_rating, purchase_frequency, recency_days
 
+Modes (python build_features.py --mode ...):
+  - full         recompute everything from scratch (default)
+  - incremental  only recount users with transactions at or after the last
+                 build's high-water mark on transactions.ts, re-featurize leads
+                 that are new or changed, and drop leads that are gone
+
+Full-build strategies (--strategy ...):
+  - pushdown     one GROUP BY query runs inside the database; Python only sees
+                 one row per user (memory O(users), not O(transactions))
+  - pandas       pull raw tables into DataFrames and aggregate in pandas
+  - stream       read transactions in --chunksize pieces and fold each into a
+                 per-user accumulator (memory ~ users + one chunk); for
+                 databases where pushdown isn't possible
+  - parallel     split transactions into user_email ranges and stream each
+                 range in its own process (--workers N)
+  - auto         parallel when --workers > 1, else pushdown when the dialect
+                 supports it, else stream (default)
+
 🎯 Why this matters:
 Executives can easily understand frequency, recency, and rating.
 These are the "features" that AI and BI systems will analyze.
 """
 
+import argparse
 import os
 import sys
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, text
 from dotenv import load_dotenv
 
+try:  # imported as course.week1.day2.build_features
+    from .bulk_write import bulk_transaction, write_frame
+    from .db_engine import dispose_engines, get_engine
+    from .feature_version import STATE_TABLE, bump_feature_version
+    from .rollup import refresh_rollup
+    from .segment_samples import refresh_segment_samples
+    from .schema import apply_indexes
+except ImportError:  # run from inside day2/
+    from bulk_write import bulk_transaction, write_frame
+    from db_engine import dispose_engines, get_engine
+    from feature_version import STATE_TABLE, bump_feature_version
+    from rollup import refresh_rollup
+    from segment_samples import refresh_segment_samples
+    from schema import apply_indexes
+
 # ------------------------------------------------------
 # STEP 1 — Load settings and point to the database
 # ------------------------------------------------------
@@ -32,13 +67,20 @@ load_dotenv()
 DEFAULT_SQLITE = "sqlite:///data/leads_scored_segmentation.db"
 DB_URL = os.getenv("DATABASE_URL", DEFAULT_SQLITE)
 
-# Make sure the /data folder exists (if using SQLite)
-if DB_URL.startswith("sqlite:///"):
-    data_dir = Path(DB_URL.replace("sqlite:///", "")).parent
-    data_dir.mkdir(parents=True, exist_ok=True)
+# Shared, pooled database connection (also creates the /data folder for SQLite)
+engine = get_engine(DB_URL)
+
+FEATURE_COLUMNS = ["user_email", "p1", "member_rating", "purchase_frequency", "recency_days"]
+
+# Bookkeeping for incremental builds
+STATS_TABLE = "customer_tx_stats"      # per-user running purchase_frequency + last_ts
+HWM_KEY = "transactions_hwm"
+
+# Streaming: rows per transactions chunk (writes are batched by bulk_write)
+STREAM_CHUNKSIZE = int(os.getenv("FEATURE_CHUNKSIZE", "100000"))
 
-# Create a database connection
-engine = create_engine(DB_URL, future=True)
+# Parallel: worker processes for --strategy parallel (one partition each)
+WORKERS = int(os.getenv("FEATURE_WORKERS", "1"))
 
 
 # ------------------------------------------------------
@@ -75,92 +117,452 @@ def _read_tables():
 # ------------------------------------------------------
 # STEP 3 — Build the features
 # ------------------------------------------------------
-def build_features(leads: pd.DataFrame, tx: pd.DataFrame) -> pd.DataFrame:
-    # 1. Purchase Frequency → how many transactions per user
-    purchase_freq = (
-        tx.groupby("user_email")["product_id"]
-          .count()
-          .rename("purchase_frequency")
+def aggregate_transactions(tx: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-user running stats: purchase_frequency (count of product_id) and
+    last_ts (latest parseable timestamp, NaT if none).
+    """
+    ts = pd.to_datetime(tx["ts"], errors="coerce", utc=True)
+    return (
+        tx.assign(ts=ts)
+          .groupby("user_email")
+          .agg(purchase_frequency=("product_id", "count"), last_ts=("ts", "max"))
           .reset_index()
     )
 
-    # 2. Recency Days → days since last transaction
-    tx = tx.copy()
-    tx["ts"] = pd.to_datetime(tx["ts"], errors="coerce", utc=True)
-    max_ts = (
-        tx.dropna(subset=["ts"])
-          .groupby("user_email")["ts"]
-          .max()
-          .rename("last_ts")
-          .reset_index()
-    )
+
+def features_from_stats(leads: pd.DataFrame, stats: pd.DataFrame) -> pd.DataFrame:
+    """Join per-user stats onto leads and derive recency_days."""
+    stats = stats.copy()
     now = pd.Timestamp.now(tz="UTC")
-    max_ts["recency_days"] = (now - max_ts["last_ts"]).dt.days
+    stats["recency_days"] = (now - stats["last_ts"]).dt.days
 
-    # 3. Merge everything into one table
-    features = (
-        leads.merge(purchase_freq, on="user_email", how="left")
-             .merge(max_ts[["user_email", "recency_days"]], on="user_email", how="left")
-    )
+    leads = leads.drop_duplicates(subset=["user_email"])  # user_email is the primary key
+    features = leads.merge(stats[["user_email", "purchase_frequency", "recency_days"]], on="user_email", how="left")
 
     # Fill missing values with sensible defaults
     features["purchase_frequency"] = features["purchase_frequency"].fillna(0).astype(int)
     features["recency_days"] = features["recency_days"].fillna(365).astype(int)
 
     # Select only the columns we care about
-    return features[["user_email", "p1", "member_rating", "purchase_frequency", "recency_days"]]
+    return features[FEATURE_COLUMNS]
+
+
+def build_features(leads: pd.DataFrame, tx: pd.DataFrame) -> pd.DataFrame:
+    # 1. Purchase Frequency → how many transactions per user
+    # 2. Recency Days → days since last transaction
+    # 3. Merge everything into one table
+    return features_from_stats(leads, aggregate_transactions(tx))
 
 
 # ------------------------------------------------------
-# STEP 4 — Save results into the database
+# STEP 3b — SQL pushdown (aggregate inside the database)
+# ------------------------------------------------------
+# Dialects known to run PUSHDOWN_SQL (LEFT JOIN onto an aggregated subquery,
+# uncorrelated scalar subquery); anything else streams (or uses pandas).
+PUSHDOWN_DIALECTS = {"sqlite", "postgresql", "mysql", "mariadb", "mssql", "oracle", "duckdb"}
+
+# tx_hwm rides along in the same statement so the high-water mark matches
+# exactly the rows that were aggregated.
+PUSHDOWN_SQL = """
+    SELECT l.*, t.purchase_frequency, t.last_ts,
+           (SELECT MAX(ts) FROM transactions) AS tx_hwm
+    FROM leads_scored l
+    LEFT JOIN (
+        SELECT user_email, COUNT(product_id) AS purchase_frequency, MAX(ts) AS last_ts
+        FROM transactions
+        GROUP BY user_email
+    ) t ON t.user_email = l.user_email
+"""
+
+
+def supports_pushdown() -> bool:
+    return engine.dialect.name in PUSHDOWN_DIALECTS
+
+
+def read_features_pushdown() -> Tuple[pd.DataFrame, pd.DataFrame, Optional[str]]:
+    """
+    Build features from one in-database GROUP BY + LEFT JOIN.
+    Returns (features, per-user stats, transactions high-water mark).
+    MAX(ts) compares stored values, so ts must use one sortable format.
+    """
+    with engine.connect() as conn:
+        joined = pd.read_sql(text(PUSHDOWN_SQL), conn)
+
+    hwm = joined["tx_hwm"].iloc[0] if len(joined) else None
+    joined = joined.drop(columns=["tx_hwm"])
+    joined["last_ts"] = pd.to_datetime(joined["last_ts"], errors="coerce", utc=True)
+
+    stats = (
+        joined.loc[joined["purchase_frequency"].notna(), ["user_email", "purchase_frequency", "last_ts"]]
+              .drop_duplicates(subset=["user_email"])
+    )
+    stats["purchase_frequency"] = stats["purchase_frequency"].astype(int)
+    leads = joined.drop(columns=["purchase_frequency", "last_ts"])
+    return features_from_stats(leads, stats), stats, (None if hwm is None else str(hwm))
+
+
+# ------------------------------------------------------
+# STEP 3c — Streaming (bounded memory, any database)
+# ------------------------------------------------------
+def aggregate_transactions_streaming(
+    chunksize: int = STREAM_CHUNKSIZE, where: str = "", params: Optional[dict] = None,
+) -> Tuple[pd.DataFrame, Optional[str]]:
+    """
+    Fold transactions chunk by chunk into per-user (purchase_frequency, last_ts).
+    Partial aggregates are compacted whenever they reach one chunk's worth of
+    rows, so memory stays ~ O(users + chunksize). Uses a server-side cursor
+    where the driver supports one. `where` (with bind `params`) restricts the
+    scan, e.g. to one partition. Returns (stats, high-water mark).
+    """
+    acc = aggregate_transactions(pd.DataFrame(columns=["user_email", "product_id", "ts"]))
+    pending: List[pd.DataFrame] = []
+    pending_rows = 0
+    hwm = None
+
+    with engine.connect().execution_options(stream_results=True) as conn:
+        sql = f"SELECT user_email, product_id, ts FROM transactions {where}"
+        chunks = pd.read_sql(text(sql), conn, params=params, chunksize=chunksize)
+        for chunk in chunks:
+            chunk_max = chunk["ts"].max()
+            if pd.notna(chunk_max) and (hwm is None or chunk_max > hwm):
+                hwm = chunk_max
+            part = aggregate_transactions(chunk)
+            pending.append(part)
+            pending_rows += len(part)
+            if pending_rows >= chunksize:
+                acc = merge_stats(acc, pd.concat(pending, ignore_index=True))
+                pending, pending_rows = [], 0
+
+    if pending:
+        acc = merge_stats(acc, pd.concat(pending, ignore_index=True))
+    return acc, (None if hwm is None else str(hwm))
+
+
 # ------------------------------------------------------
-def write_features(df: pd.DataFrame):
+# STEP 3d — Parallel (user_email ranges across processes)
+# ------------------------------------------------------
+# Partitions are contiguous user_email ranges cut at quantiles of
+# transactions, so each worker range-scans only its share through the
+# (user_email, ts) index. A user's rows all land in one range, so partition
+# results never overlap and can simply be concatenated.
+def supports_parallel() -> bool:
+    """Any database works, except in-memory SQLite: worker processes can't see it."""
+    return not (engine.dialect.name == "sqlite" and engine.url.database in (None, "", ":memory:"))
+
+
+def _init_worker() -> None:
+    """Fresh engine per worker process; inherited pooled connections are left to the parent."""
+    global engine
+    dispose_engines(close=False)
+    engine = get_engine(DB_URL)
+
+
+def partition_bounds(parts: int) -> List[str]:
+    """
+    Up to parts - 1 user_email cut points that split transactions into ranges
+    of about equal row counts: one COUNT and one OFFSET probe per cut, all
+    answered from the user_email index. A user with a very large share can
+    make two cuts coincide, leaving fewer ranges.
+    """
     with engine.begin() as conn:
-        df.to_sql("customer_features", conn, if_exists="replace", index=False)
+        apply_indexes(conn, ["transactions"])  # the probes and the workers' range scans need it
+        total = conn.execute(text("SELECT COUNT(user_email) FROM transactions")).scalar_one()
+        probe = text("SELECT user_email FROM transactions WHERE user_email IS NOT NULL "
+                     "ORDER BY user_email LIMIT 1 OFFSET :k")
+        cuts = [conn.execute(probe, {"k": total * i // parts}).scalar() for i in range(1, parts)]
+    return sorted({c for c in cuts if c is not None})
+
+
+def _aggregate_partition(lo: Optional[str], hi: Optional[str], chunksize: int) -> Tuple[pd.DataFrame, Optional[str]]:
+    """Stream the rows with lo <= user_email < hi (None = open end; NULL emails go to the first range)."""
+    conds, params = [], {}
+    if lo is not None:
+        conds.append("user_email >= :lo")
+        params["lo"] = lo
+    if hi is not None:
+        conds.append("(user_email < :hi OR user_email IS NULL)" if lo is None else "user_email < :hi")
+        params["hi"] = hi
+    where = f"WHERE {' AND '.join(conds)}" if conds else ""
+    return aggregate_transactions_streaming(chunksize, where=where, params=params)
+
+
+def aggregate_transactions_parallel(
+    workers: int = WORKERS, chunksize: int = STREAM_CHUNKSIZE,
+) -> Tuple[pd.DataFrame, Optional[str]]:
+    """
+    Aggregate up to `workers` user_email ranges of transactions in a process
+    pool (each worker streams its own range) and concatenate the per-user
+    stats. Returns (stats, high-water mark).
+    """
+    cuts = partition_bounds(workers) if workers > 1 else []
+    los, his = [None] + cuts, cuts + [None]
+    with ProcessPoolExecutor(max_workers=len(los), initializer=_init_worker) as pool:
+        results = list(pool.map(_aggregate_partition, los, his, [chunksize] * len(los)))
+
+    stats = pd.concat([r[0] for r in results], ignore_index=True)
+    marks = [r[1] for r in results if r[1] is not None]
+    return stats, (max(marks) if marks else None)
+
+
+# ------------------------------------------------------
+# STEP 4 — Save results into the database
+# ------------------------------------------------------
+def write_features(df: pd.DataFrame, stats: Optional[pd.DataFrame] = None, hwm: Optional[str] = None):
+    """
+    Replace customer_features (typed, keyed, indexed - see schema.py), its
+    BI rollup (rollup.py) and segment samples (segment_samples.py), and bump the feature version (feature_version.py)
+    so cached BI answers are dropped. When stats/hwm are given, also reset the
+    incremental bookkeeping so the next --mode incremental starts from here.
+    """
+    with bulk_transaction(engine) as conn:
+        write_frame(df, "customer_features", conn)
+        if stats is not None:
+            write_frame(stats, STATS_TABLE, conn)
+            _set_hwm(conn, hwm)
+        apply_indexes(conn)
+        bump_feature_version(conn)  # before the rollup and samples, which stamp it
+        refresh_rollup(conn)
+        refresh_segment_samples(conn)
     print(f"✅ Wrote {len(df):,} rows to 'customer_features'")
 
 
 # ------------------------------------------------------
-# STEP 5 — Main program
+# STEP 4b — Incremental mode
 # ------------------------------------------------------
-def main():
-    print(f"📦 Connecting to DB: {DB_URL}")
-    _require_tables_or_exit()
+# Assumes transactions.ts values sort correctly as stored (one consistent
+# timestamp format) and that late rows never arrive with ts < the last mark
+# (rows with ts equal to it are picked up: the scan is ts >= mark).
+def _get_hwm() -> Optional[str]:
+    if not _table_exists(STATE_TABLE):
+        return None
+    with engine.connect() as conn:
+        row = conn.execute(text(f"SELECT value FROM {STATE_TABLE} WHERE name = :k"), {"k": HWM_KEY}).fetchone()
+    return row[0] if row else None
+
+
+def _set_hwm(conn, hwm: Optional[str]) -> None:
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} (name TEXT PRIMARY KEY, value TEXT)"))
+    conn.execute(text(f"DELETE FROM {STATE_TABLE} WHERE name = :k"), {"k": HWM_KEY})
+    if hwm is not None:
+        conn.execute(text(f"INSERT INTO {STATE_TABLE} (name, value) VALUES (:k, :v)"), {"k": HWM_KEY, "v": str(hwm)})
+
+
+def _select_in(conn, sql: str, emails: List[str], chunk: int = 500) -> pd.DataFrame:
+    """Run `sql WHERE user_email IN (...)` in chunks (keeps bind-parameter counts small)."""
+    q = text(f"{sql} WHERE user_email IN :emails").bindparams(bindparam("emails", expanding=True))
+    frames = [pd.read_sql(q, conn, params={"emails": emails[i:i + chunk]}) for i in range(0, len(emails), chunk)]
+    if not frames:
+        return pd.read_sql(text(f"{sql} WHERE 1 = 0"), conn)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _delete_in(conn, table: str, emails: List[str], chunk: int = 500) -> None:
+    q = text(f"DELETE FROM {table} WHERE user_email IN :emails").bindparams(bindparam("emails", expanding=True))
+    for i in range(0, len(emails), chunk):
+        conn.execute(q, {"emails": emails[i:i + chunk]})
+
+
+def _history_stats(conn, emails: List[str]) -> pd.DataFrame:
+    """
+    Exact stats from all of each user's transactions (ix_transactions_user_ts).
+    A recount rather than a delta, so reading a transaction twice is harmless.
+    """
+    q = text("""
+        SELECT user_email, COUNT(product_id) AS purchase_frequency, MAX(ts) AS last_ts
+        FROM transactions
+        WHERE user_email IN :emails
+        GROUP BY user_email
+    """).bindparams(bindparam("emails", expanding=True))
+    frames = [pd.read_sql(q, conn, params={"emails": emails[i:i + 500]}) for i in range(0, len(emails), 500)]
+    if not frames:
+        return pd.DataFrame(columns=["user_email", "purchase_frequency", "last_ts"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def merge_stats(old: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """Fold delta stats into running stats: counts add up, last_ts keeps the max."""
+    both = pd.concat([old, delta], ignore_index=True)
+    both["last_ts"] = pd.to_datetime(both["last_ts"], errors="coerce", utc=True)
+    return (
+        both.groupby("user_email")
+            .agg(purchase_frequency=("purchase_frequency", "sum"), last_ts=("last_ts", "max"))
+            .reset_index()
+    )
 
-    leads, tx = _read_tables()
-    print(f"→ leads_scored rows: {len(leads):,}")
-    print(f"→ transactions rows: {len(tx):,}")
 
-    feats = build_features(leads, tx)
-    print("🧩 Preview of new features:")
-    print(feats.head(10).to_string(index=False))
+def _refresh_recency(conn) -> None:
+    """
+    recency_days depends on 'now', so unchanged users drift between builds.
+    Recompute it in-database from the running last_ts (no transaction scan).
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        days = "CAST(julianday('now') - julianday(s.last_ts) AS INTEGER)"
+    elif dialect == "postgresql":
+        days = "CAST(EXTRACT(DAY FROM (now() - CAST(s.last_ts AS timestamptz))) AS INTEGER)"
+    else:
+        # Portable fallback: compute in pandas (O(users)), write back with executemany
+        stats = pd.read_sql(text(f"SELECT user_email, last_ts FROM {STATS_TABLE}"), conn)
+        last_ts = pd.to_datetime(stats["last_ts"], errors="coerce", utc=True)
+        recency = (pd.Timestamp.now(tz="UTC") - last_ts).dt.days.fillna(365).astype(int)
+        conn.execute(
+            text("UPDATE customer_features SET recency_days = :r WHERE user_email = :e"),
+            [{"r": int(r), "e": e} for e, r in zip(stats["user_email"], recency)],
+        )
+        return
+    conn.execute(text(f"""
+        UPDATE customer_features SET recency_days = COALESCE(
+            (SELECT {days} FROM {STATS_TABLE} s WHERE s.user_email = customer_features.user_email),
+            365)
+    """))
+
+
+# Leads with no feature row yet, or whose lead columns changed since it was written
+STALE_LEADS_SQL = """
+    SELECT l.* FROM leads_scored l
+    LEFT JOIN customer_features f ON f.user_email = l.user_email
+    WHERE f.user_email IS NULL
+       OR f.p1 <> l.p1 OR (f.p1 IS NULL) <> (l.p1 IS NULL)
+       OR f.member_rating <> l.member_rating OR (f.member_rating IS NULL) <> (l.member_rating IS NULL)
+"""
 
-    write_features(feats)
-    print("🎉 Done.")
+# Feature rows whose lead was deleted
+GONE_LEADS_SQL = """
+    SELECT f.user_email FROM customer_features f
+    LEFT JOIN leads_scored l ON l.user_email = f.user_email
+    WHERE l.user_email IS NULL
+"""
 
 
-if __name__ == "__main__":
-    main()
-```
+def build_features_incremental() -> dict:
+    """
+    Recount the running per-user stats of users with transactions at or
+    after the stored high-water mark, and upsert only the affected
+    customer_features rows: those users, leads never featurized and leads
+    whose p1 / member_rating changed. Rows of deleted leads are removed.
+    Falls back to a full build when there is no previous state.
+    """
+    hwm = _get_hwm()
+    if hwm is None or not _table_exists("customer_features") or not _table_exists(STATS_TABLE):
+        print("ℹ️ No previous incremental state — running a full build.")
+        return build_full("auto")
+
+    with engine.connect() as conn:
+        # >= so rows written after the last build with ts equal to the mark are
+        # not skipped; their users are recounted, so nothing is counted twice
+        delta = pd.read_sql(
+            text("SELECT user_email, ts FROM transactions WHERE ts >= :hwm"),
+            conn, params={"hwm": hwm},
+        )
+    print(f"→ transactions since {hwm}: {len(delta):,}")
+    changed = sorted(delta["user_email"].dropna().unique())
+
+    with bulk_transaction(engine) as conn:
+        # Rows to upsert: users with new transactions + leads new or changed since
+        stale_leads = pd.read_sql(text(STALE_LEADS_SQL), conn)
+        leads = pd.concat([_select_in(conn, "SELECT * FROM leads_scored", changed), stale_leads], ignore_index=True)
+        leads = leads.drop_duplicates(subset=["user_email"])
+        gone = pd.read_sql(text(GONE_LEADS_SQL), conn)["user_email"].tolist()
+        _delete_in(conn, "customer_features", gone)
+
+        # Running stats: recounted for users with new transactions and for users
+        # the running table has never seen (e.g. not yet leads at the last build)
+        need = sorted(set(changed) | set(leads["user_email"]))
+        old = _select_in(conn, f"SELECT user_email, purchase_frequency, last_ts FROM {STATS_TABLE}", need)
+        old = old[~old["user_email"].isin(changed)]
+        recount = _history_stats(conn, sorted(set(need) - set(old["user_email"])))
+        recount["last_ts"] = pd.to_datetime(recount["last_ts"], errors="coerce", utc=True)
+        _delete_in(conn, STATS_TABLE, recount["user_email"].tolist())
+        write_frame(recount, STATS_TABLE, conn, if_exists="append")
+
+        stats = pd.concat([old, recount], ignore_index=True)
+        stats["last_ts"] = pd.to_datetime(stats["last_ts"], errors="coerce", utc=True)
+        stats["purchase_frequency"] = stats["purchase_frequency"].astype(int)
+        feats = features_from_stats(leads, stats)
+        upserted = feats["user_email"].tolist()
+        _delete_in(conn, "customer_features", upserted)
+        write_frame(feats, "customer_features", conn, if_exists="append")
+
+        _refresh_recency(conn)
+        new_hwm = str(delta["ts"].max()) if len(delta) else hwm
+        _set_hwm(conn, new_hwm)
+        apply_indexes(conn)
+        bump_feature_version(conn)
+        refresh_rollup(conn)  # recency moved for everyone, so rebuild rather than patch
+        refresh_segment_samples(conn)
+
+    print(f"✅ Upserted {len(upserted):,} rows, removed {len(gone):,} in 'customer_features' (hwm -> {new_hwm})")
+    return {"mode": "incremental", "new_transactions": len(delta), "upserted": len(upserted),
+            "removed": len(gone), "hwm": new_hwm}
+
+
+# ------------------------------------------------------
+# STEP 5 — Main program
+# ------------------------------------------------------
+def build_full(strategy: str = "auto", chunksize: int = STREAM_CHUNKSIZE, workers: int = WORKERS) -> dict:
+    if strategy == "auto":
+        if workers > 1 and supports_parallel():
+            strategy = "parallel"
+        else:
+            strategy = "pushdown" if supports_pushdown() else "stream"
+    if strategy == "parallel" and not supports_parallel():
+        print("⚠️ Worker processes can't share an in-memory SQLite database; streaming instead.")
+        strategy = "stream"
+    print(f"→ strategy: {strategy}")
+
+    if strategy == "pushdown":
+        feats, stats, hwm = read_features_pushdown()
+        print(f"→ users aggregated in-database: {len(feats):,}")
+    elif strategy == "stream":
+        with engine.connect() as conn:
+            leads = pd.read_sql(text("SELECT * FROM leads_scored"), conn)
+        stats, hwm = aggregate_transactions_streaming(chunksize)
+        feats = features_from_stats(leads, stats)
+        print(f"→ users aggregated from {chunksize:,}-row chunks: {len(stats):,}")
+    elif strategy == "parallel":
+        with engine.connect() as conn:
+            leads = pd.read_sql(text("SELECT * FROM leads_scored"), conn)
+        stats, hwm = aggregate_transactions_parallel(workers, chunksize)
+        feats = features_from_stats(leads, stats)
+        print(f"→ users aggregated across {workers} partitions: {len(stats):,}")
+    else:
+        leads, tx = _read_tables()
+        print(f"→ leads_scored rows: {len(leads):,}")
+        print(f"→ transactions rows: {len(tx):,}")
+        stats = aggregate_transactions(tx)
+        feats = features_from_stats(leads, stats)
+        hwm = str(tx["ts"].max()) if len(tx) else None
 
----
+    print("🧩 Preview of new features:")
+    print(feats.head(10).to_string(index=False))
 
-### 📝 How this file works (plain English):
+    write_features(feats, stats=stats, hwm=hwm)
+    return {"mode": "full", "strategy": strategy, "rows": len(feats), "hwm": hwm}
 
-1. **Connects to your database** (defaults to SQLite in `/data`).
-2. **Checks for two input tables**:
 
-   * `leads_scored` (basic info about leads/customers).
-   * `transactions` (history of purchases).
-3. **Calculates three key features**:
+def main():
+    ap = argparse.ArgumentParser(description="Build customer_features from leads_scored + transactions.")
+    ap.add_argument("--mode", choices=["full", "incremental"], default="full",
+                    help="full rebuild, or fold in only transactions newer than the last build.")
+    ap.add_argument("--strategy", choices=["auto", "pushdown", "stream", "parallel", "pandas"], default="auto",
+                    help="How a full build aggregates: in-database (pushdown), chunked (stream), "
+                         "partitioned across processes (parallel) or all in pandas.")
+    ap.add_argument("--chunksize", type=int, default=STREAM_CHUNKSIZE,
+                    help="Transactions per chunk for --strategy stream/parallel.")
+    ap.add_argument("--workers", type=int, default=WORKERS,
+                    help="Processes for --strategy parallel (auto picks parallel when > 1).")
+    args = ap.parse_args()
 
-   * How often people buy (frequency).
-   * How long since they last bought (recency).
-   * Their rating (comes from `leads_scored`).
-4. **Merges those into one clean table** called `customer_features`.
-5. **Saves it back** into the database so you can use it in Day 3.
+    print(f"📦 Connecting to DB: {DB_URL}")
+    _require_tables_or_exit()
 
----
+    if args.mode == "incremental":
+        build_features_incremental()
+    else:
+        build_full(args.strategy, chunksize=args.chunksize, workers=max(1, args.workers))
+    print("🎉 Done.")
 
-Do you want me to also make a **matching non-technical Day 2 checklist (like Day 1)** that you can print and tick off as you go?
 
+if __name__ == "__main__":
+    main()
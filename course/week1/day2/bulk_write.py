@@ -0,0 +1,146 @@
+# bulk_write.py
+"""
+Fast DataFrame -> table writes, shared by the seeders and the feature builder.
+
+Plain DataFrame.to_sql() sends one INSERT per row through SQLAlchemy. The
+bulk writer picks the fastest path per backend instead:
+
+  - sqlite       one executemany() of plain tuples (no per-row SQLAlchemy work)
+  - postgresql   COPY ... FROM STDIN (CSV), in batches
+  - anything     to_sql(method="multi") with a chunksize that stays under the
+                 driver's bind-parameter limit
+
+Usage:
+    from course.week1.day2.bulk_write import bulk_transaction, write_frame
+    with bulk_transaction(engine) as conn:
+        write_frame(df, "customer_features", conn)
+
+bulk_transaction() is engine.begin() plus, on SQLite, `synchronous=OFF` for
+the duration of the load (WAL stays on, so a crash can lose the load but
+cannot corrupt the file). SQLite refuses to change that setting inside a
+transaction, which is why it wraps the BEGIN rather than living in write_frame.
+
+Settings (.env): BULK_WRITE_METHOD (auto|executemany|copy|multi|pandas),
+BULK_BATCH_ROWS, BULK_MAX_PARAMS
+"""
+import io
+import os
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import pandas as pd
+from sqlalchemy.engine import Connection, Engine
+
+try:  # imported as course.week1.day2.bulk_write
+    from .db_engine import SQLITE_PRAGMAS
+    from .schema import create_table, declares
+except ImportError:  # run from inside day2/
+    from db_engine import SQLITE_PRAGMAS
+    from schema import create_table, declares
+
+METHOD = os.getenv("BULK_WRITE_METHOD", "auto")
+BATCH_ROWS = int(os.getenv("BULK_BATCH_ROWS", "100000"))   # rows per executemany / COPY batch
+MAX_PARAMS = int(os.getenv("BULK_MAX_PARAMS", "2000"))     # bind params per multi-row INSERT (SQL Server: 2100)
+MULTI_ROWS = 1000                                          # rows per multi-row INSERT, at most
+
+SQLITE_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+@contextmanager
+def bulk_transaction(engine: Engine) -> Iterator[Connection]:
+    """engine.begin() tuned for loads (SQLite: synchronous=OFF until commit)."""
+    with engine.connect() as conn:
+        sqlite = conn.dialect.name == "sqlite"
+        if sqlite:
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            conn.commit()
+        try:
+            with conn.begin():
+                yield conn
+        finally:
+            if sqlite:
+                conn.exec_driver_sql(f"PRAGMA synchronous={SQLITE_PRAGMAS['synchronous']}")
+                conn.commit()
+
+
+def resolve_method(dialect: str, method: str = METHOD) -> str:
+    if method != "auto":
+        return method
+    return {"sqlite": "executemany", "postgresql": "copy"}.get(dialect, "multi")
+
+
+def _sqlite_rows(df: pd.DataFrame) -> List[tuple]:
+    """
+    Plain Python tuples the sqlite3 module can bind. Datetimes are rendered
+    the way SQLAlchemy's SQLite DATETIME type (and so to_sql) stores them,
+    "YYYY-MM-DD HH:MM:SS.ffffff" without an offset, so stored strings - and
+    the high-water marks compared against them - keep one format.
+    """
+    cols = []
+    for name in df.columns:
+        s = df[name]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            if s.dt.tz is not None:
+                s = s.dt.tz_localize(None)  # wall-clock fields, as SQLAlchemy does
+            s = s.dt.strftime(SQLITE_DATETIME_FORMAT)
+        cols.append(s.astype(object).where(s.notna(), None).tolist())
+    return list(zip(*cols))
+
+
+def _write_executemany(df: pd.DataFrame, table: str, conn: Connection) -> None:
+    q = conn.dialect.identifier_preparer.quote
+    cols = ", ".join(q(c) for c in df.columns)
+    marks = ", ".join("?" for _ in df.columns)
+    sql = f"INSERT INTO {q(table)} ({cols}) VALUES ({marks})"
+    for start in range(0, len(df), BATCH_ROWS):
+        conn.exec_driver_sql(sql, _sqlite_rows(df.iloc[start:start + BATCH_ROWS]))
+
+
+def _write_copy(df: pd.DataFrame, table: str, conn: Connection) -> None:
+    q = conn.dialect.identifier_preparer.quote
+    cols = ", ".join(q(c) for c in df.columns)
+    sql = f"COPY {q(table)} ({cols}) FROM STDIN WITH (FORMAT csv)"
+    cur = conn.connection.dbapi_connection.cursor()
+    try:
+        for start in range(0, len(df), BATCH_ROWS):
+            buf = io.StringIO()
+            df.iloc[start:start + BATCH_ROWS].to_csv(buf, index=False, header=False)
+            buf.seek(0)
+            if hasattr(cur, "copy_expert"):  # psycopg2
+                cur.copy_expert(sql, buf)
+            else:                            # psycopg 3
+                with cur.copy(sql) as copy:
+                    copy.write(buf.getvalue())
+    finally:
+        cur.close()
+
+
+def write_frame(df: pd.DataFrame, table: str, conn: Connection,
+                if_exists: str = "replace", method: str = METHOD) -> int:
+    """
+    Write df to table on conn (inside the caller's transaction). On replace,
+    tables declared in schema.py are recreated typed, with their primary key;
+    anything else is created from df's dtypes exactly as to_sql would. Rows
+    then go in through the backend's bulk path. Returns the rows written.
+    """
+    if if_exists == "replace" and declares(table, df.columns):
+        create_table(conn, table)
+        if_exists = "append"
+    method = resolve_method(conn.dialect.name, method)
+    if method == "pandas":
+        df.to_sql(table, conn, if_exists=if_exists, index=False)
+        return len(df)
+    if method == "multi":
+        rows = max(1, min(MULTI_ROWS, MAX_PARAMS // max(1, len(df.columns))))
+        df.to_sql(table, conn, if_exists=if_exists, index=False, method="multi", chunksize=rows)
+        return len(df)
+
+    df.head(0).to_sql(table, conn, if_exists=if_exists, index=False)
+    if len(df):
+        if method == "copy":
+            _write_copy(df, table, conn)
+        elif method == "executemany":
+            _write_executemany(df, table, conn)
+        else:
+            raise ValueError(f"Unknown bulk write method: {method}")
+    return len(df)
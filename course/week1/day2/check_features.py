@@ -0,0 +1,152 @@
+# check_features.py
+"""
+Consistency check for the feature builder: every build mode/strategy must
+produce the customer_features table that a full pandas rebuild produces.
+Incremental builds are checked after appended transactions and new leads,
+after transactions stamped with exactly the last build's high-water mark,
+and after leads were changed (p1, member_rating) or deleted without any new
+transactions.
+
+Uses a throwaway SQLite file seeded with synthetic data (seed_sample_data),
+so it never touches your real DATABASE_URL.
+
+Run:
+  python check_features.py --leads 2000 --tx 20000
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+# Point every Day 2 module at a scratch database *before* importing them
+_TMP = tempfile.mkdtemp(prefix="features_check_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'check.db')}"
+
+import build_features as bf  # noqa: E402
+from seed_sample_data import make_leads_scored, make_transactions, write_table  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+
+def _current_features() -> pd.DataFrame:
+    with bf.engine.connect() as conn:
+        df = pd.read_sql(text("SELECT * FROM customer_features"), conn)
+    return df[bf.FEATURE_COLUMNS].sort_values("user_email").reset_index(drop=True)
+
+
+def _assert_same(label: str, got: pd.DataFrame, want: pd.DataFrame) -> bool:
+    """
+    Exact match, except recency_days may differ by one day: the two builds
+    read 'now' a few seconds apart, which can cross a day boundary.
+    """
+    try:
+        cols = [c for c in bf.FEATURE_COLUMNS if c != "recency_days"]
+        pd.testing.assert_frame_equal(got[cols], want[cols], check_dtype=False)
+        drift = (got["recency_days"] - want["recency_days"]).abs().max()
+        assert len(got) == 0 or drift <= 1, f"recency_days differs by up to {drift} days"
+    except AssertionError as e:
+        print(f"❌ {label}: differs from full rebuild\n{e}")
+        return False
+    print(f"✅ {label}: matches full rebuild ({len(got):,} rows)")
+    return True
+
+
+def _reference() -> pd.DataFrame:
+    bf.build_full("pandas")
+    return _current_features()
+
+
+def check_pushdown(n_leads: int, n_tx: int, seed: int) -> bool:
+    leads = make_leads_scored(n_leads, seed)
+    tx = make_transactions(leads, n_tx, seed + 100)
+    write_table(leads, "leads_scored")
+    write_table(tx, "transactions")
+
+    bf.build_full("pushdown")
+    pushed = _current_features()
+    return _assert_same("pushdown", pushed, _reference())
+
+
+def check_stream(n_leads: int, n_tx: int, seed: int) -> bool:
+    leads = make_leads_scored(n_leads, seed)
+    tx = make_transactions(leads, n_tx, seed + 100)
+    write_table(leads, "leads_scored")
+    write_table(tx, "transactions")
+
+    # Small chunks so accumulator compaction runs many times
+    bf.build_full("stream", chunksize=max(1, n_tx // 17))
+    streamed = _current_features()
+    return _assert_same("stream", streamed, _reference())
+
+
+def check_parallel(n_leads: int, n_tx: int, seed: int) -> bool:
+    leads = make_leads_scored(n_leads, seed)
+    tx = make_transactions(leads, n_tx, seed + 100)
+    write_table(leads, "leads_scored")
+    write_table(tx, "transactions")
+
+    bf.build_full("parallel", chunksize=max(1, n_tx // 17), workers=3)
+    partitioned = _current_features()
+    return _assert_same("parallel", partitioned, _reference())
+
+
+def check_incremental(n_leads: int, n_tx: int, seed: int) -> bool:
+    leads = make_leads_scored(n_leads, seed)
+    tx = make_transactions(leads, n_tx, seed + 100)  # sorted by ts
+    cut = int(len(tx) * 0.7)
+
+    # Build on the first 70%, then append the rest (+ a few brand-new leads)
+    new_leads = leads.tail(max(1, n_leads // 20))
+    write_table(leads.drop(new_leads.index), "leads_scored")
+    write_table(tx.iloc[:cut], "transactions")
+    bf.build_full("auto")
+
+    write_table(leads, "leads_scored")
+    with bf.engine.begin() as conn:
+        tx.iloc[cut:].to_sql("transactions", conn, if_exists="append", index=False)
+    ok = _incremental_matches("incremental")
+
+    # Late rows stamped with exactly the stored mark (the reference build just set it)
+    hwm = bf._get_hwm()
+    late = leads.sample(5, random_state=seed)[["user_email"]].assign(product_id="SKU-001", ts=hwm)
+    with bf.engine.begin() as conn:
+        late.to_sql("transactions", conn, if_exists="append", index=False)
+    ok &= _incremental_matches("incremental, transactions at the high-water mark")
+
+    # Leads edited or deleted, no new transactions
+    edited = leads.copy()
+    idle = ~edited["user_email"].isin(tx.iloc[cut:]["user_email"])
+    some = edited[idle].sample(min(20, int(idle.sum())), random_state=seed).index
+    edited.loc[some, "p1"] = (1 - edited.loc[some, "p1"]).round(4)
+    edited.loc[some, "member_rating"] = 6 - edited.loc[some, "member_rating"]
+    edited = edited.drop(edited.sample(10, random_state=seed + 1).index)
+    write_table(edited, "leads_scored")
+    ok &= _incremental_matches("incremental, leads changed and deleted")
+    return ok
+
+
+def _incremental_matches(label: str) -> bool:
+    bf.build_features_incremental()
+    incremental = _current_features()
+    return _assert_same(label, incremental, _reference())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check feature build modes against a full rebuild.")
+    ap.add_argument("--leads", type=int, default=2000)
+    ap.add_argument("--tx", type=int, default=20000)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    results = [
+        check_pushdown(args.leads, args.tx, args.seed),
+        check_stream(args.leads, args.tx, args.seed),
+        check_parallel(args.leads, args.tx, args.seed),
+        check_incremental(args.leads, args.tx, args.seed),
+    ]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
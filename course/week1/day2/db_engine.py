@@ -0,0 +1,110 @@
+# db_engine.py
+"""
+Shared SQLAlchemy engines — one per DATABASE_URL, reused by every module.
+
+Creating an engine per query throws away the connection pool, dialect
+initialization and (for SQLite) the open file handle. Import get_engine()
+instead of calling create_engine() yourself:
+
+    from course.week1.day2.db_engine import get_engine
+    with get_engine().connect() as conn:
+        ...
+
+Pooling:
+  - SQLite file:   QueuePool, WAL journal + reader-friendly PRAGMAs on every connection
+  - SQLite memory: StaticPool (one shared connection, otherwise each checkout is a new empty DB)
+  - Other URLs:    QueuePool with pre-ping and periodic recycling
+
+Settings (.env): DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE_S
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool, StaticPool
+
+load_dotenv()
+
+DEFAULT_SQLITE = "sqlite:///data/leads_scored_segmentation.db"
+DB_URL = os.getenv("DATABASE_URL", DEFAULT_SQLITE)
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_RECYCLE_S = int(os.getenv("DB_POOL_RECYCLE_S", "1800"))
+
+# Applied to every new SQLite connection (readers dominate: BI templates, samplers)
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",       # readers don't block the feature-build writer
+    "synchronous": "NORMAL",     # safe with WAL, far fewer fsyncs
+    "cache_size": "-65536",      # 64 MiB page cache
+    "mmap_size": "268435456",    # 256 MiB memory-mapped reads
+    "temp_store": "MEMORY",      # GROUP BY / ORDER BY temp b-trees in RAM
+    "busy_timeout": "5000",      # wait instead of failing on a locked DB
+}
+
+_ENGINES: Dict[str, Engine] = {}
+_LOCK = threading.Lock()
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def _make_engine(url: str) -> Engine:
+    if url.startswith("sqlite"):
+        if _is_sqlite_memory(url):
+            return create_engine(
+                url, future=True, poolclass=StaticPool,
+                connect_args={"check_same_thread": False},
+            )
+
+        # Make sure the /data folder exists
+        if url.startswith("sqlite:///"):
+            Path(url.replace("sqlite:///", "")).parent.mkdir(parents=True, exist_ok=True)
+
+        eng = create_engine(
+            url, future=True, poolclass=QueuePool,
+            pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW,
+            connect_args={"check_same_thread": False},
+        )
+
+        @event.listens_for(eng, "connect")
+        def _sqlite_pragmas(dbapi_conn, _record):
+            cur = dbapi_conn.cursor()
+            for name, value in SQLITE_PRAGMAS.items():
+                cur.execute(f"PRAGMA {name}={value}")
+            cur.close()
+
+        return eng
+
+    return create_engine(
+        url, future=True,
+        pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW,
+        pool_pre_ping=True, pool_recycle=POOL_RECYCLE_S,
+    )
+
+
+def get_engine(url: Optional[str] = None) -> Engine:
+    """Process-wide engine for url (defaults to DATABASE_URL)."""
+    url = url or DB_URL
+    with _LOCK:
+        eng = _ENGINES.get(url)
+        if eng is None:
+            eng = _ENGINES[url] = _make_engine(url)
+        return eng
+
+
+def dispose_engines(close: bool = True) -> None:
+    """
+    Close every pooled connection (tests, after bulk loads). In a forked
+    worker pass close=False: it drops the inherited pools without touching
+    connections the parent process is still using.
+    """
+    with _LOCK:
+        for eng in _ENGINES.values():
+            eng.dispose(close=close)
+        _ENGINES.clear()
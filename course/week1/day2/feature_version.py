@@ -0,0 +1,113 @@
+# feature_version.py
+"""
+Version token for customer_features, bumped by every writer of the table.
+
+Readers that cache answers derived from customer_features (the Day 5 BI
+result cache) key them on this token, so a rebuild invalidates them
+without anyone having to reach into the cache. The token lives in the
+feature builder's bookkeeping table (feature_build_state, name -> value)
+and is a fresh random value, not a counter, so a database that is deleted
+and re-seeded never reuses an old version.
+
+Bumped by: build_features.py (full + incremental), rollup.py (after a
+segment column is added), day3 seed_demo_data.py.
+
+Readers trust the token: looking it up is one key/value read, where
+checking customer_features itself would mean scanning it. So anything else
+that writes customer_features - the KMeans step assigning `segment`, rows
+loaded by hand - must bump it too, inside its own transaction:
+
+    with engine.begin() as conn:
+        ...  # write customer_features
+        bump_feature_version(conn)
+
+or, from outside Python, afterwards:
+
+  python feature_version.py
+
+Tables derived from customer_features (the rollup, the segment samples)
+record the version they were built from (stamp_source), so readers can
+tell when one is older than customer_features (built_from_current) and go
+to customer_features instead. A writer therefore bumps first and then
+rebuilds them, in the same transaction.
+"""
+import os
+import uuid
+from typing import Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+try:  # imported as course.week1.day2.feature_version
+    from .db_engine import get_engine
+except ImportError:  # run from inside day2/
+    from db_engine import get_engine
+
+load_dotenv()
+DEFAULT_SQLITE = "sqlite:///data/leads_scored_segmentation.db"
+DB_URL = os.getenv("DATABASE_URL", DEFAULT_SQLITE)
+
+STATE_TABLE = "feature_build_state"   # name -> value (shared with build_features' high-water mark)
+VERSION_KEY = "customer_features_version"
+SOURCE_KEY = "{table}.source"         # version a derived table was built from
+
+
+def _ensure_state(conn: Connection) -> None:
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} (name TEXT PRIMARY KEY, value TEXT)"))
+
+
+def _set_state(conn: Connection, name: str, value: str) -> None:
+    _ensure_state(conn)
+    conn.execute(text(f"DELETE FROM {STATE_TABLE} WHERE name = :k"), {"k": name})
+    conn.execute(text(f"INSERT INTO {STATE_TABLE} (name, value) VALUES (:k, :v)"), {"k": name, "v": value})
+
+
+def _get_state(conn: Connection, name: str) -> Optional[str]:
+    try:
+        row = conn.execute(text(f"SELECT value FROM {STATE_TABLE} WHERE name = :k"), {"k": name}).fetchone()
+    except DBAPIError:  # no state table yet
+        conn.rollback()
+        return None
+    return row[0] if row else None
+
+
+def bump_feature_version(conn: Connection) -> str:
+    """Store a new version token (inside the caller's transaction) and return it."""
+    version = uuid.uuid4().hex
+    _set_state(conn, VERSION_KEY, version)
+    return version
+
+
+def get_feature_version(conn: Connection) -> Optional[str]:
+    """Current token, or None if no writer has stamped this database yet."""
+    return _get_state(conn, VERSION_KEY)
+
+
+def stamp_source(conn: Connection, table: str) -> None:
+    """Record that `table` was just rebuilt from the current version (bump it first)."""
+    _ensure_state(conn)  # so the read below can't fail and abort the writer's transaction
+    _set_state(conn, SOURCE_KEY.format(table=table), get_feature_version(conn) or "")
+
+
+def built_from_current(conn: Connection, table: str, version: Optional[str] = None) -> bool:
+    """
+    True if `table` was built from the current version (pass `version` if
+    you already read it). False when it was never stamped or the database
+    has no version - rebuild it.
+    """
+    version = version if version is not None else get_feature_version(conn)
+    stamped = _get_state(conn, SOURCE_KEY.format(table=table))
+    return version is not None and stamped == version
+
+
+def main():
+    print(f"📦 Database: {DB_URL}")
+    with get_engine(DB_URL).begin() as conn:
+        version = bump_feature_version(conn)
+    print(f"✅ customer_features version is now {version} (cached BI answers retired)")
+
+
+if __name__ == "__main__":
+    main()
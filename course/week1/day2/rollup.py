@@ -0,0 +1,128 @@
+# rollup.py
+"""
+Pre-aggregated rollup of customer_features for the Day 5 BI templates.
+
+Every approved template is "GROUP BY segment" or "GROUP BY member_rating"
+with an optional `recency_days <= :days` filter. customer_features_rollup
+answers any of them by reading one row per (segment, member_rating) group
+instead of scanning every customer.
+
+The rollup is cumulative over recency: the row for recency_bucket = d holds
+count / sums / max over all customers of that group with recency_days <= d,
+for every d in 0..RECENCY_BUCKET_CAP, so a template only needs
+`WHERE recency_bucket = :days`. Because buckets are whole days and run one
+past safe_params.MAX_DAYS, answers for every allowed `days` are exact.
+recency_bucket = ALL_BUCKET (-1) holds the unfiltered totals (days=None,
+which also counts rows whose recency_days is NULL).
+
+The feature build refreshes the rollup after every full or incremental run
+and records which feature version it was built from (feature_version.py
+stamp_source). A writer outside the build (KMeans adding `segment`) bumps
+the version, so the stamp no longer matches and the Day 5 templates query
+customer_features until the rollup is refreshed (this bumps the version
+again and also resamples segment_samples.py's table, which groups by
+segment too):
+
+  python rollup.py
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+try:  # imported as course.week1.day2.rollup
+    from .bulk_write import write_frame
+    from .db_engine import get_engine
+    from .feature_version import bump_feature_version, stamp_source
+    from .schema import apply_indexes
+    from .segment_samples import SAMPLE_TABLE, refresh_segment_samples
+except ImportError:  # run from inside day2/
+    from bulk_write import write_frame
+    from db_engine import get_engine
+    from feature_version import bump_feature_version, stamp_source
+    from schema import apply_indexes
+    from segment_samples import SAMPLE_TABLE, refresh_segment_samples
+
+load_dotenv()
+DEFAULT_SQLITE = "sqlite:///data/leads_scored_segmentation.db"
+DB_URL = os.getenv("DATABASE_URL", DEFAULT_SQLITE)
+
+ROLLUP_TABLE = "customer_features_rollup"
+RECENCY_BUCKET_CAP = 3 * 365 + 1  # safe_params.MAX_DAYS + 1: "older than any filter"
+ALL_BUCKET = -1                   # no recency filter (days=None)
+
+SUMS = ["n", "sum_p1", "n_p1", "sum_purchase_frequency", "n_purchase_frequency"]
+
+# Per-day partial aggregates; negative recency (future timestamps) joins day 0,
+# which every allowed filter (days >= 1) includes anyway.
+ROLLUP_SELECT = """
+    SELECT
+        {segment} AS segment,
+        member_rating,
+        CASE
+            WHEN recency_days < 0 THEN 0
+            WHEN recency_days > {cap} THEN {cap}
+            ELSE recency_days
+        END AS recency_bucket,
+        COUNT(*) AS n,
+        SUM(p1) AS sum_p1,
+        COUNT(p1) AS n_p1,
+        SUM(purchase_frequency) AS sum_purchase_frequency,
+        COUNT(purchase_frequency) AS n_purchase_frequency,
+        MAX(purchase_frequency) AS max_purchase_frequency
+    FROM customer_features
+    GROUP BY 1, 2, 3
+"""
+
+
+def _cumulative(daily: pd.DataFrame) -> pd.DataFrame:
+    """Densify each (segment, member_rating) to every bucket and run the totals."""
+    keys = ["segment", "member_rating"]
+    known = daily[daily["recency_bucket"].notna()]
+
+    groups = daily[keys].drop_duplicates()
+    grid = groups.merge(pd.DataFrame({"recency_bucket": np.arange(RECENCY_BUCKET_CAP + 1)}), how="cross")
+    cum = grid.merge(known, on=keys + ["recency_bucket"], how="left").sort_values(keys + ["recency_bucket"])
+    cum[SUMS] = cum[SUMS].fillna(0)
+
+    g = cum.groupby(keys, dropna=False, sort=False)
+    cum[SUMS] = g[SUMS].cumsum()
+    cum["max_purchase_frequency"] = g["max_purchase_frequency"].cummax()
+    cum["max_purchase_frequency"] = cum.groupby(keys, dropna=False, sort=False)["max_purchase_frequency"].ffill()
+
+    totals = daily.groupby(keys, dropna=False).agg(
+        **{c: (c, "sum") for c in SUMS}, max_purchase_frequency=("max_purchase_frequency", "max"),
+    ).reset_index()
+    totals["recency_bucket"] = ALL_BUCKET
+    return pd.concat([cum, totals], ignore_index=True)
+
+
+def refresh_rollup(conn: Connection) -> int:
+    """Rebuild the rollup from customer_features (one GROUP BY scan) and stamp its source; returns its row count."""
+    columns = {c["name"] for c in inspect(conn).get_columns("customer_features")}
+    segment = "COALESCE(segment, -1)" if "segment" in columns else "-1"
+
+    daily = pd.read_sql(text(ROLLUP_SELECT.format(segment=segment, cap=RECENCY_BUCKET_CAP)), conn)
+    rollup = _cumulative(daily)
+    for c in rollup.columns.drop("sum_p1"):
+        rollup[c] = rollup[c].astype("Int64")
+    rows = write_frame(rollup, ROLLUP_TABLE, conn)
+    apply_indexes(conn, [ROLLUP_TABLE])
+    stamp_source(conn, ROLLUP_TABLE)
+    return rows
+
+
+def main():
+    print(f"📦 Database: {DB_URL}")
+    with get_engine(DB_URL).begin() as conn:
+        bump_feature_version(conn)  # segment answers changed too
+        rows = refresh_rollup(conn)
+        samples = refresh_segment_samples(conn)
+    print(f"✅ Rebuilt {ROLLUP_TABLE}: {rows:,} rows, {SAMPLE_TABLE}: {samples:,} rows")
+
+
+if __name__ == "__main__":
+    main()
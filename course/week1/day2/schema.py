@@ -0,0 +1,163 @@
+# schema.py
+"""
+Declared schema for the tables the feature build owns or reads hot (plus
+segment_insights, which Day 3's batch segment analysis upserts into).
+
+DataFrame.to_sql(if_exists="replace") guesses column types and creates no
+keys or indexes. Writers that own a table call create_table() (typed
+columns + primary key) and append into it; apply_indexes() then adds the
+secondary indexes after the bulk load, which is cheaper than maintaining
+them row by row.
+
+Indexes (covering = every column the query touches is in the index, so the
+table itself is never read):
+  customer_features (member_rating, recency_days, p1)                     rating templates
+  customer_features (segment, recency_days, p1, purchase_frequency)       segment templates,
+                                                                           WHERE segment = :sid
+  customer_features_rollup (recency_bucket)                               rollup templates
+  customer_features_sample  primary key (segment, sample_rank)            segment samples (day3)
+  transactions      (user_email, ts)                                      per-user history lookups
+  transactions      (ts)                                                  incremental ts >= :hwm scan
+
+An index is only created when all of its columns exist - `segment` appears
+once a segmentation step (KMeans) adds it, so re-run this file afterwards:
+
+  python schema.py          # apply missing indexes to DATABASE_URL
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table, Text, inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateTable
+
+try:  # imported as course.week1.day2.schema
+    from .db_engine import get_engine
+except ImportError:  # run from inside day2/
+    from db_engine import get_engine
+
+load_dotenv()
+DEFAULT_SQLITE = "sqlite:///data/leads_scored_segmentation.db"
+DB_URL = os.getenv("DATABASE_URL", DEFAULT_SQLITE)
+
+metadata = MetaData()
+
+TABLES: Dict[str, Table] = {
+    t.name: t for t in (
+        Table(
+            "customer_features", metadata,
+            Column("user_email", String(320), primary_key=True),
+            Column("p1", Float),
+            Column("member_rating", Integer),
+            Column("purchase_frequency", Integer, nullable=False),
+            Column("recency_days", Integer, nullable=False),
+        ),
+        Table(
+            "customer_tx_stats", metadata,
+            Column("user_email", String(320), primary_key=True),
+            Column("purchase_frequency", Integer, nullable=False),
+            Column("last_ts", DateTime(timezone=True)),
+        ),
+        Table(
+            # one row per (segment, member_rating, recency_bucket); see rollup.py
+            "customer_features_rollup", metadata,
+            Column("segment", Integer),
+            Column("member_rating", Integer),
+            Column("recency_bucket", Integer),
+            Column("n", Integer, nullable=False),
+            Column("sum_p1", Float),
+            Column("n_p1", Integer, nullable=False),
+            Column("sum_purchase_frequency", Integer),
+            Column("n_purchase_frequency", Integer, nullable=False),
+            Column("max_purchase_frequency", Integer),
+        ),
+        Table(
+            # up to SEGMENT_SAMPLE_SIZE random rows per segment; see segment_samples.py
+            "customer_features_sample", metadata,
+            Column("segment", Integer, primary_key=True),
+            Column("sample_rank", Integer, primary_key=True),
+            Column("p1", Float),
+            Column("member_rating", Integer),
+            Column("purchase_frequency", Integer),
+            Column("recency_days", Integer),
+        ),
+        Table(
+            # one row per segment, latest run wins; see day3/build_graph.py
+            "segment_insights", metadata,
+            Column("segment_id", Integer, primary_key=True),
+            Column("response", Text),
+            Column("insights", Text),
+            Column("summary_table", Text),
+            Column("sample_rows", Integer, nullable=False),
+            Column("latency_s", Float),
+            Column("created_at", DateTime),
+        ),
+        Table(
+            "transactions", metadata,
+            Column("user_email", String(320)),
+            Column("product_id", String(64)),
+            Column("ts", DateTime),
+        ),
+    )
+}
+
+# table -> [(index name, columns)]
+INDEXES: Dict[str, List[Tuple[str, List[str]]]] = {
+    "customer_features": [
+        ("ix_customer_features_rating", ["member_rating", "recency_days", "p1"]),
+        ("ix_customer_features_segment", ["segment", "recency_days", "p1", "purchase_frequency"]),
+    ],
+    "customer_features_rollup": [
+        ("ix_customer_features_rollup_bucket", ["recency_bucket"]),
+    ],
+    "transactions": [
+        ("ix_transactions_user_ts", ["user_email", "ts"]),
+        ("ix_transactions_ts", ["ts"]),
+    ],
+}
+
+
+def declares(name: str, columns) -> bool:
+    """True if `name` is declared here and every given column belongs to it."""
+    return name in TABLES and set(columns) <= set(TABLES[name].columns.keys())
+
+
+def create_table(conn: Connection, name: str) -> None:
+    """Drop `name` if present and create it from its declaration (no secondary indexes yet)."""
+    table = TABLES[name]
+    table.drop(conn, checkfirst=True)
+    conn.execute(CreateTable(table))
+
+
+def apply_indexes(conn: Connection, tables: Optional[List[str]] = None) -> List[str]:
+    """
+    Create every declared index that is missing and whose columns exist.
+    Returns the names created. Safe to call repeatedly.
+    """
+    created = []
+    insp = inspect(conn)
+    for table in tables or list(INDEXES):
+        if not insp.has_table(table):
+            continue
+        columns = {c["name"] for c in insp.get_columns(table)}
+        existing = {ix["name"] for ix in insp.get_indexes(table)}
+        q = conn.dialect.identifier_preparer.quote
+        missing = [(n, cols) for n, cols in INDEXES.get(table, []) if n not in existing and set(cols) <= columns]
+        for name, cols in missing:
+            conn.exec_driver_sql(f"CREATE INDEX {q(name)} ON {q(table)} ({', '.join(q(c) for c in cols)})")
+            created.append(name)
+        if missing and conn.dialect.name == "sqlite":
+            conn.exec_driver_sql(f"ANALYZE {q(table)}")  # row counts for the planner
+    return created
+
+
+def main():
+    print(f"📦 Database: {DB_URL}")
+    with get_engine(DB_URL).begin() as conn:
+        created = apply_indexes(conn)
+    print(f"✅ Created indexes: {created}" if created else "✅ All applicable indexes already exist.")
+
+
+if __name__ == "__main__":
+    main()
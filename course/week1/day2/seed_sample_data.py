@@ -9,27 +9,39 @@ Tables created (replace if already exist):
 Usage:
   DATABASE_URL (optional) in .env, defaults to sqlite:///data/leads_scored_segmentation.db
   python seed_sample_data.py
+  python seed_sample_data.py --leads 500000 --tx 10000000 --seed 7   # load-test sizes
+
+Everything is generated with NumPy array operations (no per-row Python), and
+transactions are produced and written in --chunk-rows pieces, so 100M-row
+tables never have to fit in memory at once.
 """
 
+import argparse
 import os
-from pathlib import Path
-from datetime import datetime, timedelta, timezone
+import time
+from datetime import datetime, timezone
+from typing import Iterator
 import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from dotenv import load_dotenv
 
+try:  # imported as course.week1.day2.seed_sample_data
+    from .bulk_write import bulk_transaction, write_frame
+    from .db_engine import get_engine
+    from .schema import apply_indexes
+except ImportError:  # run from inside day2/
+    from bulk_write import bulk_transaction, write_frame
+    from db_engine import get_engine
+    from schema import apply_indexes
+
 load_dotenv()
 
 DEFAULT_SQLITE = "sqlite:///data/leads_scored_segmentation.db"
 DB_URL = os.getenv("DATABASE_URL", DEFAULT_SQLITE)
 
-# Ensure local data dir exists for SQLite
-if DB_URL.startswith("sqlite:///"):
-    data_dir = Path(DB_URL.replace("sqlite:///", "")).parent
-    data_dir.mkdir(parents=True, exist_ok=True)
-
-engine = create_engine(DB_URL, future=True)
+# Shared engine (creates the local data dir for SQLite)
+engine = get_engine(DB_URL)
 
 # -----------------------
 # Configurable parameters
@@ -37,6 +49,7 @@ engine = create_engine(DB_URL, future=True)
 RANDOM_SEED = 42
 N_LEADS = 500
 N_TX = 2000
+CHUNK_ROWS = 1_000_000  # transactions generated + written per chunk
 
 PRODUCTS = [f"SKU-{i:03d}" for i in range(1, 51)]  # 50 products
 DOMAINS = ["example.com", "sample.org", "mail.net", "demo.io"]
@@ -61,9 +74,9 @@ def random_emails(n: int, seed: int) -> np.ndarray:
     first = rng.choice(firsts, size=n)
     last = rng.choice(lasts, size=n)
     dom = rng.choice(doms, size=n)
-    # add a numeric suffix to reduce collisions
-    suffix = rng.integers(1, 9999, size=n)
-    emails = np.char.add(np.char.add(np.char.add(first, "."), last), np.char.add(suffix.astype(str), "@" + dom))
+    # numeric suffixes drawn without replacement -> every email is unique
+    suffix = rng.choice(max(9999, n), size=n, replace=False) + 1
+    emails = np.char.add(np.char.add(np.char.add(first, "."), last), np.char.add(suffix.astype(str), np.char.add("@", dom)))
     return emails
 
 
@@ -77,63 +90,109 @@ def make_leads_scored(n_leads: int, seed: int) -> pd.DataFrame:
     # p1: probability-like score 0..1 (beta distribution for realism)
     p1 = rng.beta(a=2.0, b=3.0, size=n_leads)  # more mass around ~0.4
 
-    df = pd.DataFrame({
+    return pd.DataFrame({
         "user_email": emails,
         "p1": np.round(p1, 4),
         "member_rating": member_rating.astype(int),
     })
 
-    # small chance of duplicates -> drop to ensure uniqueness
-    df = df.drop_duplicates(subset=["user_email"]).reset_index(drop=True)
-    return df
-
 
-def random_timestamps(n: int, seed: int) -> np.ndarray:
+def random_timestamps(n: int, seed: int, start_s: int = 0, end_s: int = DAYS_BACK * 24 * 3600) -> np.ndarray:
+    """
+    n UTC timestamps (naive datetime64[ns]) uniformly between end_s and
+    start_s seconds before NOW. Pure datetime64 arithmetic.
+    """
     rng = np.random.default_rng(seed)
-    # generate days ago uniformly, then add random seconds within the day
-    days_ago = rng.integers(0, DAYS_BACK, size=n)
-    secs = rng.integers(0, 24*3600, size=n)
-    ts = [NOW - timedelta(days=int(d), seconds=int(s)) for d, s in zip(days_ago, secs)]
-    return np.array(ts, dtype="datetime64[ns]")
+    now = np.datetime64(NOW.replace(tzinfo=None), "us")
+    secs_ago = rng.integers(start_s, end_s, size=n).astype("timedelta64[s]")
+    return (now - secs_ago).astype("datetime64[ns]")
 
 
-def make_transactions(leads_df: pd.DataFrame, n_tx: int, seed: int) -> pd.DataFrame:
-    rng = np.random.default_rng(seed)
+def _buyer_cdf(leads_df: pd.DataFrame) -> np.ndarray:
     # Bias: users with higher p1 & rating transact a bit more often
-    weights = (0.5 + 0.5*leads_df["p1"]) * (0.5 + 0.5*(leads_df["member_rating"] / 5.0))
+    weights = (0.5 + 0.5*leads_df["p1"].to_numpy()) * (0.5 + 0.5*(leads_df["member_rating"].to_numpy() / 5.0))
     weights = np.clip(weights, 1e-3, None)
-    weights = weights / weights.sum()
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
 
-    buyer_idx = rng.choice(leads_df.index.values, size=n_tx, replace=True, p=weights)
-    user_emails = leads_df.loc[buyer_idx, "user_email"].to_numpy()
-    product_ids = rng.choice(PRODUCTS, size=n_tx, replace=True)
 
-    ts = random_timestamps(n_tx, seed + 1)
+def _transactions_chunk(emails: np.ndarray, cdf: np.ndarray, n: int, seed: int, start_s: int, end_s: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    buyer_idx = np.minimum(np.searchsorted(cdf, rng.random(n), side="right"), len(cdf) - 1)
+    product_ids = np.asarray(PRODUCTS)[rng.integers(0, len(PRODUCTS), size=n)]
+    ts = np.sort(random_timestamps(n, seed + 1, start_s, end_s))
+    return pd.DataFrame({"user_email": emails[buyer_idx], "product_id": product_ids, "ts": ts})
 
-    tx = pd.DataFrame({
-        "user_email": user_emails,
-        "product_id": product_ids,
-        "ts": pd.to_datetime(ts).astype("datetime64[ns]"),
-    }).sort_values("ts").reset_index(drop=True)
 
-    return tx
+def make_transactions(leads_df: pd.DataFrame, n_tx: int, seed: int) -> pd.DataFrame:
+    """All n_tx transactions in one DataFrame, sorted by ts."""
+    emails = leads_df["user_email"].to_numpy()
+    return _transactions_chunk(emails, _buyer_cdf(leads_df), n_tx, seed, 0, DAYS_BACK * 24 * 3600)
+
+
+def iter_transactions(leads_df: pd.DataFrame, n_tx: int, seed: int, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Same distribution as make_transactions, yielded in chunk_rows pieces.
+    Each chunk owns a disjoint slice of the time window (oldest first), so
+    the concatenated stream is still sorted by ts.
+    """
+    emails = leads_df["user_email"].to_numpy()
+    cdf = _buyer_cdf(leads_df)
+    window = DAYS_BACK * 24 * 3600
+    n_chunks = max(1, -(-n_tx // chunk_rows))
+    child_seeds = np.random.SeedSequence(seed).generate_state(n_chunks)
+    for i in range(n_chunks):
+        n = min(chunk_rows, n_tx - i * chunk_rows)
+        # chunk 0 is the oldest slice: seconds-ago range [hi, lo) shrinks toward now
+        lo = window * (n_chunks - i - 1) // n_chunks
+        hi = max(lo + 1, window * (n_chunks - i) // n_chunks)
+        yield _transactions_chunk(emails, cdf, n, int(child_seeds[i]), lo, hi)
 
 
 def write_table(df: pd.DataFrame, name: str):
-    with engine.begin() as conn:
-        df.to_sql(name, conn, if_exists="replace", index=False)
+    with bulk_transaction(engine) as conn:
+        write_frame(df, name, conn)
+        apply_indexes(conn, [name])
     print(f"✅ Wrote {len(df):,} rows to table: {name}")
 
 
-def main():
-    print(f"📦 Database: {DB_URL}")
-    np.random.seed(RANDOM_SEED)
+def write_table_chunks(chunks: Iterator[pd.DataFrame], name: str) -> int:
+    """Replace `name` with the concatenation of chunks, in one transaction."""
+    rows = 0
+    with bulk_transaction(engine) as conn:
+        for i, df in enumerate(chunks):
+            rows += write_frame(df, name, conn, if_exists="replace" if i == 0 else "append")
+        apply_indexes(conn, [name])  # after the load: one index build instead of per-row upkeep
+    print(f"✅ Wrote {rows:,} rows to table: {name}")
+    return rows
 
-    leads = make_leads_scored(N_LEADS, RANDOM_SEED)
+
+def seed_tables(n_leads: int = N_LEADS, n_tx: int = N_TX, seed: int = RANDOM_SEED, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Generate + write leads_scored and transactions; returns rows and timings."""
+    t0 = time.perf_counter()
+    leads = make_leads_scored(n_leads, seed)
     write_table(leads, "leads_scored")
+    t1 = time.perf_counter()
+    write_table_chunks(iter_transactions(leads, n_tx, seed + 100, chunk_rows), "transactions")
+    t2 = time.perf_counter()
+    return {"leads": len(leads), "tx": n_tx, "leads_s": t1 - t0, "tx_s": t2 - t1}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Seed leads_scored + transactions with synthetic data.")
+    ap.add_argument("--leads", type=int, default=N_LEADS)
+    ap.add_argument("--tx", type=int, default=N_TX)
+    ap.add_argument("--seed", type=int, default=RANDOM_SEED)
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Transactions generated + written per chunk.")
+    args = ap.parse_args()
+
+    print(f"📦 Database: {DB_URL}")
+    r = seed_tables(args.leads, args.tx, args.seed, args.chunk_rows)
+    print(f"⏱️ leads_scored: {r['leads'] / r['leads_s']:,.0f} rows/s   transactions: {r['tx'] / r['tx_s']:,.0f} rows/s")
 
-    tx = make_transactions(leads, N_TX, RANDOM_SEED + 100)
-    write_table(tx, "transactions")
+    with engine.connect() as conn:
+        leads = pd.read_sql(text("SELECT * FROM leads_scored LIMIT 5"), conn)
+        tx = pd.read_sql(text("SELECT * FROM transactions LIMIT 5"), conn)
 
     # quick previews
     print("\n🔎 leads_scored preview:")
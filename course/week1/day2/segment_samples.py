@@ -0,0 +1,93 @@
+# segment_samples.py
+"""
+Precomputed random sample of customer_features per segment, for the Day 3
+segment analyzer.
+
+`SELECT * ... WHERE segment = :sid LIMIT :lim` returned whichever rows the
+index happened to list first (not a random sample), read every column
+(user_email included), and took the first rows of the whole table when
+there was no segment column yet. customer_features_sample instead holds up to
+SEGMENT_SAMPLE_SIZE uniformly random rows per segment, ranked 1..n in
+random order, with only the columns the analyzer profiles. The first `lim`
+ranks of a segment are themselves a uniform random sample, so
+
+  SELECT ... FROM customer_features_sample
+  WHERE segment = :sid AND sample_rank <= :lim ORDER BY sample_rank
+
+is a primary-key range read of `lim` rows, however big customer_features is.
+
+Rows whose segment is NULL, or every row when there is no segment column,
+are sampled under segment = -1 (as in rollup.py).
+
+The feature build refreshes the samples with the rollup and records which
+feature version they were built from (feature_version.py stamp_source). A
+writer outside the build (KMeans adding `segment`) bumps the version, so
+the stamp no longer matches and Day 3 reads customer_features directly
+until the samples are refreshed:
+
+  python segment_samples.py
+
+Settings (.env): SEGMENT_SAMPLE_SIZE
+"""
+import os
+from typing import List
+
+from dotenv import load_dotenv
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+try:  # imported as course.week1.day2.segment_samples
+    from .db_engine import get_engine
+    from .feature_version import stamp_source
+    from .schema import create_table
+except ImportError:  # run from inside day2/
+    from db_engine import get_engine
+    from feature_version import stamp_source
+    from schema import create_table
+
+load_dotenv()
+DEFAULT_SQLITE = "sqlite:///data/leads_scored_segmentation.db"
+DB_URL = os.getenv("DATABASE_URL", DEFAULT_SQLITE)
+
+SAMPLE_TABLE = "customer_features_sample"
+SAMPLE_SIZE = int(os.getenv("SEGMENT_SAMPLE_SIZE", "5000"))  # rows kept per segment = largest useful --limit
+SAMPLE_COLUMNS = ["p1", "member_rating", "purchase_frequency", "recency_days"]
+NO_SEGMENT = -1
+
+
+def sample_columns(conn: Connection) -> List[str]:
+    """SAMPLE_COLUMNS that customer_features actually has."""
+    columns = {c["name"] for c in inspect(conn).get_columns("customer_features")}
+    return [c for c in SAMPLE_COLUMNS if c in columns]
+
+
+def refresh_segment_samples(conn: Connection, per_segment: int = SAMPLE_SIZE) -> int:
+    """Resample every segment from customer_features (one windowed scan) and stamp its source; returns rows kept."""
+    columns = {c["name"] for c in inspect(conn).get_columns("customer_features")}
+    segment = f"COALESCE(segment, {NO_SEGMENT})" if "segment" in columns else str(NO_SEGMENT)
+    cols = ", ".join(c for c in SAMPLE_COLUMNS if c in columns)
+
+    create_table(conn, SAMPLE_TABLE)
+    conn.execute(text(f"""
+        INSERT INTO {SAMPLE_TABLE} (segment, sample_rank, {cols})
+        SELECT segment, sample_rank, {cols}
+        FROM (
+            SELECT {segment} AS segment, {cols},
+                   ROW_NUMBER() OVER (PARTITION BY {segment} ORDER BY random()) AS sample_rank
+            FROM customer_features
+        ) s
+        WHERE sample_rank <= :n
+    """), {"n": per_segment})
+    stamp_source(conn, SAMPLE_TABLE)
+    return conn.execute(text(f"SELECT COUNT(*) FROM {SAMPLE_TABLE}")).scalar_one()
+
+
+def main():
+    print(f"📦 Database: {DB_URL}")
+    with get_engine(DB_URL).begin() as conn:
+        rows = refresh_segment_samples(conn)
+    print(f"✅ Rebuilt {SAMPLE_TABLE}: {rows:,} rows (≤ {SAMPLE_SIZE:,} per segment)")
+
+
+if __name__ == "__main__":
+    main()
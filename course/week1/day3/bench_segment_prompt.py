@@ -0,0 +1,123 @@
+# bench_segment_prompt.py
+"""
+Prompt size and latency: raw sample rows vs the statistical profile.
+
+For each --limit the script samples one segment with sample_segment_rows(),
+builds the analyzer prompt both ways (SEGMENT_PROMPT=rows / profile) and
+reports prompt size, local prep time, whether any user_email made it into
+the prompt, and the time of one analyzer call.
+
+By default Claude is a local stub server, so tokens are estimated as
+chars / 4 and the call time only covers building, sending and parsing the
+request (the stub doesn't slow down for longer prompts the way the model
+does). With --live the calls go to the configured Anthropic API: token
+counts come from messages.count_tokens and the latency is the real one.
+
+Run:
+  python bench_segment_prompt.py --rows 100000 --limits 50,500,5000
+  python bench_segment_prompt.py --live --limits 50,500     # uses ANTHROPIC_API_KEY
+"""
+from __future__ import annotations
+import argparse, json, os, statistics, sys, tempfile, time
+from contextlib import nullcontext
+from pathlib import Path
+
+# Scratch database - set *before* importing build_graph
+_TMP = tempfile.mkdtemp(prefix="segment_prompt_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'bench.db')}"
+
+DAY1 = Path(__file__).resolve().parents[1] / "day1"
+if str(DAY1) not in sys.path:
+    sys.path.append(str(DAY1))  # after day3, which has its own segment_analyzer_node
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from fake_anthropic_server import FakeAnthropicServer  # noqa: E402
+from course.week1.day1.anthropic_client import get_client  # noqa: E402
+from course.week1.day2.bulk_write import bulk_transaction, write_frame  # noqa: E402
+from course.week1.day2.db_engine import get_engine  # noqa: E402
+from course.week1.day2.schema import apply_indexes  # noqa: E402
+from build_graph import DB_URL, sample_segment_rows  # noqa: E402
+from segment_analyzer_node import SYSTEM, build_prompt  # noqa: E402
+
+REPLY = json.dumps({
+    "response": "Segment 2 is engaged and recent.",
+    "insights": ["High p1", "Recent buyers"],
+    "summary_table": [{"metric": "avg_p1", "value": "0.41"}],
+})
+
+
+def _seed(rows: int, seed: int = 7) -> None:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "user_email": [f"user{i}@example.com" for i in range(rows)],
+        "p1": rng.beta(2.0, 3.0, rows).round(4),
+        "member_rating": rng.integers(1, 6, rows),
+        "purchase_frequency": rng.poisson(4, rows),
+        "recency_days": rng.integers(0, 365, rows),
+        "segment": rng.integers(0, 5, rows),
+    })
+    with bulk_transaction(get_engine(DB_URL)) as conn:
+        write_frame(df, "customer_features", conn)
+        apply_indexes(conn)
+
+
+def _tokens(client, prompt: str, live: bool) -> int:
+    if not live:
+        return len(SYSTEM + prompt) // 4
+    return client.client.messages.count_tokens(
+        model=client.model, system=SYSTEM, messages=[{"role": "user", "content": prompt}],
+    ).input_tokens
+
+
+def _measure(client, state: dict, mode: str, repeat: int, live: bool) -> dict:
+    t0 = time.perf_counter()
+    prompt = build_prompt(state, mode=mode)
+    prep_s = time.perf_counter() - t0
+    calls = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        client.json_call(system=SYSTEM, user=prompt, max_tokens=700, use_cache=False)
+        calls.append(time.perf_counter() - t0)
+    return {
+        "chars": len(prompt),
+        "tokens": _tokens(client, prompt, live),
+        "prep_ms": prep_s * 1000,
+        "call_ms": statistics.median(calls) * 1000,
+        "emails": "@" in prompt,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Raw-row vs profile prompt size and latency for the segment analyzer.")
+    ap.add_argument("--rows", type=int, default=100_000, help="Synthetic customer_features rows.")
+    ap.add_argument("--limits", type=str, default="50,500,5000", help="Comma list of sample sizes.")
+    ap.add_argument("--segment", type=int, default=2)
+    ap.add_argument("--repeat", type=int, default=3, help="Analyzer calls per (limit, mode); median reported.")
+    ap.add_argument("--live", action="store_true", help="Call the real Anthropic API instead of the stub.")
+    ap.add_argument("--llm-ms", type=float, default=300.0, help="Stub Claude latency per call.")
+    args = ap.parse_args()
+
+    _seed(args.rows)
+    if not args.live:
+        os.environ.setdefault("ANTHROPIC_API_KEY", "bench-key")
+    stub = nullcontext() if args.live else FakeAnthropicServer(reply_text=REPLY, delay_s=args.llm_ms / 1000)
+    with stub as srv:
+        if srv is not None:
+            os.environ["ANTHROPIC_BASE_URL"] = srv.base_url
+        client = get_client()
+        print(f"customer_features rows: {args.rows:,}  segment: {args.segment}  "
+              f"{'live API' if args.live else f'stub LLM {args.llm_ms:.0f} ms/call, tokens ≈ chars/4'}")
+        for limit in (int(x) for x in args.limits.split(",")):
+            df = sample_segment_rows(args.segment, limit=limit)
+            state = {"segment_id": args.segment, "sample_df_json": df.to_json(orient="records")}
+            for mode in ("rows", "profile"):
+                m = _measure(client, state, mode, args.repeat, args.live)
+                print(f"limit={limit:<5} {mode:<8} rows={len(df):<5} prompt={m['chars']:>8,} chars  "
+                      f"tokens={m['tokens']:>7,}  prep={m['prep_ms']:6.2f} ms  call={m['call_ms']:7.1f} ms  "
+                      f"emails in prompt: {'yes' if m['emails'] else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
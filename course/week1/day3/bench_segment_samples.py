@@ -0,0 +1,96 @@
+# bench_segment_samples.py
+"""
+sample_segment_rows(): old `SELECT * ... WHERE segment = :sid LIMIT :lim`
+vs the precomputed customer_features_sample (day2/segment_samples.py).
+
+For each table size the script seeds a throwaway SQLite file, builds the
+sample table, then times both reads and compares each sample's mean
+recency_days / p1 with the segment's true mean. The old query follows
+the (segment, recency_days, ...) index, so it returns the segment's most
+recent customers, not a random slice of it.
+
+Run:
+  python bench_segment_samples.py --sizes 10000,100000,1000000 --limit 500
+"""
+from __future__ import annotations
+import argparse, os, statistics, tempfile, time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# Scratch database - set *before* importing build_graph
+_TMP = tempfile.mkdtemp(prefix="segment_samples_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'bench.db')}"
+
+from course.week1.day2.bulk_write import bulk_transaction, write_frame  # noqa: E402
+from course.week1.day2.db_engine import get_engine  # noqa: E402
+from course.week1.day2.feature_version import bump_feature_version  # noqa: E402
+from course.week1.day2.schema import apply_indexes  # noqa: E402
+from course.week1.day2.segment_samples import refresh_segment_samples  # noqa: E402
+from build_graph import DB_URL, sample_segment_rows  # noqa: E402
+
+OLD_SQL = text("SELECT * FROM customer_features WHERE segment = :sid LIMIT :lim")
+
+
+def _seed(rows: int, seed: int = 7) -> float:
+    """Write customer_features + samples; returns the sample refresh time."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "user_email": [f"user{i}@example.com" for i in range(rows)],
+        "p1": rng.beta(2.0, 3.0, rows).round(4),
+        "member_rating": rng.integers(1, 6, rows),
+        "purchase_frequency": rng.poisson(4, rows),
+        "recency_days": rng.integers(0, 365, rows),
+        "segment": rng.integers(0, 5, rows),
+    })
+    with bulk_transaction(get_engine(DB_URL)) as conn:
+        write_frame(df, "customer_features", conn)
+        apply_indexes(conn)
+        bump_feature_version(conn)
+        t0 = time.perf_counter()
+        refresh_segment_samples(conn)
+        refresh_s = time.perf_counter() - t0
+    return refresh_s
+
+
+def _timed(fn, repeat: int):
+    fn()  # warm-up (metadata lookup, page cache)
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return out, statistics.median(times) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Old LIMIT sample vs precomputed segment sample.")
+    ap.add_argument("--sizes", type=str, default="10000,100000,1000000", help="Comma list of table sizes.")
+    ap.add_argument("--limit", type=int, default=500)
+    ap.add_argument("--segment", type=int, default=2)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    eng = get_engine(DB_URL)
+    for rows in (int(x) for x in args.sizes.split(",")):
+        refresh_s = _seed(rows)
+        with eng.connect() as c:
+            truth = pd.read_sql(text("SELECT AVG(recency_days) AS r, AVG(p1) AS p FROM customer_features "
+                                     "WHERE segment = :sid"), c, params={"sid": args.segment}).iloc[0]
+
+        def old():
+            with eng.connect() as c:
+                return pd.read_sql(OLD_SQL, c, params={"sid": args.segment, "lim": args.limit})
+
+        old_df, old_ms = _timed(old, args.repeat)
+        new_df, new_ms = _timed(lambda: sample_segment_rows(args.segment, args.limit), args.repeat)
+        print(f"rows={rows:>9,}  sample refresh {refresh_s * 1000:7.1f} ms")
+        print(f"  old LIMIT   {old_ms:6.2f} ms  cols={len(old_df.columns)}  "
+              f"recency {old_df['recency_days'].mean():6.1f} (true {truth['r']:.1f})  p1 {old_df['p1'].mean():.3f} (true {truth['p']:.3f})")
+        print(f"  precomputed {new_ms:6.2f} ms  cols={len(new_df.columns)}  "
+              f"recency {new_df['recency_days'].mean():6.1f} (true {truth['r']:.1f})  p1 {new_df['p1'].mean():.3f} (true {truth['p']:.3f})")
+
+
+if __name__ == "__main__":
+    main()
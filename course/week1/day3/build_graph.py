@@ -4,43 +4,137 @@ Compiles START -> segment_analyzer -> END and provides helpers to
 fetch a sample from the DB and invoke the graph.
 
 Usage (from other modules):
-    from build_graph import invoke_segment_analysis
+    from build_graph import invoke_segment_analysis, analyze_segments
     result = invoke_segment_analysis(segment_id=2, limit=50)
+    batch = analyze_segments(limit=50)            # every segment, one run
+
+The graph is compiled once per process (get_app); call warmup() at startup
+and reset_app() when a test needs a fresh compile.
+
+Samples come from customer_features_sample, a random per-segment sample the
+Day 2 build refreshes (day2/segment_samples.py), so a preview costs the same
+for any table size; table metadata is cached per feature version. A sample
+built from an older version of customer_features (before KMeans added
+`segment`, say) is not used: previews read customer_features instead.
+
+analyze_segments() fetches the samples for all requested segments in one
+query, runs the graph for each on a bounded thread pool (the Claude calls
+are I/O-bound, so they overlap), and upserts one row per segment into
+segment_insights.
+
+Settings (.env): DATABASE_URL, SEGMENT_WORKERS
 """
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 import pandas as pd
-from sqlalchemy import create_engine, text
-from typing import Dict, Any
+from sqlalchemy import bindparam, inspect, text
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph, START, END
 
+from course.week1.day2.bulk_write import write_frame
+from course.week1.day2.db_engine import get_engine
+from course.week1.day2.feature_version import built_from_current, get_feature_version
+from course.week1.day2.schema import TABLES
+from course.week1.day2.segment_samples import NO_SEGMENT, SAMPLE_TABLE, sample_columns
 from state_types import GraphState
 from segment_analyzer_node import segment_analyzer
 
 load_dotenv()
 DB_URL = os.getenv("DATABASE_URL", "sqlite:///data/leads_scored_segmentation.db")
+SEGMENT_WORKERS = int(os.getenv("SEGMENT_WORKERS", "4"))  # concurrent graph runs (Claude calls) per batch
+INSIGHTS_TABLE = "segment_insights"
+
+@lru_cache(maxsize=8)
+def _layout(db_url: str, version: Optional[str]) -> Tuple[bool, bool, str]:
+    """(has segment column, has an up-to-date sample table, projected column list), per feature version."""
+    with get_engine(db_url).connect() as c:
+        insp = inspect(c)
+        has_sample = insp.has_table(SAMPLE_TABLE) and built_from_current(c, SAMPLE_TABLE, version)
+        has_segment = "segment" in {col["name"] for col in insp.get_columns("customer_features")}
+        cols = ", ".join(sample_columns(c))
+    return has_segment, has_sample, cols
+
+def _table_layout(c) -> Tuple[bool, bool, str]:
+    """
+    Table metadata, looked up once per feature version instead of on every
+    call (the version is one key/value read): every build, and every writer
+    adding a segment column, bumps it, so changes are picked up without a
+    restart.
+    """
+    return _layout(DB_URL, get_feature_version(c))
+
+def reset_metadata() -> None:
+    _layout.cache_clear()
 
 def sample_segment_rows(segment_id: int, limit: int = 50) -> pd.DataFrame:
     """
-    Pull a small preview of rows for the given segment_id from customer_features.
-    If you don't have a 'segment' column yet, sample by heuristics or return head().
+    Random preview of up to `limit` rows of the given segment_id: the first
+    `limit` ranks of customer_features_sample (day2/segment_samples.py), a
+    primary-key range read whose cost doesn't depend on the table size.
+    Only the profiled columns come back (no user_email). Before the first
+    feature build, or when the sample is older than customer_features' shape,
+    it falls back to customer_features; without a 'segment' column every id
+    gets the same rows.
     """
-    eng = create_engine(DB_URL, future=True)
+    eng = get_engine(DB_URL)
     with eng.connect() as c:
-        # Try to sample by segment column if present, else just take head()
-        cols = [r[1] for r in c.execute(text("PRAGMA table_info(customer_features)"))] if DB_URL.startswith("sqlite") \
-               else []
-        has_segment = "segment" in cols
-
-        if has_segment:
-            q = text("SELECT * FROM customer_features WHERE segment = :sid LIMIT :lim")
-            df = pd.read_sql(q, c, params={"sid": segment_id, "lim": limit})
+        has_segment, has_sample, cols = _table_layout(c)
+        if has_sample:
+            q = text(f"SELECT {cols} FROM {SAMPLE_TABLE} "
+                     "WHERE segment = :sid AND sample_rank <= :lim ORDER BY sample_rank")
+            params = {"sid": segment_id if has_segment else NO_SEGMENT, "lim": limit}
+        elif has_segment:
+            q = text(f"SELECT {cols} FROM customer_features WHERE segment = :sid LIMIT :lim")
+            params = {"sid": segment_id, "lim": limit}
         else:
-            q = text("SELECT * FROM customer_features LIMIT :lim")
-            df = pd.read_sql(q, c, params={"lim": limit})
+            q = text(f"SELECT {cols} FROM customer_features LIMIT :lim")
+            params = {"lim": limit}
+        df = pd.read_sql(q, c, params=params)
     return df
 
+def sample_all_segments(limit: int = 50, segment_ids: Optional[Iterable[int]] = None) -> Dict[int, pd.DataFrame]:
+    """
+    Up to `limit` rows for every segment (or just `segment_ids`) in a single
+    query, split into {segment_id: df}; same rows and columns as
+    sample_segment_rows(). Without a 'segment' column there is nothing to
+    enumerate, so explicit ids all get the same preview and "all" raises
+    ValueError.
+    """
+    ids = None if segment_ids is None else sorted({int(s) for s in segment_ids})
+    eng = get_engine(DB_URL)
+    with eng.connect() as c:
+        has_segment, has_sample, cols = _table_layout(c)
+        if not has_segment:
+            if ids is None:
+                raise ValueError("customer_features has no 'segment' column; pass explicit segment ids")
+            head = sample_segment_rows(NO_SEGMENT, limit)
+            return {sid: head for sid in ids}
+
+        in_ids = " AND segment IN :ids" if ids is not None else ""
+        if has_sample:
+            q = text(f"SELECT segment, {cols} FROM {SAMPLE_TABLE} "
+                     f"WHERE sample_rank <= :lim AND segment <> {NO_SEGMENT}{in_ids} ORDER BY segment, sample_rank")
+        else:
+            q = text(f"""
+                SELECT segment, {cols} FROM (
+                    SELECT segment, {cols}, ROW_NUMBER() OVER (PARTITION BY segment) AS _rn
+                    FROM customer_features
+                    WHERE segment IS NOT NULL{in_ids}
+                ) s
+                WHERE _rn <= :lim
+            """)
+        params: Dict[str, Any] = {"lim": limit}
+        if ids is not None:
+            q = q.bindparams(bindparam("ids", expanding=True))
+            params["ids"] = ids
+        df = pd.read_sql(q, c, params=params)
+    return {int(sid): part.drop(columns="segment").reset_index(drop=True)
+            for sid, part in df.groupby("segment", sort=True)}
+
 def build_app():
     g = StateGraph(GraphState)
     g.add_node("segment_analyzer", segment_analyzer)
@@ -48,23 +142,102 @@ def build_app():
     g.add_edge("segment_analyzer", END)
     return g.compile()
 
+@lru_cache(maxsize=1)
+def get_app():
+    """Memoized compiled graph (compiling is pure overhead on the request path)."""
+    return build_app()
+
+def reset_app() -> None:
+    get_app.cache_clear()
+
+def warmup() -> None:
+    get_app()
+
 def invoke_segment_analysis(segment_id: int, limit: int = 50) -> Dict[str, Any]:
     """
     Orchestrates:
       - preview fetch from DB
-      - graph build and invoke
+      - graph invoke (compiled once, see get_app)
       - returns dict with keys in GraphState
     """
     df = sample_segment_rows(segment_id=segment_id, limit=limit)
-    sample_json = df.to_json(orient="records")
+    return get_app().invoke(_initial_state(segment_id, df))
 
-    app = build_app()
-    state: GraphState = {
+def _initial_state(segment_id: int, df: pd.DataFrame) -> GraphState:
+    return {
         "segment_id": segment_id,
-        "sample_df_json": sample_json,
+        "sample_df_json": df.to_json(orient="records"),
         "response": "",
         "insights": "",
         "summary_table": "[]",
         "chart_json": "{}",
     }
-    return app.invoke(state)
+
+def _analyze_one(app, segment_id: int, df: pd.DataFrame) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    try:
+        out, error = dict(app.invoke(_initial_state(segment_id, df))), None
+    except Exception as e:  # one failed segment shouldn't sink the batch
+        out, error = {"segment_id": segment_id}, f"{type(e).__name__}: {e}"
+    out.pop("sample_df_json", None)
+    out.update({"sample_rows": len(df), "latency_s": round(time.perf_counter() - t0, 4), "error": error})
+    return out
+
+def save_segment_insights(results: List[Dict[str, Any]]) -> int:
+    """
+    Upsert successful results into segment_insights (one row per segment,
+    replacing that segment's previous run). Returns the rows written.
+    """
+    ok = [r for r in results if not r.get("error")]
+    if not ok:
+        return 0
+    df = pd.DataFrame([{
+        "segment_id": r["segment_id"],
+        "response": r.get("response", ""),
+        "insights": r.get("insights", ""),
+        "summary_table": r.get("summary_table", "[]"),
+        "sample_rows": r["sample_rows"],
+        "latency_s": r["latency_s"],
+    } for r in ok])
+    df["created_at"] = pd.Timestamp.now(tz="UTC").tz_localize(None)
+    with get_engine(DB_URL).begin() as conn:
+        TABLES[INSIGHTS_TABLE].create(conn, checkfirst=True)
+        conn.execute(text(f"DELETE FROM {INSIGHTS_TABLE} WHERE segment_id IN :ids")
+                     .bindparams(bindparam("ids", expanding=True)), {"ids": df["segment_id"].tolist()})
+        return write_frame(df, INSIGHTS_TABLE, conn, if_exists="append")
+
+def analyze_segments(segment_ids: Optional[Iterable[int]] = None, limit: int = 50,
+                     workers: int = SEGMENT_WORKERS, persist: bool = True) -> Dict[str, Any]:
+    """
+    Batch version of invoke_segment_analysis(): every segment (segment_ids=None)
+    or the given ones. Returns {"segments": [result per segment, by id],
+    "timings": {...}, "saved": rows written}; each result carries the graph
+    outputs plus sample_rows, latency_s and error (None on success).
+    """
+    t0 = time.perf_counter()
+    samples = sample_all_segments(limit=limit, segment_ids=segment_ids)
+    fetch_s = time.perf_counter() - t0
+
+    app = get_app()
+    results: List[Dict[str, Any]] = []
+    if samples:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(samples)))) as pool:
+            futures = [pool.submit(_analyze_one, app, sid, df) for sid, df in samples.items()]
+            results = [f.result() for f in as_completed(futures)]
+    results.sort(key=lambda r: r["segment_id"])
+    analyze_s = time.perf_counter() - t0 - fetch_s
+
+    saved = save_segment_insights(results) if persist else 0
+    latencies = [r["latency_s"] for r in results]
+    return {
+        "segments": results,
+        "saved": saved,
+        "timings": {
+            "fetch_s": round(fetch_s, 4),
+            "analyze_s": round(analyze_s, 4),
+            "wall_s": round(time.perf_counter() - t0, 4),
+            "sum_latency_s": round(sum(latencies), 4),   # what a one-at-a-time loop would have spent
+            "max_latency_s": round(max(latencies), 4) if latencies else 0.0,
+            "workers": max(1, min(workers, len(samples))) if samples else 0,
+        },
+    }
@@ -4,16 +4,45 @@ CLI entrypoint to run Day 3 segment analysis.
 
 Examples:
     python run_graph.py --segment 2 --limit 50
+    python run_graph.py --segments all --workers 4      # every segment, saved to segment_insights
+    python run_graph.py --segments 0,2,3 --no-save
 """
 import argparse
-from build_graph import invoke_segment_analysis
+from build_graph import SEGMENT_WORKERS, analyze_segments, invoke_segment_analysis
+
+def run_batch(segments: str, limit: int, workers: int, save: bool) -> None:
+    ids = None if segments.strip().lower() == "all" else [int(s) for s in segments.split(",") if s.strip()]
+    batch = analyze_segments(segment_ids=ids, limit=limit, workers=workers, persist=save)
+
+    for r in batch["segments"]:
+        print(f"\n=== SEGMENT {r['segment_id']}  ({r['sample_rows']} rows, {r['latency_s'] * 1000:.0f} ms) ===")
+        if r["error"]:
+            print(f"❌ {r['error']}")
+            continue
+        print(r.get("response", ""))
+        print(r.get("insights", ""))
+
+    t = batch["timings"]
+    failed = sum(1 for r in batch["segments"] if r["error"])
+    print(f"\n→ segments: {len(batch['segments'])}  failed: {failed}  workers: {t['workers']}")
+    print(f"→ wall: {t['wall_s'] * 1000:.0f} ms  (fetch {t['fetch_s'] * 1000:.0f} ms, analyze {t['analyze_s'] * 1000:.0f} ms)  "
+          f"sum of per-segment latency: {t['sum_latency_s'] * 1000:.0f} ms  slowest: {t['max_latency_s'] * 1000:.0f} ms")
+    if save:
+        print(f"✅ Saved {batch['saved']} rows to segment_insights")
 
 def main():
     parser = argparse.ArgumentParser(description="Run START->segment_analyzer->END graph.")
     parser.add_argument("--segment", type=int, default=2, help="Segment ID (if your table has 'segment'; otherwise just for context).")
+    parser.add_argument("--segments", type=str, default=None, help="Batch mode: 'all' or a comma list of segment IDs.")
+    parser.add_argument("--workers", type=int, default=SEGMENT_WORKERS, help="Batch mode: concurrent segment analyses.")
+    parser.add_argument("--no-save", action="store_true", help="Batch mode: don't write segment_insights.")
     parser.add_argument("--limit", type=int, default=50, help="Row preview limit for the LLM prompt.")
     args = parser.parse_args()
 
+    if args.segments:
+        run_batch(args.segments, args.limit, args.workers, save=not args.no_save)
+        return
+
     result = invoke_segment_analysis(segment_id=args.segment, limit=args.limit)
 
     print("\n=== RESPONSE ===\n", result.get("response", ""))
@@ -13,23 +13,24 @@ Run:
 """
 
 import os
-from pathlib import Path
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from dotenv import load_dotenv
 
+from course.week1.day2.bulk_write import bulk_transaction, write_frame
+from course.week1.day2.db_engine import get_engine
+from course.week1.day2.feature_version import bump_feature_version
+from course.week1.day2.rollup import refresh_rollup
+from course.week1.day2.schema import apply_indexes
+from course.week1.day2.segment_samples import refresh_segment_samples
+
 # Load env (DATABASE_URL defaults to local SQLite if not set)
 load_dotenv()
 DEFAULT_SQLITE = "sqlite:///data/leads_scored_segmentation.db"
 DB_URL = os.getenv("DATABASE_URL", DEFAULT_SQLITE)
 
-# Ensure data dir exists for SQLite
-if DB_URL.startswith("sqlite:///"):
-    data_dir = Path(DB_URL.replace("sqlite:///", "")).parent
-    data_dir.mkdir(parents=True, exist_ok=True)
-
-# Connect
-engine = create_engine(DB_URL, future=True)
+# Connect (shared pooled engine; creates the data dir for SQLite)
+engine = get_engine(DB_URL)
 print(f"📦 Using DB: {DB_URL}")
 
 # --- Demo data (same as your Day 2 CSVs) ---
@@ -56,7 +57,7 @@ def seed_tables():
     leads_df = pd.DataFrame(leads_scored_rows)
     tx_df = pd.DataFrame(transactions_rows)
 
-    with engine.begin() as conn:
+    with bulk_transaction(engine) as conn:
         # Drop & create (idempotent for demos)
         conn.execute(text("DROP TABLE IF EXISTS leads_scored"))
         conn.execute(text("""
@@ -66,7 +67,7 @@ def seed_tables():
                 member_rating INTEGER
             )
         """))
-        leads_df.to_sql("leads_scored", conn, if_exists="append", index=False)
+        write_frame(leads_df, "leads_scored", conn, if_exists="append")
 
         conn.execute(text("DROP TABLE IF EXISTS transactions"))
         conn.execute(text("""
@@ -76,7 +77,7 @@ def seed_tables():
                 ts TEXT
             )
         """))
-        tx_df.to_sql("transactions", conn, if_exists="append", index=False)
+        write_frame(tx_df, "transactions", conn, if_exists="append")
 
     print("✅ Seeded tables: leads_scored (5), transactions (8)")
 
@@ -98,8 +99,12 @@ def build_features():
         tx    = pd.read_sql(text("SELECT * FROM transactions"), conn)
 
     feats = build_features(leads, tx)
-    with engine.begin() as conn:
-        feats.to_sql("customer_features", conn, if_exists="replace", index=False)
+    with bulk_transaction(engine) as conn:
+        write_frame(feats, "customer_features", conn)
+        apply_indexes(conn)
+        bump_feature_version(conn)
+        refresh_rollup(conn)
+        refresh_segment_samples(conn)
 
     print(f"\n✅ Wrote {len(feats):,} rows to table: customer_features")
     print("\n🔎 customer_features (preview):")
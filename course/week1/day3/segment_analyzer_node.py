@@ -1,24 +1,40 @@
 # segment_analyzer_node.py
 """
 Claude-powered segment analyzer node.
-- Reads a small JSON preview of the segment's rows.
+- Reads the JSON preview of the segment's rows and sends Claude a compact
+  statistical profile of it (segment_profile.py) rather than the rows, so
+  the prompt stays the same size for any --limit and holds no emails.
 - Returns: response, insights, summary_table (all JSON-safe strings).
 
 Relies on:
-  course/week1/day1/anthropic_client.py (ClaudeClient)
+  course/week1/day1/anthropic_client.py (get_client -> pooled ClaudeClient)
+
+Settings (.env): SEGMENT_PROMPT (profile|rows; rows = the old raw-row prompt)
 """
 import json
+import os
 from typing import Dict, Any
+
+import pandas as pd
+
 from state_types import GraphState
-from course.week1.day1.anthropic_client import ClaudeClient
+from segment_profile import profile_json
+from course.week1.day1.anthropic_client import get_client
 
 SYSTEM = "You are a strict JSON generator. Only output valid JSON."
+PROMPT_MODE = os.getenv("SEGMENT_PROMPT", "profile")
 
-def segment_analyzer(state: GraphState) -> Dict[str, Any]:
-    """
-    LLM node that analyzes a segment preview and produces concise exec outputs.
-    """
-    user = f"""
+def _profile_context(state: GraphState) -> str:
+    df = pd.DataFrame.from_records(json.loads(state.get("sample_df_json") or "[]"))
+    return f"- segment_profile (statistics of the sampled rows) = {profile_json(df)}"
+
+def build_prompt(state: GraphState, mode: str = PROMPT_MODE) -> str:
+    """User prompt for the analyzer; mode "profile" (default) or "rows"."""
+    if mode == "rows":
+        data = f"- sample_rows (JSON list of dicts) = {state.get('sample_df_json', '[]')}"
+    else:
+        data = _profile_context(state)
+    return f"""
 Return ONLY valid JSON with keys:
 {{
   "response": string,
@@ -28,7 +44,7 @@ Return ONLY valid JSON with keys:
 
 Context:
 - segment_id = {state.get('segment_id')}
-- sample_rows (JSON list of dicts) = {state.get('sample_df_json', '[]')}
+{data}
 
 Constraints:
 - "response": 3-5 sentences, executive tone.
@@ -36,8 +52,13 @@ Constraints:
 - "summary_table": <= 6 rows, keys ["metric","value"] only.
 - No extra keys, no prose outside JSON.
 """
-    client = ClaudeClient()
-    raw = client.json_call(system=SYSTEM, user=user, max_tokens=700)
+
+def segment_analyzer(state: GraphState) -> Dict[str, Any]:
+    """
+    LLM node that analyzes a segment preview and produces concise exec outputs.
+    """
+    client = get_client()
+    raw = client.json_call(system=SYSTEM, user=build_prompt(state), max_tokens=700, node="segment_analyzer")
 
     try:
         parsed = json.loads(raw)
@@ -11,20 +11,40 @@ ROOT = Path(__file__).resolve().parents[4]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from course.week1.day1.anthropic_client import ClaudeClient
+from course.week1.day1.anthropic_client import AsyncTextStream, TextStream, get_client, get_async_client
 from router_state import RouterState
 
 SYSTEM = "You are an executive analyst. Output plain text only."
 
-def analyst_node(state: RouterState) -> Dict[str, Any]:
-    question = state.get("question", "")
-    user = f"""
+def _analyst_prompt(question: str) -> str:
+    return f"""
 Provide a crisp 3-5 sentence executive summary addressing:
 - what the user is likely after
 - the minimal data you'd pull next
 - likely next best action
 Question: {question}
 """
-    client = ClaudeClient()
-    txt = client.json_call(system=SYSTEM, user=user, max_tokens=300)
+
+def analyst_node(state: RouterState) -> Dict[str, Any]:
+    client = get_client()
+    txt = client.json_call(system=SYSTEM, user=_analyst_prompt(state.get("question", "")), max_tokens=300,
+                           node="analyst")
     return {"answer": txt.strip()}
+
+async def aanalyst_node(state: RouterState) -> Dict[str, Any]:
+    client = get_async_client()
+    txt = await client.json_call(system=SYSTEM, user=_analyst_prompt(state.get("question", "")), max_tokens=300,
+                                 node="analyst")
+    return {"answer": txt.strip()}
+
+def analyst_node_stream(state: RouterState) -> TextStream:
+    """Streaming analyst_node for dashboards: iterate for text deltas; .text / .ttft_s once done."""
+    client = get_client()
+    return client.stream_call(system=SYSTEM, user=_analyst_prompt(state.get("question", "")), max_tokens=300,
+                              node="analyst")
+
+def aanalyst_node_stream(state: RouterState) -> AsyncTextStream:
+    """Async analyst_node_stream: `async for chunk in aanalyst_node_stream(state)`."""
+    client = get_async_client()
+    return client.stream_call(system=SYSTEM, user=_analyst_prompt(state.get("question", "")), max_tokens=300,
+                              node="analyst")
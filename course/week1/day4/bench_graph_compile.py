@@ -0,0 +1,69 @@
+# bench_graph_compile.py
+"""
+Benchmark: router graph compile cost vs. invoke cost.
+
+Shows what every request used to pay when build_router_app() was called per
+question, compared with invoking the memoized graph from get_router_app().
+Invocations go to a local stub Claude server (no API key or network needed).
+
+Run:
+  python bench_graph_compile.py --n 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+for p in (ROOT, ROOT / "course" / "week1" / "day1"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+from fake_anthropic_server import FakeAnthropicServer
+from build_router import build_router_app, get_router_app, reset_router_app
+
+# Routed to the Analyst node by the local fast path -> one stubbed Claude call
+QUESTION = "Give me a quick summary of Segment 1 behavior."
+
+
+def _ms(samples: list) -> str:
+    ms = [s * 1000 for s in samples]
+    return f"mean={statistics.mean(ms):8.3f} ms  p50={statistics.median(ms):8.3f} ms"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compile vs invoke cost of the router graph.")
+    ap.add_argument("--n", type=int, default=50, help="Iterations per measurement.")
+    args = ap.parse_args()
+
+    os.environ.setdefault("ANTHROPIC_API_KEY", "bench-key")
+    with FakeAnthropicServer(reply_text="Segment 1 buys often and rates us highly.") as srv:
+        os.environ["ANTHROPIC_BASE_URL"] = srv.base_url
+        state = {"question": QUESTION, "intent": "", "confidence": 0.0, "answer": ""}
+
+        compile_s = []
+        for _ in range(args.n):
+            t0 = time.perf_counter()
+            build_router_app()
+            compile_s.append(time.perf_counter() - t0)
+
+        reset_router_app()
+        app = get_router_app()
+        app.invoke(state)  # warm-up
+        invoke_s = []
+        for _ in range(args.n):
+            t0 = time.perf_counter()
+            get_router_app().invoke(state)
+            invoke_s.append(time.perf_counter() - t0)
+
+        per_request_old = statistics.mean(compile_s) + statistics.mean(invoke_s)
+        print(f"compile (build_router_app)   {_ms(compile_s)}")
+        print(f"invoke  (memoized graph)     {_ms(invoke_s)}")
+        print(f"\nOld per-request cost (compile + invoke): {per_request_old * 1000:.3f} ms")
+        print(f"Compile share removed from request path: {statistics.mean(compile_s) / per_request_old:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,9 +15,11 @@ ROOT = Path(__file__).resolve().parents[4]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from course.week1.day5.bi_templates_runner import exec_bi
+from course.week1.day5.bi_templates_runner import exec_bi, aexec_bi
 from router_state import RouterState
 
+DEFAULT_QUESTION = "What's the average p1 by segment for the last 90 days?"
+
 
 def bi_node(state: RouterState) -> Dict[str, Any]:
     """
@@ -32,10 +34,21 @@ def bi_node(state: RouterState) -> Dict[str, Any]:
       - rows: list of dicts
       - explanation: str
     """
-    question = state.get("question", "").strip() or "What's the average p1 by segment for the last 90 days?"
+    question = state.get("question", "").strip() or DEFAULT_QUESTION
 
     result = exec_bi(question)
+    return _bi_update(result)
+
+
+async def abi_node(state: RouterState) -> Dict[str, Any]:
+    """Async bi_node for graphs driven via ainvoke (same return shape)."""
+    question = state.get("question", "").strip() or DEFAULT_QUESTION
+
+    result = await aexec_bi(question)
+    return _bi_update(result)
+
 
+def _bi_update(result: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "intent": "BI",
         "template": result.get("template"),
@@ -3,27 +3,68 @@
 START -> router -> (BI|Product|Email|Analyst) -> END
 
 Conditional edges based on intent with confidence fallback (< threshold -> Analyst).
+
+build_router_app(use_async=True) wires the async node variants so the graph can be
+driven with `await app.ainvoke(state)` and many questions served concurrently.
+
+Request paths should call get_router_app(): it compiles once per process and
+reuses the compiled graph (reset_router_app() drops it, e.g. in tests).
+
+invoke_router(question) / ainvoke_router(question) run the compiled graph
+for one question, coalescing identical questions that are already in flight
+(course/week1/day1/single_flight.py) - the joiners get their own copy of
+the leader's final state, marked "coalesced": True, with "llm_usage"
+zeroed (the leader's is under llm_usage["shared"]) so the calls are
+counted once.
+
+Both take deadline_s (default ROUTER_DEADLINE_S, unset = none): an overall
+time budget for every Claude call the flow makes, across nodes
+(course/week1/day1/resilience.py call_deadline). When it runs out the
+current call raises DeadlineExceeded instead of retrying or waiting on.
+Only calls with the same deadline_s are coalesced, and a joiner waits for
+the leader no longer than its own budget.
+
+Results carry "llm_usage": every Claude call the flow made (router, then
+the branch's node(s)) with tokens, cost and latency by node
+(course/week1/day1/llm_metrics.py), and "trace": the span tree of the
+flow - a router span with one node.<name> span per graph node and, under
+those, template selection, SQL and Claude calls (course/week1/day1/tracing.py).
+
+Settings (.env): ROUTER_DEADLINE_S
 """
+import os
+from functools import lru_cache
+from typing import Optional
 from typing import Dict, Any
 
 from langgraph.graph import StateGraph, START, END
 
+from course.week1.day1.llm_metrics import track_usage
+from course.week1.day1.resilience import DeadlineExceeded, call_deadline, remaining_s
+from course.week1.day1.tracing import span, traced
+from course.week1.day1.single_flight import ENABLED as COALESCE, SingleFlight, caller_result, question_key
+
 from router_state import RouterState
-from router_node import router, CONF_THRESHOLD
-from bi_node import bi_node
-from product_node import product_node
+from router_node import router, arouter, CONF_THRESHOLD
+from bi_node import bi_node, abi_node
+from product_node import product_node, aproduct_node
 from email_node import email_node
-from analyst_node import analyst_node
+from analyst_node import analyst_node, aanalyst_node
 
-def build_router_app():
+def build_router_app(use_async: bool = False):
     g = StateGraph(RouterState)
 
-    # Nodes
-    g.add_node("router", router)
-    g.add_node("bi", bi_node)
-    g.add_node("product", product_node)
-    g.add_node("email", email_node)
-    g.add_node("analyst", analyst_node)
+    # Nodes (email has no async variant; LangGraph runs it in a worker thread under ainvoke),
+    # each traced as a node.<name> span
+    nodes = {
+        "router": arouter if use_async else router,
+        "bi": abi_node if use_async else bi_node,
+        "product": aproduct_node if use_async else product_node,
+        "email": email_node,
+        "analyst": aanalyst_node if use_async else analyst_node,
+    }
+    for name, fn in nodes.items():
+        g.add_node(name, traced(f"node.{name}", fn))
 
     # Start -> Router
     g.add_edge(START, "router")
@@ -42,10 +83,14 @@ def build_router_app():
         # low-confidence or explicit Analyst/Other
         return (float(s.get("confidence", 0)) < CONF_THRESHOLD) or (s.get("intent") in ["Analyst", "Other"])
 
-    g.add_conditional_edges(
-        "router",
-        {to_bi: "bi", to_product: "product", to_email: "email", to_analyst: "analyst"}
-    )
+    def route(s: RouterState) -> str:
+        # First matching predicate wins; anything unmatched falls back to Analyst
+        for pred, node in ((to_bi, "bi"), (to_product, "product"), (to_email, "email"), (to_analyst, "analyst")):
+            if pred(s):
+                return node
+        return "analyst"
+
+    g.add_conditional_edges("router", route, ["bi", "product", "email", "analyst"])
 
     # All leaves -> END
     g.add_edge("bi", END)
@@ -54,3 +99,66 @@ def build_router_app():
     g.add_edge("analyst", END)
 
     return g.compile()
+
+
+@lru_cache(maxsize=None)
+def get_router_app(use_async: bool = False):
+    """Compiled router graph, built once per process (per sync/async flavour)."""
+    return build_router_app(use_async=use_async)
+
+
+def reset_router_app() -> None:
+    """Forget the memoized graphs so the next get_router_app() recompiles."""
+    get_router_app.cache_clear()
+
+
+def warmup(use_async: bool = False) -> None:
+    """Compile at startup so the first user request doesn't pay for it."""
+    get_router_app(use_async=use_async)
+
+
+ROUTER_FLIGHTS = SingleFlight("router")
+DEADLINE_S = float(os.getenv("ROUTER_DEADLINE_S")) if os.getenv("ROUTER_DEADLINE_S") else None
+
+
+def initial_state(question: str) -> Dict[str, Any]:
+    return {"question": question, "intent": "", "confidence": 0.0, "answer": ""}
+
+
+def invoke_router(question: str, deadline_s: Optional[float] = DEADLINE_S) -> Dict[str, Any]:
+    """
+    get_router_app().invoke() for one question, shared with identical
+    concurrent calls that have the same deadline_s. A coalesced caller
+    never waits past its own deadline (DeadlineExceeded).
+    """
+    def run():
+        with track_usage() as usage, span("router", question=question) as sp:
+            state = get_router_app().invoke(initial_state(question))
+            sp.set_attributes(intent=state.get("intent"), confidence=state.get("confidence"))
+        return dict(state, llm_usage=usage.summary(), trace=sp.tree())
+    with call_deadline(deadline_s):
+        if not COALESCE:
+            return dict(run(), coalesced=False)
+        try:
+            result, shared = ROUTER_FLIGHTS.do((question_key(question), deadline_s), run, timeout=remaining_s())
+        except TimeoutError as e:
+            raise DeadlineExceeded(f"router deadline exceeded: {e}") from e
+    return caller_result(result, shared)
+
+
+async def ainvoke_router(question: str, deadline_s: Optional[float] = DEADLINE_S) -> Dict[str, Any]:
+    """Async invoke_router (async graph; coalesces on the running event loop)."""
+    async def run():
+        with track_usage() as usage, span("router", question=question) as sp:
+            state = await get_router_app(use_async=True).ainvoke(initial_state(question))
+            sp.set_attributes(intent=state.get("intent"), confidence=state.get("confidence"))
+        return dict(state, llm_usage=usage.summary(), trace=sp.tree())
+    with call_deadline(deadline_s):
+        if not COALESCE:
+            return dict(await run(), coalesced=False)
+        try:
+            result, shared = await ROUTER_FLIGHTS.ado((question_key(question), deadline_s), run,
+                                                      timeout=remaining_s())
+        except TimeoutError as e:
+            raise DeadlineExceeded(f"router deadline exceeded: {e}") from e
+    return caller_result(result, shared)
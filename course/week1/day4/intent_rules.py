@@ -0,0 +1,174 @@
+# intent_rules.py
+"""
+Local pre-classifier for the Day 4 router.
+
+Obvious questions ("average p1 by segment", "write subject lines") don't need a
+Claude round-trip to pick an intent. This module scores a question in
+microseconds with:
+  1) keyword/regex rules that mirror the router prompt's Routing Guidance
+  2) an optional TF-IDF + logistic regression model trained on labelled
+     questions (needs scikit-learn; skipped if it isn't installed)
+
+router_node.router() only calls Claude when the local confidence is below
+ROUTER_FASTPATH_CONF.
+
+Train/save the optional model:
+  python intent_rules.py --train labelled.jsonl --out data/intent_model.pkl
+  (one JSON object per line: {"q": "...", "intent": "BI"})
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pickle
+import re
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+try:  # optional dependency
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    HAVE_SKLEARN = True
+except Exception:
+    HAVE_SKLEARN = False
+
+MODEL_PATH = os.getenv("ROUTER_MODEL_PATH", "")
+# At or above this local confidence the router skips Claude entirely
+FASTPATH_CONF = float(os.getenv("ROUTER_FASTPATH_CONF", "0.85"))
+
+# (intent, pattern, weight) — weight 1.0 = decisive cue, 0.5 = supporting cue
+RULES: List[Tuple[str, str, float]] = [
+    ("BI", r"\b(average|avg|mean|median|count|counts|how many|distribution|percent(age)?|sum|total)\b", 1.0),
+    ("BI", r"\b(top|max(imum)?|min(imum)?)\b.*\b(frequency|p1|rating|recency)\b", 1.0),
+    ("BI", r"\b(by|per)\s+(segment|member rating|rating)\b", 0.5),
+    ("BI", r"\b(metrics?|kpis?|data|performance|last\s+\d+\s+days?)\b", 0.5),
+    ("Email", r"\b(subject lines?|ctas?|call[- ]to[- ]action|outreach|cold email|follow[- ]up email)\b", 1.0),
+    ("Email", r"\b(draft|write)\b.*\b(email|message|copy)\b", 1.0),
+    ("Email", r"\b(emails?|templates?|copy)\b", 0.5),
+    ("Product", r"\b(value props?|value propositions?|positioning|feature highlights?)\b", 1.0),
+    ("Product", r"\b(features?|product|pitch)\b", 0.5),
+    ("Analyst", r"\b(summar(y|ize|ise)|executive insights?|overview|next best action)\b", 1.0),
+    ("Analyst", r"\b(segmentation|behaviou?r|insights?)\b", 0.5),
+]
+_COMPILED = [(intent, re.compile(pat, re.IGNORECASE), w) for intent, pat, w in RULES]
+
+# Small seed set so the optional model can be trained without extra files
+LABELLED_QUESTIONS: List[Tuple[str, str]] = [
+    ("What's the average p1 by segment for the last 90 days?", "BI"),
+    ("How many users per member rating?", "BI"),
+    ("Show the distribution of purchase frequency", "BI"),
+    ("Top purchase frequency by segment last 30 days", "BI"),
+    ("Write three subject lines for a renewal campaign", "Email"),
+    ("Draft a short outreach email to Segment 2 about renewals.", "Email"),
+    ("Suggest a CTA for our win-back email", "Email"),
+    ("Which features should we highlight for high-rating members?", "Product"),
+    ("Give me value props for Segment 3", "Product"),
+    ("How should we position the product for new buyers?", "Product"),
+    ("Give me a quick summary of Segment 1 behavior.", "Analyst"),
+    ("What are the executive insights from this quarter?", "Analyst"),
+    ("Summarize what we know about lapsed customers", "Analyst"),
+]
+
+
+@dataclass
+class Prediction:
+    intent: str
+    confidence: float
+    source: str  # "rules" | "model" | "none"
+
+
+def rule_scores(question: str) -> dict:
+    scores: dict = {}
+    for intent, rx, weight in _COMPILED:
+        if rx.search(question):
+            scores[intent] = scores.get(intent, 0.0) + weight
+    return scores
+
+
+def classify_rules(question: str) -> Prediction:
+    """
+    Confidence grows with how decisive the best intent is (one strong cue is
+    enough) and how far it is ahead of the runner-up (mixed cues -> ~0.5).
+    """
+    scores = rule_scores(question)
+    if not scores:
+        return Prediction("Analyst", 0.0, "none")
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    best_intent, best = ranked[0]
+    second = ranked[1][1] if len(ranked) > 1 else 0.0
+    margin = (best - second) / best
+    confidence = min(0.99, (0.5 + 0.5 * margin) * min(1.0, best))
+    return Prediction(best_intent, round(confidence, 3), "rules")
+
+
+# ---------- optional TF-IDF / logistic model ----------
+def train_intent_model(examples: Optional[Iterable[Tuple[str, str]]] = None):
+    """Fit a character n-gram TF-IDF + logistic regression model on (question, intent) pairs."""
+    if not HAVE_SKLEARN:
+        raise RuntimeError("scikit-learn is not installed (pip install scikit-learn)")
+    pairs = list(examples or LABELLED_QUESTIONS)
+    qs, ys = zip(*pairs)
+    model = make_pipeline(
+        TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4), sublinear_tf=True),
+        LogisticRegression(max_iter=1000),
+    )
+    model.fit(list(qs), list(ys))
+    return model
+
+
+_MODEL = None
+
+
+def load_model(path: str = MODEL_PATH):
+    """Load (once) a pickled model from ROUTER_MODEL_PATH; None if unset/missing."""
+    global _MODEL
+    if _MODEL is None and path and os.path.exists(path) and HAVE_SKLEARN:
+        with open(path, "rb") as f:
+            _MODEL = pickle.load(f)
+    return _MODEL
+
+
+def set_model(model) -> None:
+    """Install an in-memory model (e.g. from train_intent_model())."""
+    global _MODEL
+    _MODEL = model
+
+
+def classify_model(question: str) -> Optional[Prediction]:
+    model = load_model()
+    if model is None:
+        return None
+    proba = model.predict_proba([question])[0]
+    i = int(proba.argmax())
+    return Prediction(str(model.classes_[i]), round(float(proba[i]), 3), "model")
+
+
+def preclassify(question: str) -> Prediction:
+    """Rules first; consult the model (if any) only when rules are unsure."""
+    pred = classify_rules(question or "")
+    model_pred = classify_model(question or "") if pred.confidence < FASTPATH_CONF else None
+    if model_pred is not None and model_pred.confidence > pred.confidence:
+        return model_pred
+    return pred
+
+
+def _read_labelled(path: str) -> List[Tuple[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(r["q"], r["intent"]) for r in rows]
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Train the optional router pre-classifier model.")
+    ap.add_argument("--train", type=str, default="", help="JSONL of {\"q\", \"intent\"} (default: built-in seed set).")
+    ap.add_argument("--out", type=str, default="data/intent_model.pkl", help="Where to pickle the model.")
+    args = ap.parse_args()
+
+    examples = _read_labelled(args.train) if args.train else LABELLED_QUESTIONS
+    model = train_intent_model(examples)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "wb") as f:
+        pickle.dump(model, f)
+    print(f"✅ Trained on {len(examples)} questions -> {args.out} (set ROUTER_MODEL_PATH to use it)")
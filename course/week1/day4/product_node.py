@@ -13,19 +13,38 @@ ROOT = Path(__file__).resolve().parents[4]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from course.week1.day1.anthropic_client import ClaudeClient
+from course.week1.day1.anthropic_client import AsyncTextStream, TextStream, get_client, get_async_client
 from router_state import RouterState
 
 SYSTEM = "You are a product marketer. Output only plain text; short bullets."
 
-def product_node(state: RouterState) -> Dict[str, Any]:
-    question = state.get("question", "")
-    user = f"""
+def _product_prompt(question: str) -> str:
+    return f"""
 Create 5 concise bullet points with feature/value props to highlight.
 Context: {question}
 Audience: execs and SDRs. No fluff.
 """
-    client = ClaudeClient()
-    txt = client.json_call(system=SYSTEM, user=user, max_tokens=250)
+
+def product_node(state: RouterState) -> Dict[str, Any]:
+    client = get_client()
+    txt = client.json_call(system=SYSTEM, user=_product_prompt(state.get("question", "")), max_tokens=250,
+                           node="product")
     return {"answer": txt.strip()}
 
+async def aproduct_node(state: RouterState) -> Dict[str, Any]:
+    client = get_async_client()
+    txt = await client.json_call(system=SYSTEM, user=_product_prompt(state.get("question", "")), max_tokens=250,
+                                 node="product")
+    return {"answer": txt.strip()}
+
+def product_node_stream(state: RouterState) -> TextStream:
+    """Streaming product_node for dashboards: iterate for text deltas; .text / .ttft_s once done."""
+    client = get_client()
+    return client.stream_call(system=SYSTEM, user=_product_prompt(state.get("question", "")), max_tokens=250,
+                              node="product")
+
+def aproduct_node_stream(state: RouterState) -> AsyncTextStream:
+    """Async product_node_stream: `async for chunk in aproduct_node_stream(state)`."""
+    client = get_async_client()
+    return client.stream_call(system=SYSTEM, user=_product_prompt(state.get("question", "")), max_tokens=250,
+                              node="product")
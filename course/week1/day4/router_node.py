@@ -2,7 +2,7 @@
 import json
 import os
 import sys
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -13,7 +13,8 @@ ROOT = Path(__file__).resolve().parents[4]  # repo root
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from course.week1.day1.anthropic_client import ClaudeClient
+from course.week1.day1.anthropic_client import get_client, get_async_client
+from course.week1.day4.intent_rules import preclassify, FASTPATH_CONF
 from router_state import RouterState
 
 INTENTS = ["BI", "Product", "Email", "Analyst", "Other"]
@@ -21,11 +22,8 @@ CONF_THRESHOLD = float(os.getenv("ROUTER_CONF_THRESHOLD", "0.6"))
 
 SYSTEM = "You are a strict JSON router. Output ONLY valid JSON."
 
-def router(state: RouterState) -> Dict[str, Any]:
-    """
-    Classify question into an intent with a confidence score.
-    """
-    user = f"""
+def _router_prompt(question: str) -> str:
+    return f"""
 Return ONLY valid JSON:
 
 {{
@@ -34,7 +32,7 @@ Return ONLY valid JSON:
   "rationale": string
 }}
 
-Question: {state.get('question')}
+Question: {question}
 
 Routing Guidance:
 - BI: metrics, data, performance, 'average', 'count', 'distribution'
@@ -45,9 +43,9 @@ Routing Guidance:
 
 Keep rationale very short.
 """
-    client = ClaudeClient()
-    raw = client.json_call(system=SYSTEM, user=user, max_tokens=350)
 
+
+def _parse_route(raw: str) -> Dict[str, Any]:
     try:
         parsed = json.loads(raw)
         intent = parsed.get("intent", "Analyst")
@@ -55,4 +53,39 @@ Keep rationale very short.
     except Exception:
         intent, confidence = "Analyst", 0.4
 
-    return {"intent": intent, "confidence": confidence, "answer": ""}
+    return {"intent": intent, "confidence": confidence, "answer": "", "route_source": "llm"}
+
+
+def _fast_route(question: str) -> Optional[Dict[str, Any]]:
+    """Local rules/model verdict when it is confident enough to skip Claude, else None."""
+    pred = preclassify(question or "")
+    if pred.confidence >= FASTPATH_CONF:
+        return {"intent": pred.intent, "confidence": pred.confidence, "answer": "", "route_source": pred.source}
+    return None
+
+
+def llm_route(question: str) -> Dict[str, Any]:
+    """Claude-only classification (no fast path); used by router() and the eval harness."""
+    client = get_client()
+    raw = client.json_call(system=SYSTEM, user=_router_prompt(question), max_tokens=350, node="router")
+    return _parse_route(raw)
+
+
+def router(state: RouterState) -> Dict[str, Any]:
+    """
+    Classify question into an intent with a confidence score.
+    Obvious questions are answered by the local pre-classifier; Claude handles the rest.
+    """
+    question = state.get("question")
+    return _fast_route(question) or llm_route(question)
+
+
+async def arouter(state: RouterState) -> Dict[str, Any]:
+    """Async router (same fast path, prompt and parsing) for graphs driven via ainvoke."""
+    question = state.get("question")
+    fast = _fast_route(question)
+    if fast is not None:
+        return fast
+    client = get_async_client()
+    raw = await client.json_call(system=SYSTEM, user=_router_prompt(question), max_tokens=350, node="router")
+    return _parse_route(raw)
@@ -2,18 +2,24 @@
 """
 CLI entrypoint to run Day 4 router with dual output modes:
 - Default: pretty CLI output (tables for BI)
-- --json: dump full structured JSON payload
+- --json: dump full structured JSON payload (incl. "trace", the span tree)
 
 Examples:
   python run_router.py --q "What's the average p1 by segment for the last 90 days?"
   python run_router.py --q "Draft a short outreach email to Segment 2 about renewals."
   python run_router.py --q "Give me a quick summary of Segment 1 behavior." --json
+  python run_router.py --async --q "How many users per member rating?" --q "Draft a renewal email."
+  python run_router.py --deadline 8 --q "Give me a quick summary of Segment 1 behavior."
+  python run_router.py --metrics prom --q "How many users per member rating?"
 """
 
 import argparse
+import asyncio
 import json
 
-from build_router import build_router_app
+from build_router import DEADLINE_S, ainvoke_router, invoke_router
+from course.week1.day1.llm_metrics import REGISTRY
+from course.week1.day1.tracing import format_trace
 
 # Try to import tabulate for pretty tables; degrade gracefully if missing
 try:
@@ -59,22 +65,53 @@ def print_pretty(result: dict) -> None:
         else:
             print(answer)
 
+    usage = result.get("llm_usage")
+    if usage:
+        print("\n=== LLM USAGE ===")
+        print(f"{usage['calls']} calls  {usage['input_tokens']} in / {usage['output_tokens']} out tokens  "
+              f"${usage['cost_usd']:.4f}  {usage['llm_s']:.2f} s")
+        for node, u in usage["by_node"].items():
+            print(f"  {node:<16} {u['input_tokens']:>6} in {u['output_tokens']:>6} out  "
+                  f"${u['cost_usd']:.4f}  {u['latency_s']:.2f} s")
+
+    if result.get("trace"):
+        print("\n=== TRACE ===")
+        print(format_trace(result["trace"]))
+
+
+async def _ainvoke_all(questions: list, deadline_s=None) -> list:
+    """Serve several questions concurrently from one event loop (repeats share one run)."""
+    return await asyncio.gather(*(ainvoke_router(q, deadline_s) for q in questions))
+
 
 def main():
     parser = argparse.ArgumentParser(description="Run Router -> (BI|Product|Email|Analyst) graph.")
-    parser.add_argument("--q", type=str, required=True, help="User question to route.")
+    parser.add_argument("--q", type=str, action="append", required=True,
+                        help="User question to route (repeat to ask several).")
     parser.add_argument("--json", action="store_true", help="Output full structured JSON instead of pretty text.")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Drive the graph with ainvoke; repeated --q questions run concurrently.")
+    parser.add_argument("--deadline", type=float, default=DEADLINE_S,
+                        help="Seconds allowed for all Claude calls of one question (default ROUTER_DEADLINE_S).")
+    parser.add_argument("--metrics", choices=["json", "prom"],
+                        help="Also print the process's Claude metrics (JSON or Prometheus text).")
     args = parser.parse_args()
 
-    app = build_router_app()
-    state = {"question": args.q, "intent": "", "confidence": 0.0, "answer": ""}
+    if args.use_async:
+        results = asyncio.run(_ainvoke_all(args.q, args.deadline))
+    else:
+        results = [invoke_router(q, args.deadline) for q in args.q]
 
-    result = app.invoke(state)
+    for result in results:
+        if args.json:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            print_pretty(result)
 
-    if args.json:
-        print(json.dumps(result, indent=2, ensure_ascii=False))
-    else:
-        print_pretty(result)
+    if args.metrics == "json":
+        print(json.dumps(REGISTRY.to_json(), indent=2))
+    elif args.metrics == "prom":
+        print(REGISTRY.to_prometheus(), end="")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,122 @@
+# bench_bi_pipeline.py
+"""
+Latency benchmark: sequential vs pipelined vs streamed exec_bi().
+
+The pipelined runner starts the SQL for the top-k candidate templates while
+Claude is still picking one, so when the pick is a candidate the query is
+already done (or nearly) by the time the pick returns. exec_bi_stream() then
+shows the first summary words after one model TTFT instead of the whole
+summary. Claude is a local stub server with a fixed per-call delay plus a
+per-word generation delay (streamed or not); customer_features is a throwaway SQLite
+file queried raw (rollup and result cache off) so the SQL has a real cost.
+No API key needed.
+
+Run:
+  python bench_bi_pipeline.py --rows 500000 --llm-ms 300 --token-ms 20 --k 2
+"""
+from __future__ import annotations
+import argparse, json, os, statistics, sys, tempfile
+from pathlib import Path
+
+# Scratch database, raw queries, no result cache, Claude picks - set *before* importing the runner
+_TMP = tempfile.mkdtemp(prefix="bi_pipeline_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'bench.db')}"
+os.environ["BI_USE_ROLLUP"] = "0"
+os.environ["BI_CACHE"] = "0"
+os.environ["BI_SELECTOR"] = "claude"  # always take the Claude pick path that speculation overlaps
+
+DAY1 = Path(__file__).resolve().parents[1] / "day1"
+if str(DAY1) not in sys.path:
+    sys.path.insert(0, str(DAY1))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from fake_anthropic_server import FakeAnthropicServer  # noqa: E402
+from course.week1.day2.bulk_write import bulk_transaction, write_frame  # noqa: E402
+from course.week1.day2.db_engine import get_engine  # noqa: E402
+from course.week1.day2.schema import apply_indexes  # noqa: E402
+import bi_templates_runner as runner  # noqa: E402
+
+# The stub always picks avg_p1_by_segment; the questions vary how often the
+# local ranking has it among the speculated candidates
+QUESTIONS = [
+    "What's the average p1 by segment for the last 90 days?",
+    "Average p1 per segment, last 30 days",
+    "How many users per member rating?",
+    "Show top purchase frequency by segment in the last 60 days",
+]
+
+
+def _seed(rows: int, seed: int = 7) -> None:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "user_email": [f"user{i}@example.com" for i in range(rows)],
+        "p1": rng.beta(2.0, 3.0, rows).round(4),
+        "member_rating": rng.integers(1, 6, rows),
+        "purchase_frequency": rng.poisson(4, rows),
+        "recency_days": rng.integers(0, 365, rows),
+        "segment": rng.integers(0, 5, rows),
+    })
+    with bulk_transaction(get_engine(runner.DB_URL)) as conn:
+        write_frame(df, "customer_features", conn)
+        apply_indexes(conn)
+
+
+def _run(pipeline: bool, repeat: int) -> list:
+    out = []
+    for _ in range(repeat):
+        for q in QUESTIONS:
+            out.append(runner.exec_bi(q, pipeline=pipeline)["timings"])
+    return out
+
+
+def _run_stream(repeat: int) -> list:
+    out = []
+    for _ in range(repeat):
+        for q in QUESTIONS:
+            result = runner.exec_bi_stream(q)
+            for _chunk in result["explanation_stream"]:
+                pass  # a dashboard would render each chunk here
+            out.append(result["timings"])
+    return out
+
+
+def _report(label: str, timings: list) -> None:
+    mean = lambda k: statistics.mean(t[k] for t in timings) * 1000  # noqa: E731
+    hits = sum(t["speculation_hit"] for t in timings)
+    print(f"{label:<11} result={mean('result_s'):7.1f} ms  first text={mean('ttft_s'):7.1f} ms  total={mean('total_s'):7.1f} ms  "
+          f"pick={mean('pick_s'):6.1f}  sql={mean('sql_s'):6.1f}  sql_wait={mean('sql_wait_s'):6.1f}  "
+          f"explain={mean('explain_s'):6.1f}  speculation hits={hits}/{len(timings)}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sequential vs pipelined vs streamed exec_bi latency.")
+    ap.add_argument("--rows", type=int, default=500_000, help="Synthetic customer_features rows.")
+    ap.add_argument("--llm-ms", type=float, default=300.0, help="Stub Claude latency per call.")
+    ap.add_argument("--token-ms", type=float, default=20.0, help="Stub generation time per word.")
+    ap.add_argument("--k", type=int, default=2, help="Templates to speculate on.")
+    ap.add_argument("--repeat", type=int, default=3, help="Passes over the question set.")
+    args = ap.parse_args()
+
+    _seed(args.rows)
+    runner.SPECULATE_K = args.k
+    os.environ.setdefault("ANTHROPIC_API_KEY", "bench-key")
+    # One reply serves both calls: valid pick JSON, and ~60 words for the summary to stream
+    reply = json.dumps({"template": "avg_p1_by_segment", "note": " ".join(["Segment 3 leads on p1."] * 12)})
+    with FakeAnthropicServer(reply_text=reply, delay_s=args.llm_ms / 1000, token_delay_s=args.token_ms / 1000) as srv:
+        os.environ["ANTHROPIC_BASE_URL"] = srv.base_url
+        runner.exec_bi(QUESTIONS[0], pipeline=False)  # warm-up: client pool, page cache
+        seq = _run(False, args.repeat)
+        pipe = _run(True, args.repeat)
+        streamed = _run_stream(args.repeat)
+
+    print(f"customer_features rows: {args.rows:,}  stub LLM: {args.llm_ms:.0f} ms/call "
+          f"+ {args.token_ms:.0f} ms/word  k={args.k}")
+    _report("sequential", seq)
+    _report("pipelined", pipe)
+    _report("streamed", streamed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# bench_bi_templates.py
+"""
+Throughput benchmark: repeated BI template execution.
+
+Compares the old pattern (create_engine() on every query) with the shared
+pooled engine used by bind_and_run(). Runs against a throwaway SQLite file
+filled with synthetic customer_features rows — no API key needed.
+
+Run:
+  python bench_bi_templates.py --rows 20000 --queries 500
+"""
+from __future__ import annotations
+import argparse, os, tempfile, time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from course.week1.day2.db_engine import get_engine, dispose_engines
+from sql_templates import TEMPLATES
+
+
+def _seed(url: str, rows: int, seed: int = 7) -> None:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "user_email": [f"user{i}@example.com" for i in range(rows)],
+        "p1": rng.beta(2.0, 3.0, rows).round(4),
+        "member_rating": rng.integers(1, 6, rows),
+        "purchase_frequency": rng.poisson(4, rows),
+        "recency_days": rng.integers(0, 365, rows),
+        "segment": rng.integers(0, 5, rows),
+    })
+    with get_engine(url).begin() as conn:
+        df.to_sql("customer_features", conn, if_exists="replace", index=False, chunksize=50_000)
+
+
+def _workload(n: int):
+    names = list(TEMPLATES)
+    days = [None, 30, 60, 90, 180]
+    for i in range(n):
+        yield names[i % len(names)], {"days": days[i % len(days)]}
+
+
+def _run_fresh_engine(url: str, n: int) -> float:
+    t0 = time.perf_counter()
+    for name, bound in _workload(n):
+        eng = create_engine(url, future=True)
+        with eng.connect() as c:
+            pd.read_sql(TEMPLATES[name]["sql"], c, params=bound)
+        eng.dispose()
+    return time.perf_counter() - t0
+
+
+def _run_shared_engine(url: str, n: int) -> float:
+    eng = get_engine(url)
+    t0 = time.perf_counter()
+    for name, bound in _workload(n):
+        with eng.connect() as c:
+            pd.read_sql(TEMPLATES[name]["sql"], c, params=bound)
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="BI template throughput: fresh vs shared engine.")
+    ap.add_argument("--rows", type=int, default=20_000, help="Synthetic customer_features rows.")
+    ap.add_argument("--queries", type=int, default=500, help="Template executions per variant.")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        _seed(url, args.rows)
+        _run_shared_engine(url, len(TEMPLATES))  # warm page cache for both variants
+
+        fresh = _run_fresh_engine(url, args.queries)
+        shared = _run_shared_engine(url, args.queries)
+        dispose_engines()
+
+    print(f"customer_features rows: {args.rows:,}  queries: {args.queries}")
+    print(f"fresh engine per query : {args.queries / fresh:8.1f} q/s  ({fresh / args.queries * 1000:.2f} ms/q)")
+    print(f"shared pooled engine   : {args.queries / shared:8.1f} q/s  ({shared / args.queries * 1000:.2f} ms/q)")
+    print(f"speed-up: {fresh / shared:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# bi_cache.py
+"""
+LRU cache of BI template results.
+
+customer_features only changes when the Day 2 builder runs, so the same
+(template, params) answer can be reused until then. Entries are keyed by
+(database, template, bound params, feature version); every build stamps a
+new version (course/week1/day2/feature_version.py), so old entries simply
+stop matching and are dropped the first time a new version is seen. Other
+writers of customer_features (the KMeans step assigning `segment`, rows
+loaded by hand) have to bump the version too, or their changes are not
+seen until the next build.
+
+Databases that no builder has stamped yet have no version; those queries
+bypass the cache rather than risk serving stale rows.
+
+Persistence is optional: with BI_CACHE_PATH set, entries are written
+through to a JSON file and reloaded on start, so a restarted app keeps its
+warm answers (they are still checked against the current version).
+
+Settings (.env): BI_CACHE (1|0), BI_CACHE_SIZE, BI_CACHE_PATH
+"""
+from __future__ import annotations
+import json, os, tempfile, threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+ENABLED = os.getenv("BI_CACHE", "1") == "1"
+CAPACITY = int(os.getenv("BI_CACHE_SIZE", "256"))
+PATH = os.getenv("BI_CACHE_PATH", "")
+
+Key = Tuple[str, str, str, str]          # (db url, template, params json, version)
+Entry = Tuple[pd.DataFrame, str]         # (result frame, source)
+
+
+def make_key(db_url: str, template: str, bound: Dict[str, Any], version: str) -> Key:
+    return (db_url, template, json.dumps(bound, sort_keys=True), version)
+
+
+class ResultCache:
+    """Thread-safe LRU of (df, source) with hit/miss counters."""
+
+    def __init__(self, capacity: int = CAPACITY, path: str = PATH):
+        self.capacity = max(1, capacity)
+        self.path = path
+        self._entries: "OrderedDict[Key, Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.bypassed = self.evictions = 0
+        if path:
+            self._load()
+
+    def get(self, key: Key) -> Optional[Entry]:
+        with self._lock:
+            self._drop_other_versions(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        df, source = entry
+        return df.copy(), source
+
+    def put(self, key: Key, df: pd.DataFrame, source: str) -> None:
+        with self._lock:
+            self._entries[key] = (df.copy(), source)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            if self.path:
+                self._save()
+
+    def bypass(self) -> None:
+        with self._lock:
+            self.bypassed += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self.path:
+                self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def _drop_other_versions(self, key: Key) -> None:
+        """A new version for this database makes every older entry for it unreachable."""
+        db_url, version = key[0], key[3]
+        stale = [k for k in self._entries if k[0] == db_url and k[3] != version]
+        for k in stale:
+            del self._entries[k]
+        if stale and self.path:
+            self._save()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                items = json.load(f)
+        except (OSError, ValueError):
+            return  # missing or unreadable file: start cold
+        for item in items[-self.capacity:]:
+            df = pd.DataFrame.from_records(item["rows"], columns=item["columns"])
+            self._entries[tuple(item["key"])] = (df, item["source"])
+
+    def _save(self) -> None:
+        items = [
+            {"key": list(k), "columns": list(df.columns), "rows": df.to_dict(orient="records"), "source": source}
+            for k, (df, source) in self._entries.items()
+        ]
+        folder = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(items, f)
+        os.replace(tmp, self.path)  # atomic: readers never see half a file
+
+
+# Process-wide cache used by bind_and_run()
+CACHE = ResultCache()
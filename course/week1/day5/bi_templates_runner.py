@@ -1,38 +1,87 @@
 # bi_templates_runner.py
 """
 BI runner:
-1) Ask Claude to select the best template from the registry (enumeration).
+1) Select the best template from the registry (enumeration): the local
+   TF-IDF selector (template_selector.py) answers when it is sure, Claude
+   only when its margin is low (BI_SELECTOR=hybrid|local|claude).
 2) Extract and validate params from the question (days, segment_id).
-3) Bind params safely, execute SQL via SQLAlchemy.
+3) Bind params safely, execute SQL via SQLAlchemy (results cached until the
+   next feature build - see bi_cache.py).
 4) Ask Claude for a concise exec explanation of the JSON payload.
 
+Steps 1-3 are pipelined: params are extracted locally and, when the pick
+goes to Claude, the SQL for the BI_SPECULATE_K most likely templates (local
+ranking, rank_templates()) starts while Claude is still picking. The pick
+then claims its result (or
+runs its own query if it wasn't a candidate) and the other runs are
+discarded. Results carry per-stage timings. BI_PIPELINE=0 runs the steps
+strictly in sequence.
+
+exec_bi_stream() returns as soon as the rows are ready and streams step 4,
+so a dashboard can draw the table/chart first and type the summary out.
+
+Identical questions asked concurrently (several dashboards on the same
+default question) share one run - see course/week1/day1/single_flight.py:
+exec_bi/aexec_bi coalesce the whole answer; the stream variants coalesce
+steps 1-3 plus one explanation stream that every caller reads. Results say
+"coalesced": True for the callers that joined; every caller gets its own
+copy of the rows, timings and trace, and a joiner's "llm_usage" is zeroed
+(the run's is under llm_usage["shared"]) so per-request costs add up.
+SINGLE_FLIGHT=0 disables it.
+
+Results also carry "llm_usage": the Claude calls the run made (pick,
+explanation) with tokens, cost and latency per node (day1/llm_metrics.py),
+and "trace": the run's span tree (day1/tracing.py) - param extraction,
+template selection, speculative and final SQL, DataFrame conversion and
+each Claude call.
+
 No LLM-generated SQL is executed.
 """
 from __future__ import annotations
-import os, json, time
-from typing import Dict, Any, Tuple
+import asyncio, contextvars, copy, os, json, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 
 import pandas as pd
-from sqlalchemy import create_engine
 from dotenv import load_dotenv
+from sqlalchemy.exc import DBAPIError
 
-from course.week1.day1.anthropic_client import ClaudeClient
+from course.week1.day1.anthropic_client import AsyncTextStream, TextStream, get_client, get_async_client
+from course.week1.day1.llm_metrics import shared_usage, track_usage
+from course.week1.day1.tracing import span
+from course.week1.day1.single_flight import (
+    ENABLED as COALESCE, AsyncSharedStream, SharedStream, SingleFlight, caller_result, question_key,
+)
+from course.week1.day2.db_engine import get_engine
+from course.week1.day2.feature_version import built_from_current, get_feature_version
+from course.week1.day2.rollup import RECENCY_BUCKET_CAP, ROLLUP_TABLE
+from bi_cache import CACHE, ENABLED as CACHE_ENABLED, make_key
 from sql_templates import TEMPLATES, list_templates
 from safe_params import extract_days, extract_segment, validate_params
+from template_selector import Selection, get_index, select_local
 
 load_dotenv()
 DB_URL = os.getenv("DATABASE_URL", "sqlite:///data/leads_scored_segmentation.db")
+# Answer from customer_features_rollup when it exists and matches customer_features (Day 2 build writes it)
+USE_ROLLUP = os.getenv("BI_USE_ROLLUP", "1") == "1"
+# Template selection: hybrid = local unless unsure, then Claude; local / claude = only that
+SELECTOR = os.getenv("BI_SELECTOR", "hybrid")
+# Speculative SQL for the top-k candidate templates while Claude picks
+PIPELINE = os.getenv("BI_PIPELINE", "1") == "1"
+SPECULATE_K = int(os.getenv("BI_SPECULATE_K", "2"))
+_SQL_POOL = ThreadPoolExecutor(max_workers=int(os.getenv("BI_SQL_WORKERS", "4")), thread_name_prefix="bi-sql")
+# Concurrent identical questions share one run (per pipeline flavour)
+FLIGHTS = SingleFlight("exec_bi")
+STREAM_FLIGHTS = SingleFlight("exec_bi_stream")
+
 
 SYSTEM_PICK = "You are a strict JSON classifier. Output ONLY valid JSON."
 SYSTEM_EXPLAIN = "You are a concise executive analyst. Output plain text only."
 
-def pick_template(question: str) -> str:
-    """
-    Use Claude to select a template from TEMPLATES (by name).
-    """
+def _pick_prompt(question: str) -> str:
     names = list(TEMPLATES.keys())
     listing = json.dumps(names)
-    user = f"""
+    return f"""
 Return ONLY valid JSON with key: {{"template": one_of_names}}
 
 where one_of_names ∈ {listing}
@@ -47,17 +96,109 @@ Guidance:
 
 Return: {{"template": "<name>"}}
 """
-    client = ClaudeClient()
-    raw = client.json_call(system=SYSTEM_PICK, user=user, max_tokens=200)
+
+def _parse_template(raw: str) -> str:
     try:
         return json.loads(raw)["template"]
     except Exception:
         # safe default
         return "avg_p1_by_segment"
 
+def _explain_prompt(question: str, template_name: str, params: Dict[str, Any], rows: list) -> str:
+    return (
+        "Explain the BI result in <= 4 sentences for executives. "
+        f"Question: {question}\n"
+        f"Template: {template_name}\n"
+        f"Params: {json.dumps(params)}\n"
+        f"Data (JSON rows): {json.dumps(rows)}"
+    )
+
+def _extract_params(question: str) -> Dict[str, Any]:
+    with span("bi.extract_params") as sp:
+        days = extract_days(question)
+        seg = extract_segment(question)
+        params = validate_params({"days": days, "segment_id": seg})
+        sp.set_attributes(**params)
+    return params
+
+def rank_templates(question: str) -> List[str]:
+    """All template names, most likely first (local selector scores)."""
+    scores = get_index().scores(question or "")
+    return sorted(scores, key=scores.get, reverse=True)
+
+def pick_template_llm(question: str) -> str:
+    """
+    Use Claude to select a template from TEMPLATES (by name).
+    """
+    client = get_client()
+    raw = client.json_call(system=SYSTEM_PICK, user=_pick_prompt(question), max_tokens=200, node="pick_template")
+    return _parse_template(raw)
+
+async def apick_template_llm(question: str) -> str:
+    """Async pick_template_llm (shares the client concurrency cap)."""
+    client = get_async_client()
+    raw = await client.json_call(system=SYSTEM_PICK, user=_pick_prompt(question), max_tokens=200, node="pick_template")
+    return _parse_template(raw)
+
+def _try_local(question: str, selector: str) -> Tuple[Optional[Selection], bool]:
+    """(local selection or None, whether it stands without Claude)."""
+    if selector == "claude":
+        return None, False
+    local = select_local(question)
+    return local, selector == "local" or local.confident
+
+def _escalated(local: Optional[Selection], template_name: str) -> Selection:
+    # keep the local score/margin: they say why Claude was asked
+    return Selection(template_name, local.score if local else 0.0, local.margin if local else 0.0, "claude")
+
+def choose_template(question: str, selector: str = SELECTOR) -> Selection:
+    """Template + where the choice came from ("local" or "claude") and the local score/margin."""
+    local, accepted = _try_local(question, selector)
+    return local if accepted else _escalated(local, pick_template_llm(question))
+
+async def achoose_template(question: str, selector: str = SELECTOR) -> Selection:
+    local, accepted = _try_local(question, selector)
+    return local if accepted else _escalated(local, await apick_template_llm(question))
+
+def pick_template(question: str, selector: str = SELECTOR) -> str:
+    return choose_template(question, selector).template
+
+async def apick_template(question: str, selector: str = SELECTOR) -> str:
+    return (await achoose_template(question, selector)).template
+
+def _run_template(tpl: Dict[str, Any], bound: Dict[str, Any],
+                  version: Optional[str] = None) -> Tuple[pd.DataFrame, str]:
+    eng = get_engine(DB_URL)
+    days = bound["days"]
+    use_rollup = USE_ROLLUP and "rollup_sql" in tpl and (days is None or 0 <= days <= RECENCY_BUCKET_CAP)
+    if use_rollup:
+        with span("sql.rollup_check") as sp, eng.connect() as c:
+            use_rollup = built_from_current(c, ROLLUP_TABLE, version)  # not stale (e.g. built before KMeans)
+            sp.set_attribute("current", use_rollup)
+    if use_rollup:
+        try:
+            with span("sql.execute", source="rollup") as sp, eng.connect() as c:
+                df = pd.read_sql(tpl["rollup_sql"], c, params=bound)
+                sp.set_attribute("rows", len(df))
+                return df, "rollup"
+        except (DBAPIError, pd.errors.DatabaseError):  # no rollup yet (older DB) -> raw table
+            pass
+    with span("sql.execute", source="customer_features") as sp, eng.connect() as c:
+        df = pd.read_sql(tpl["sql"], c, params=bound)
+        sp.set_attribute("rows", len(df))
+        return df, "customer_features"
+
 def bind_and_run(template_name: str, params: Dict[str, Any]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """
     Bind params and execute the approved template. Returns (df, payload_dict)
+
+    Uses the template's rollup twin when the rollup table is there, was built
+    from the current feature version (not before KMeans added `segment`,
+    say) and days is within its buckets; falls back to the raw
+    customer_features query otherwise. payload["source"] says which.
+
+    Results are cached per feature version (bi_cache.py); payload["cache_hit"]
+    is True/False, or None when the database has no version to key on.
     """
     if template_name not in TEMPLATES:
         raise ValueError(f"Unknown template: {template_name}")
@@ -65,48 +206,293 @@ def bind_and_run(template_name: str, params: Dict[str, Any]) -> Tuple[pd.DataFra
     tpl = TEMPLATES[template_name]
     # We only use 'days' in these templates; segment_id can inform narrative later.
     bound = {"days": params.get("days")}
-    eng = create_engine(DB_URL, future=True)
-    with eng.connect() as c:
-        df = pd.read_sql(tpl["sql"], c, params=bound)
+
+    with span("sql.bind_and_run", template=template_name) as sp:
+        key, hit, cached, version = None, None, None, None
+        if CACHE_ENABLED:
+            # Read the version *before* the data: a build landing in between can
+            # only file newer rows under the older key, never stale rows under the new one.
+            with span("sql.feature_version"), get_engine(DB_URL).connect() as c:
+                version = get_feature_version(c)
+            if version is None:
+                CACHE.bypass()
+            else:
+                key = make_key(DB_URL, template_name, bound, version)
+                cached = CACHE.get(key)
+                hit = cached is not None
+
+        if cached is not None:
+            df, source = cached
+        else:
+            df, source = _run_template(tpl, bound, version)
+            if key is not None:
+                CACHE.put(key, df, source)
+
+        with span("bi.to_records", rows=len(df)):
+            rows = df.to_dict(orient="records")
+        sp.set_attributes(source=source, cache_hit=hit, rows=len(rows))
+
     payload = {
         "template": template_name,
         "params": bound,
-        "rows": df.to_dict(orient="records"),
+        "source": source,
+        "cache_hit": hit,
+        "rows": rows,
     }
     return df, payload
 
-def exec_bi(question: str) -> Dict[str, Any]:
-    """
-    End-to-end BI: template selection -> execution -> explanation
-    """
-    t0 = time.time()
-    template_name = pick_template(question)
-    days = extract_days(question)
-    seg = extract_segment(question)
-    params = validate_params({"days": days, "segment_id": seg})
-
+def _timed_run(template_name: str, params: Dict[str, Any]) -> Tuple[pd.DataFrame, Dict[str, Any], float]:
+    t0 = time.perf_counter()
     df, payload = bind_and_run(template_name, params)
-    elapsed = time.time() - t0
-
-    # Use Claude for a short exec explanation
-    client = ClaudeClient()
-    explanation = client.json_call(
-        system=SYSTEM_EXPLAIN,
-        user=(
-            "Explain the BI result in <= 4 sentences for executives. "
-            f"Question: {question}\n"
-            f"Template: {template_name}\n"
-            f"Params: {json.dumps(params)}\n"
-            f"Data (JSON rows): {json.dumps(payload['rows'])}"
-        ),
-        max_tokens=300
-    )
+    return df, payload, time.perf_counter() - t0
+
+def _speculative_run(template_name: str, params: Dict[str, Any]) -> Tuple[pd.DataFrame, Dict[str, Any], float]:
+    with span("bi.speculative_sql", template=template_name):
+        return _timed_run(template_name, params)
 
+def _selected(sp, selection: Selection) -> Selection:
+    sp.set_attributes(template=selection.template, source=selection.source,
+                      score=round(selection.score, 4), margin=round(selection.margin, 4))
+    return selection
+
+def _coalesced(flights: SingleFlight, question: str, pipeline: bool, fn) -> Tuple[Any, bool]:
+    if not COALESCE:
+        return fn(), False
+    return flights.do((question_key(question), pipeline), fn)
+
+async def _acoalesced(flights: SingleFlight, question: str, pipeline: bool, fn) -> Tuple[Any, bool]:
+    if not COALESCE:
+        return await fn(), False
+    return await flights.ado((question_key(question), pipeline), fn)
+
+def _usage(usage, shared: bool) -> Dict[str, Any]:
+    return shared_usage(usage.summary()) if shared else usage.summary()
+
+def _result(question, selection, params, payload, timings, explanation) -> Dict[str, Any]:
     return {
         "question": question,
-        "template": template_name,
+        "template": selection.template,
+        "selection": {"source": selection.source, "score": selection.score, "margin": selection.margin},
         "params": params,
-        "latency_s": round(elapsed, 3),
+        "latency_s": timings["result_s"],
+        "timings": timings,
+        "cache": {"hit": payload["cache_hit"], **CACHE.stats()},
         "rows": payload["rows"],
         "explanation": explanation.strip(),
     }
+
+def _fetch_rows(question: str, pipeline: bool) -> Tuple[Selection, Dict[str, Any], Dict[str, Any], Dict[str, Any], float]:
+    """
+    Steps 1-3 (pick || speculative SQL). Returns (selection, params,
+    payload, timings so far, start time); the caller adds the explanation.
+    """
+    t0 = time.perf_counter()
+    params = _extract_params(question)
+    t_params = time.perf_counter()
+
+    # Speculate only when the pick goes to Claude; a local pick is already instant
+    with span("bi.select_template", selector=SELECTOR) as sp:
+        local, accepted = _try_local(question, SELECTOR)
+        candidates = rank_templates(question)[:SPECULATE_K] if pipeline and not accepted else []
+        # each query gets a copy of our context so its spans join this trace
+        futures = {name: _SQL_POOL.submit(contextvars.copy_context().run, _speculative_run, name, params)
+                   for name in candidates}
+
+        try:
+            selection = _selected(sp, local if accepted else _escalated(local, pick_template_llm(question)))
+        except BaseException:
+            for fut in futures.values():
+                fut.cancel()
+            raise
+    t_pick = time.perf_counter()
+    template_name = selection.template
+
+    winner = futures.pop(template_name, None)
+    for fut in futures.values():
+        fut.cancel()  # queued losers never start; running ones just fill the cache
+
+    # cancel() fails once the query has started: take its result. A winner still
+    # queued behind other requests' queries runs here instead of waiting.
+    if winner is not None and not winner.cancel():
+        df, payload, sql_s = winner.result()
+    else:
+        df, payload, sql_s = _timed_run(template_name, params)
+    t_rows = time.perf_counter()
+
+    return selection, params, payload, _timings(t0, t_params, t_pick, t_rows, sql_s, candidates, template_name), t0
+
+async def _afetch_rows(question: str, pipeline: bool) -> Tuple[Selection, Dict[str, Any], Dict[str, Any], Dict[str, Any], float]:
+    """Async _fetch_rows: the pick is awaited, the (blocking) SQL runs in worker threads."""
+    t0 = time.perf_counter()
+    params = _extract_params(question)
+    t_params = time.perf_counter()
+
+    with span("bi.select_template", selector=SELECTOR) as sp:
+        local, accepted = _try_local(question, SELECTOR)
+        candidates = rank_templates(question)[:SPECULATE_K] if pipeline and not accepted else []
+        tasks = {name: asyncio.create_task(asyncio.to_thread(_speculative_run, name, params)) for name in candidates}
+
+        try:
+            selection = _selected(sp, local if accepted else _escalated(local, await apick_template_llm(question)))
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+    t_pick = time.perf_counter()
+    template_name = selection.template
+
+    winner = tasks.pop(template_name, None)
+    for task in tasks.values():
+        task.cancel()
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())  # losers' errors don't matter
+    if winner is not None:
+        df, payload, sql_s = await winner
+    else:
+        df, payload, sql_s = await asyncio.to_thread(_timed_run, template_name, params)
+    t_rows = time.perf_counter()
+
+    return selection, params, payload, _timings(t0, t_params, t_pick, t_rows, sql_s, candidates, template_name), t0
+
+def _timings(t0, t_params, t_pick, t_rows, sql_s, candidates, template_name) -> Dict[str, Any]:
+    return {
+        "params_s": round(t_params - t0, 4),
+        "pick_s": round(t_pick - t_params, 3),
+        "sql_s": round(sql_s, 4),
+        "sql_wait_s": round(t_rows - t_pick, 4),
+        "result_s": round(t_rows - t0, 3),
+        "speculated": candidates,
+        "speculation_hit": template_name in candidates,
+    }
+
+def _finish_timings(timings: Dict[str, Any], t0: float, t_first: float, t_end: float,
+                    explain_ttft_s: float, explain_s: float) -> None:
+    timings.update({
+        "explain_ttft_s": round(explain_ttft_s, 3),
+        "explain_s": round(explain_s, 3),
+        "ttft_s": round(t_first - t0, 3),
+        "total_s": round(t_end - t0, 3),
+    })
+
+def _explain_args(question, template_name, params, payload) -> Dict[str, Any]:
+    return {
+        "system": SYSTEM_EXPLAIN,
+        "user": _explain_prompt(question, template_name, params, payload["rows"]),
+        "max_tokens": 300,
+        "node": "bi_explain",
+    }
+
+def exec_bi(question: str, pipeline: bool = PIPELINE) -> Dict[str, Any]:
+    """
+    End-to-end BI: template selection -> execution -> explanation
+
+    result["timings"] (seconds): params_s, pick_s, sql_s (winning query's own
+    run time), sql_wait_s (time blocked on it after the pick), result_s (=
+    latency_s, question -> rows), explain_s, ttft_s (question -> first
+    summary text; here the whole summary), total_s, plus "speculated"
+    (candidate names) and "speculation_hit". result["selection"] says
+    whether the local selector or Claude picked, with the local score/margin.
+    result["llm_usage"] breaks down Claude tokens / cost / latency by node;
+    result["trace"] is the span tree of the run (tracing.py).
+    result["coalesced"] is True when this call joined an identical one
+    already in flight (timings and trace are then that run's, and
+    llm_usage counts no calls of its own - see llm_metrics.shared_usage).
+    """
+    result, shared = _coalesced(FLIGHTS, question, pipeline, lambda: _exec_bi(question, pipeline))
+    return caller_result(result, shared)
+
+def _exec_bi(question: str, pipeline: bool) -> Dict[str, Any]:
+    with track_usage() as usage, span("bi.exec_bi", question=question, pipeline=pipeline) as sp:
+        selection, params, payload, timings, t0 = _fetch_rows(question, pipeline)
+        t_rows = time.perf_counter()
+
+        # Use Claude for a short exec explanation
+        client = get_client()
+        explanation = client.json_call(**_explain_args(question, selection.template, params, payload))
+        t_end = time.perf_counter()
+
+    _finish_timings(timings, t0, t_end, t_end, t_end - t_rows, t_end - t_rows)
+    return dict(_result(question, selection, params, payload, timings, explanation),
+                llm_usage=usage.summary(), trace=sp.tree())
+
+def _stream_source(question: str, pipeline: bool):
+    with track_usage() as usage, span("bi.exec_bi_stream", question=question, pipeline=pipeline) as sp:
+        selection, params, payload, timings, t0 = _fetch_rows(question, pipeline)
+        text = SharedStream(get_client().stream_call(**_explain_args(question, selection.template, params, payload)))
+    return selection, params, payload, timings, t0, text, usage, sp
+
+def exec_bi_stream(question: str, pipeline: bool = PIPELINE) -> Dict[str, Any]:
+    """
+    exec_bi that returns as soon as the rows are ready, with the explanation
+    as a stream: iterate result["explanation_stream"] (a TextStream of text
+    deltas) to render it as Claude writes. When the stream ends,
+    result["explanation"] and the explanation timings (explain_ttft_s,
+    explain_s, ttft_s, total_s) are filled in and result["llm_usage"] and
+    result["trace"] (in place) updated, matching exec_bi's result. The
+    explanation's span outlives the bi.exec_bi_stream span, which ends
+    when the rows are ready.
+    Concurrent identical calls share one run and one Claude stream; each
+    gets its own copy of the rows and timings.
+    """
+    source, shared = _coalesced(STREAM_FLIGHTS, question, pipeline, lambda: _stream_source(question, pipeline))
+    selection, params, payload, timings, t0, text, usage, sp = source
+    payload, timings = copy.deepcopy(payload), copy.deepcopy(timings)  # this caller's own
+    result = _result(question, selection, params, payload, timings, "")
+    result["coalesced"] = shared
+    result["llm_usage"] = _usage(usage, shared)
+    result["trace"] = sp.tree()
+
+    def _done(stream):
+        result["explanation"] = stream.text.strip()
+        result["llm_usage"] = _usage(usage, shared)
+        result["trace"].update(sp.tree())
+        _finish_timings(timings, t0, stream.first_token_at, stream.finished_at, stream.ttft_s, stream.stream_s)
+
+    result["explanation_stream"] = TextStream(text.subscribe(), on_done=_done)
+    return result
+
+async def aexec_bi(question: str, pipeline: bool = PIPELINE) -> Dict[str, Any]:
+    """
+    Async exec_bi: LLM calls are awaited, the (blocking) SQL runs in worker
+    threads, speculatively alongside the pick when pipelining (same timings).
+    Coalesces with identical calls on the same event loop.
+    """
+    result, shared = await _acoalesced(FLIGHTS, question, pipeline, lambda: _aexec_bi(question, pipeline))
+    return caller_result(result, shared)
+
+async def _aexec_bi(question: str, pipeline: bool) -> Dict[str, Any]:
+    with track_usage() as usage, span("bi.exec_bi", question=question, pipeline=pipeline) as sp:
+        selection, params, payload, timings, t0 = await _afetch_rows(question, pipeline)
+        t_rows = time.perf_counter()
+
+        client = get_async_client()
+        explanation = await client.json_call(**_explain_args(question, selection.template, params, payload))
+        t_end = time.perf_counter()
+
+    _finish_timings(timings, t0, t_end, t_end, t_end - t_rows, t_end - t_rows)
+    return dict(_result(question, selection, params, payload, timings, explanation),
+                llm_usage=usage.summary(), trace=sp.tree())
+
+async def _astream_source(question: str, pipeline: bool):
+    with track_usage() as usage, span("bi.exec_bi_stream", question=question, pipeline=pipeline) as sp:
+        selection, params, payload, timings, t0 = await _afetch_rows(question, pipeline)
+        text = AsyncSharedStream(get_async_client().stream_call(**_explain_args(question, selection.template, params, payload)))
+    return selection, params, payload, timings, t0, text, usage, sp
+
+async def aexec_bi_stream(question: str, pipeline: bool = PIPELINE) -> Dict[str, Any]:
+    """Async exec_bi_stream: `async for chunk in result["explanation_stream"]`."""
+    source, shared = await _acoalesced(STREAM_FLIGHTS, question, pipeline, lambda: _astream_source(question, pipeline))
+    selection, params, payload, timings, t0, text, usage, sp = source
+    payload, timings = copy.deepcopy(payload), copy.deepcopy(timings)  # this caller's own
+    result = _result(question, selection, params, payload, timings, "")
+    result["coalesced"] = shared
+    result["llm_usage"] = _usage(usage, shared)
+    result["trace"] = sp.tree()
+
+    def _done(stream):
+        result["explanation"] = stream.text.strip()
+        result["llm_usage"] = _usage(usage, shared)
+        result["trace"].update(sp.tree())
+        _finish_timings(timings, t0, stream.first_token_at, stream.finished_at, stream.ttft_s, stream.stream_s)
+
+    result["explanation_stream"] = AsyncTextStream(text.subscribe(), on_done=_done)
+    return result
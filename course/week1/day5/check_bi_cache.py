@@ -0,0 +1,116 @@
+# check_bi_cache.py
+"""
+Check the BI result cache: repeat queries hit, a feature-version bump
+invalidates, so does a write outside the build that bumps the version
+(as the KMeans step must), LRU evicts, and a persisted cache reloads. Also prints the
+latency of a cached vs uncached bind_and_run().
+
+Seeds a throwaway SQLite file with synthetic customer_features and its
+rollup. Exits nonzero on any failure. No API key needed.
+
+Run:
+  python check_bi_cache.py --rows 200000
+"""
+from __future__ import annotations
+import argparse, os, sys, tempfile, time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# Point bi_templates_runner at a scratch database *before* importing it
+_TMP = tempfile.mkdtemp(prefix="bi_cache_check_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'check.db')}"
+
+from course.week1.day2.bulk_write import bulk_transaction, write_frame  # noqa: E402
+from course.week1.day2.db_engine import get_engine  # noqa: E402
+from course.week1.day2.feature_version import bump_feature_version  # noqa: E402
+from course.week1.day2.rollup import refresh_rollup  # noqa: E402
+from bi_cache import CACHE, ResultCache, make_key  # noqa: E402
+from bi_templates_runner import DB_URL, bind_and_run  # noqa: E402
+
+
+def _seed(rows: int, seed: int = 7) -> None:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "user_email": [f"user{i}@example.com" for i in range(rows)],
+        "p1": rng.beta(2.0, 3.0, rows).round(4),
+        "member_rating": rng.integers(1, 6, rows),
+        "purchase_frequency": rng.poisson(4, rows),
+        "recency_days": rng.integers(0, 365, rows),
+        "segment": rng.integers(0, 5, rows),
+    })
+    with bulk_transaction(get_engine(DB_URL)) as conn:
+        write_frame(df, "customer_features", conn)
+        refresh_rollup(conn)
+
+
+def _bump() -> None:
+    with get_engine(DB_URL).begin() as conn:
+        bump_feature_version(conn)
+
+
+def _timed(template: str, days) -> tuple:
+    t0 = time.perf_counter()
+    df, payload = bind_and_run(template, {"days": days})
+    return df, payload, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check BI result caching and invalidation.")
+    ap.add_argument("--rows", type=int, default=200_000, help="Synthetic customer_features rows.")
+    args = ap.parse_args()
+    _seed(args.rows)
+
+    checks = []
+
+    _, p, _ = _timed("avg_p1_by_segment", 30)
+    checks.append(("unversioned database bypasses the cache", p["cache_hit"] is None))
+
+    _bump()
+    df1, p1, miss_s = _timed("avg_p1_by_segment", 30)
+    df2, p2, hit_s = _timed("avg_p1_by_segment", 30)
+    checks.append(("first query misses, repeat hits", p1["cache_hit"] is False and p2["cache_hit"] is True))
+    checks.append(("hit returns the same rows", p1["rows"] == p2["rows"] and df1.equals(df2)))
+    _, p3, _ = _timed("avg_p1_by_segment", 60)
+    checks.append(("different params miss", p3["cache_hit"] is False))
+
+    size_before = CACHE.stats()["size"]
+    _bump()
+    _, p4, _ = _timed("avg_p1_by_segment", 30)
+    checks.append(("version bump invalidates", p4["cache_hit"] is False and CACHE.stats()["size"] == 1 < size_before))
+
+    with get_engine(DB_URL).begin() as conn:  # a writer outside the build, bumping as it must
+        conn.execute(text("INSERT INTO customer_features (user_email, p1, member_rating, purchase_frequency, "
+                          "recency_days, segment) VALUES ('late@example.com', 0.5, 3, 2, 1, 9)"))
+        bump_feature_version(conn)
+    _, p5, _ = _timed("avg_p1_by_segment", 30)
+    checks.append(("a row added outside the build (with a bump) misses and is counted",
+                   p5["cache_hit"] is False and any(r["segment"] == 9 for r in p5["rows"])))
+
+    small = ResultCache(capacity=2, path="")
+    frame = pd.DataFrame({"a": [1]})
+    for i in range(3):
+        small.put(make_key(DB_URL, f"t{i}", {}, "v"), frame, "rollup")
+    evicted = small.get(make_key(DB_URL, "t0", {}, "v")) is None
+    kept = small.get(make_key(DB_URL, "t2", {}, "v")) is not None
+    checks.append(("LRU evicts the oldest entry", evicted and kept and small.stats()["evictions"] == 1))
+
+    path = os.path.join(_TMP, "cache.json")
+    key = make_key(DB_URL, "avg_p1_by_segment", {"days": 30}, "v1")
+    ResultCache(path=path).put(key, df1, "rollup")
+    reloaded = ResultCache(path=path).get(key)
+    ok = reloaded is not None and reloaded[1] == "rollup"
+    checks.append(("persisted cache reloads", ok and reloaded[0].to_dict("records") == df1.to_dict("records")))
+
+    failures = 0
+    for label, ok in checks:
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {label}")
+    print(f"→ customer_features rows: {args.rows:,}  miss: {miss_s * 1000:.2f} ms  hit: {hit_s * 1000:.2f} ms")
+    print(f"→ stats: {CACHE.stats()}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# check_llm_metrics.py
+"""
+Check Claude token / cost accounting (course/week1/day1/llm_metrics.py):
+
+- exec_bi / exec_bi_stream / aexec_bi results carry "llm_usage" with the
+  pick_template and bi_explain calls, tokens as the server reported them
+- the stream variant fills its usage in once the explanation is read
+- the process registry counts the same tokens and cost per node, and
+  exports JSON and Prometheus text
+- a cached answer is counted as a call with no tokens, a failed one as an
+  error, and a retried call's attempts are all counted
+
+Claude is the local stub server (reports ~4 chars per token);
+customer_features is a throwaway SQLite file. Exits nonzero on any
+failure. No API key needed.
+
+Run:
+  python check_llm_metrics.py
+"""
+from __future__ import annotations
+import asyncio, json, os, sys, tempfile
+from pathlib import Path
+
+# Scratch database; Claude picks every template (so each run makes two calls) - set *before* importing the runner
+_TMP = tempfile.mkdtemp(prefix="llm_metrics_check_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'check.db')}"
+os.environ["BI_SELECTOR"] = "claude"
+os.environ["BI_PIPELINE"] = "0"
+os.environ.setdefault("ANTHROPIC_API_KEY", "check-key")
+
+DAY1 = Path(__file__).resolve().parents[1] / "day1"
+if str(DAY1) not in sys.path:
+    sys.path.insert(0, str(DAY1))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from fake_anthropic_server import FakeAnthropicServer  # noqa: E402
+from course.week1.day1.anthropic_client import ClaudeClient, DEFAULT_MODEL  # noqa: E402
+from course.week1.day1.llm_metrics import REGISTRY, cost_usd, track_usage  # noqa: E402
+from course.week1.day1.resilience import RetryPolicy  # noqa: E402
+from course.week1.day1.response_cache import ResponseCache  # noqa: E402
+from course.week1.day2.bulk_write import bulk_transaction, write_frame  # noqa: E402
+from course.week1.day2.db_engine import get_engine  # noqa: E402
+import bi_templates_runner as runner  # noqa: E402
+
+QUESTION = "What's the average p1 by segment?"
+REPLY = '{"template": "avg_p1_by_segment"}'
+
+
+def _seed(rows: int = 2000, seed: int = 7) -> None:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "user_email": [f"user{i}@example.com" for i in range(rows)],
+        "p1": rng.beta(2.0, 3.0, rows).round(4),
+        "member_rating": rng.integers(1, 6, rows),
+        "purchase_frequency": rng.poisson(4, rows),
+        "recency_days": rng.integers(0, 365, rows),
+        "segment": rng.integers(0, 5, rows),
+    })
+    with bulk_transaction(get_engine(runner.DB_URL)) as conn:
+        write_frame(df, "customer_features", conn)
+
+
+def _counter(name: str, **labels) -> float:
+    series = REGISTRY.to_json()["counters"].get(name, [])
+    return sum(s["value"] for s in series if all(s["labels"].get(k) == v for k, v in labels.items()))
+
+
+def _usage_ok(usage: dict) -> bool:
+    nodes = usage["by_node"]
+    return (set(nodes) == {"pick_template", "bi_explain"}
+            and all(n["calls"] == 1 and n["input_tokens"] > 0 and n["output_tokens"] > 0 for n in nodes.values())
+            and usage["input_tokens"] == sum(n["input_tokens"] for n in nodes.values())
+            and abs(usage["cost_usd"] - cost_usd(DEFAULT_MODEL, usage["input_tokens"], usage["output_tokens"])) < 1e-9)
+
+
+def main():
+    _seed()
+    checks = []
+    with FakeAnthropicServer(reply_text=REPLY) as srv:
+        os.environ["ANTHROPIC_BASE_URL"] = srv.base_url
+        REGISTRY.reset()
+
+        result = runner.exec_bi(QUESTION)
+        usage = result["llm_usage"]
+        checks.append((f"exec_bi llm_usage: {usage['calls']} calls, {usage['input_tokens']} in / "
+                       f"{usage['output_tokens']} out, ${usage['cost_usd']:.6f}", _usage_ok(usage)))
+        checks.append(("registry tokens match the result",
+                       _counter("claude_input_tokens_total") == usage["input_tokens"]
+                       and _counter("claude_output_tokens_total", node="bi_explain")
+                       == usage["by_node"]["bi_explain"]["output_tokens"]))
+
+        result = runner.exec_bi_stream(f"{QUESTION} (stream)")
+        before = result["llm_usage"]["by_node"]["bi_explain"]["output_tokens"]
+        for _chunk in result["explanation_stream"]:
+            pass
+        checks.append(("exec_bi_stream usage is filled in when the stream ends",
+                       before == 0 and _usage_ok(result["llm_usage"])))
+
+        result = asyncio.run(runner.aexec_bi(f"{QUESTION} (async)"))
+        checks.append(("aexec_bi llm_usage", _usage_ok(result["llm_usage"])))
+
+        claude = ClaudeClient(api_key="check-key", base_url=srv.base_url, cache=ResponseCache())
+        with track_usage() as scope:
+            claude.json_call("system", "same question", node="cached_check")
+            claude.json_call("system", "same question", node="cached_check")
+        outcomes = [c["outcome"] for c in scope.summary()["detail"]]
+        checks.append((f"a cached answer is a call without tokens ({outcomes})",
+                       outcomes == ["ok", "cached"] and scope.summary()["detail"][1]["input_tokens"] == 0))
+
+        calls = _counter("claude_calls_total", outcome="ok")
+        checks.append((f"registry counted {calls:.0f} ok calls", calls == 7))
+        prom = REGISTRY.to_prometheus()
+        checks.append(("Prometheus export has counters and the latency histogram",
+                       'claude_input_tokens_total{model="' in prom and 'le="+Inf"}' in prom
+                       and "# TYPE claude_call_latency_seconds histogram" in prom))
+        checks.append(("JSON export round-trips", json.loads(json.dumps(REGISTRY.to_json())) == REGISTRY.to_json()))
+
+    with FakeAnthropicServer(reply_text=REPLY, fail_first=1) as srv:
+        claude = ClaudeClient(api_key="check-key", base_url=srv.base_url,
+                              policy=RetryPolicy(backoff_base_s=0.01, backoff_max_s=0.01))
+        with track_usage() as scope:
+            claude.json_call("system", "retried question", node="retry_check")
+        detail = scope.summary()["detail"][0]
+        checks.append((f"retried call: {detail['attempts']} attempts, tokens of the answer only",
+                       detail["attempts"] == 2 and _counter("claude_attempts_total", node="retry_check") == 2))
+
+    with FakeAnthropicServer(reply_text=REPLY, error_rate=1.0, error_status=400) as srv:
+        claude = ClaudeClient(api_key="check-key", base_url=srv.base_url)
+        try:
+            claude.json_call("system", "bad request", node="error_check")
+        except RuntimeError:
+            pass
+        checks.append(("a failed call is counted as an error",
+                       _counter("claude_calls_total", node="error_check", outcome="error") == 1))
+
+    failures = 0
+    for label, ok in checks:
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {label}")
+    print("→ Prometheus sample:")
+    print("\n".join(line for line in REGISTRY.to_prometheus().splitlines() if "bi_explain" in line and "bucket" not in line))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# check_rollup.py
+"""
+Consistency check: every template's rollup twin must return what the raw
+customer_features query returns, for days=None and random days values.
+
+Seeds a throwaway SQLite file with synthetic customer_features (segments,
+some NULL p1 / NULL segment, recency beyond the bucket cap), builds the
+Day 2 rollup, and compares both answers. Then rebuilds without a segment
+column, adds one afterwards (as KMeans does, bumping the feature version)
+and checks that the now-stale rollup is not used. Exits nonzero on any
+mismatch. No API key needed.
+
+Run:
+  python check_rollup.py --rows 20000 --trials 10
+"""
+from __future__ import annotations
+import argparse, os, random, sys, tempfile
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# Point bi_templates_runner at a scratch database *before* importing it
+_TMP = tempfile.mkdtemp(prefix="rollup_check_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'check.db')}"
+
+from course.week1.day2.bulk_write import bulk_transaction, write_frame  # noqa: E402
+from course.week1.day2.db_engine import get_engine  # noqa: E402
+from course.week1.day2.feature_version import bump_feature_version  # noqa: E402
+from course.week1.day2.rollup import refresh_rollup  # noqa: E402
+from bi_templates_runner import DB_URL, bind_and_run  # noqa: E402
+from safe_params import MAX_DAYS  # noqa: E402
+from sql_templates import TEMPLATES  # noqa: E402
+
+
+def _seed(rows: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    p1 = rng.beta(2.0, 3.0, rows).round(4)
+    p1[rng.random(rows) < 0.02] = np.nan
+    segment = rng.integers(0, 6, rows).astype(float)
+    segment[rng.random(rows) < 0.02] = np.nan
+    df = pd.DataFrame({
+        "user_email": [f"user{i}@example.com" for i in range(rows)],
+        "p1": p1,
+        "member_rating": rng.integers(1, 6, rows),
+        "purchase_frequency": rng.poisson(4, rows),
+        "recency_days": rng.integers(0, MAX_DAYS + 200, rows),
+        "segment": pd.array(segment, dtype="Int64"),
+    })
+    with bulk_transaction(get_engine(DB_URL)) as conn:
+        write_frame(df, "customer_features", conn)
+        bump_feature_version(conn)
+        n = refresh_rollup(conn)
+    print(f"→ customer_features: {rows:,} rows  rollup: {n:,} rows")
+
+
+def _segment_added_after_build(rows: int, seed: int) -> bool:
+    """Rollup built before `segment` existed -> bind_and_run must answer from customer_features."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "user_email": [f"user{i}@example.com" for i in range(rows)],
+        "p1": rng.beta(2.0, 3.0, rows).round(4),
+        "member_rating": rng.integers(1, 6, rows),
+        "purchase_frequency": rng.poisson(4, rows),
+        "recency_days": rng.integers(0, MAX_DAYS, rows),
+    })
+    eng = get_engine(DB_URL)
+    with bulk_transaction(eng) as conn:
+        write_frame(df, "customer_features", conn)
+        bump_feature_version(conn)
+        refresh_rollup(conn)
+    with eng.begin() as conn:
+        conn.execute(text("ALTER TABLE customer_features ADD COLUMN segment INTEGER"))
+        conn.execute(text("UPDATE customer_features SET segment = abs(random()) % 4"))
+        bump_feature_version(conn)
+    stale, payload = bind_and_run("avg_p1_by_segment", {"days": None})
+    with eng.begin() as conn:
+        bump_feature_version(conn)
+        refresh_rollup(conn)
+    fresh, again = bind_and_run("avg_p1_by_segment", {"days": None})
+    ok = payload["source"] == "customer_features" and again["source"] == "rollup" and _same(stale, fresh)
+    print(f"{'✅' if ok else '❌'} segment added after the build: answered from {payload['source']} "
+          f"({len(stale)} segments), from {again['source']} after refresh_rollup")
+    return ok
+
+
+def _same(raw: pd.DataFrame, rolled: pd.DataFrame) -> bool:
+    key = raw.columns[0]
+    raw = raw.sort_values(key).reset_index(drop=True)
+    rolled = rolled.sort_values(key).reset_index(drop=True)
+    try:
+        pd.testing.assert_frame_equal(raw, rolled, check_dtype=False, rtol=1e-9)
+    except AssertionError as e:
+        print(e)
+        return False
+    return True
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare rollup template answers with the raw templates.")
+    ap.add_argument("--rows", type=int, default=20_000)
+    ap.add_argument("--trials", type=int, default=10, help="Random days values per template.")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    _seed(args.rows, args.seed)
+    rnd = random.Random(args.seed)
+    days_values = [None, 1, MAX_DAYS] + [rnd.randint(1, MAX_DAYS) for _ in range(args.trials)]
+
+    failures = 0
+    with get_engine(DB_URL).connect() as c:
+        for name, tpl in TEMPLATES.items():
+            bad = []
+            for days in days_values:
+                raw = pd.read_sql(tpl["sql"], c, params={"days": days})
+                rolled = pd.read_sql(tpl["rollup_sql"], c, params={"days": days})
+                if not _same(raw, rolled):
+                    bad.append(days)
+            failures += len(bad)
+            if bad:
+                print(f"❌ {name}: rollup differs from raw for days={bad}")
+            else:
+                print(f"✅ {name}: matches raw for days={days_values}")
+
+    _, payload = bind_and_run("avg_p1_by_segment", {"days": 30})
+    if payload["source"] != "rollup":
+        failures += 1
+        print(f"❌ bind_and_run answered from {payload['source']}, expected rollup")
+
+    failures += not _segment_added_after_build(args.rows, args.seed)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# check_single_flight.py
+"""
+Check request coalescing: N concurrent identical exec_bi() / exec_bi_stream()
+/ aexec_bi() calls make one Claude request and all get the same answer,
+each in its own copy (rows, timings, trace), with the request's llm_usage
+counted once across them; different questions don't coalesce; a failed run fails every waiter; a
+waiter with a timeout gives up on time while the run finishes for the rest;
+with coalescing off every caller pays its own request.
+
+Claude is a local stub server with a fixed delay so the callers overlap;
+customer_features is a throwaway SQLite file. Exits nonzero on any failure.
+No API key needed.
+
+Run:
+  python check_single_flight.py --callers 8
+"""
+from __future__ import annotations
+import argparse, asyncio, os, sys, tempfile, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Scratch database, local template pick (so each run is one Claude call) - set *before* importing the runner
+_TMP = tempfile.mkdtemp(prefix="single_flight_check_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'check.db')}"
+os.environ["BI_SELECTOR"] = "local"
+
+DAY1 = Path(__file__).resolve().parents[1] / "day1"
+if str(DAY1) not in sys.path:
+    sys.path.insert(0, str(DAY1))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from fake_anthropic_server import FakeAnthropicServer  # noqa: E402
+from course.week1.day1.single_flight import SingleFlight, stats  # noqa: E402
+from course.week1.day2.bulk_write import bulk_transaction, write_frame  # noqa: E402
+from course.week1.day2.db_engine import get_engine  # noqa: E402
+import bi_templates_runner as runner  # noqa: E402
+
+QUESTION = "What's the average p1 by segment?"
+REPLY = "Segment 3 has the highest average p1."
+
+
+def _seed(rows: int = 5000, seed: int = 7) -> None:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "user_email": [f"user{i}@example.com" for i in range(rows)],
+        "p1": rng.beta(2.0, 3.0, rows).round(4),
+        "member_rating": rng.integers(1, 6, rows),
+        "purchase_frequency": rng.poisson(4, rows),
+        "recency_days": rng.integers(0, 365, rows),
+        "segment": rng.integers(0, 5, rows),
+    })
+    with bulk_transaction(get_engine(runner.DB_URL)) as conn:
+        write_frame(df, "customer_features", conn)
+
+
+def _together(n: int, fn, questions=None) -> tuple:
+    """Run fn(question) from n threads released at the same moment; returns (results, wall_s)."""
+    questions = questions or [QUESTION] * n
+    gate = threading.Barrier(n)
+
+    def call(q):
+        gate.wait()
+        return fn(q)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        results = list(pool.map(call, questions))
+    return results, time.perf_counter() - t0
+
+
+def _streamed(q: str) -> dict:
+    result = runner.exec_bi_stream(q)
+    for _chunk in result["explanation_stream"]:
+        pass
+    return result
+
+
+async def _agather(n: int) -> list:
+    return await asyncio.gather(*(runner.aexec_bi(QUESTION) for _ in range(n)))
+
+
+def _own_copies(results: list) -> bool:
+    """Annotating one caller's result doesn't show up in the others'."""
+    mine = results[0]
+    mine["timings"]["annotated"] = True
+    mine["rows"].append({"annotated": True})
+    mine["trace"]["annotated"] = True
+    return not any("annotated" in r["timings"] or "annotated" in r["trace"] or len(r["rows"]) == len(mine["rows"])
+                   for r in results[1:])
+
+
+def _usage_once(label: str, results: list) -> tuple:
+    calls = sum(r["llm_usage"]["calls"] for r in results)
+    joined = all(r["llm_usage"]["shared"]["calls"] == 1 for r in results if r["coalesced"])
+    return f"{label}: llm_usage summed over callers = {calls} call", calls == 1 and joined
+
+
+def _failing_waiters(n: int) -> bool:
+    flight, gate = SingleFlight("check_errors"), threading.Barrier(n)
+
+    def boom():
+        time.sleep(0.2)
+        raise RuntimeError("leader failed")
+
+    def call(_):
+        gate.wait()
+        try:
+            flight.do("k", boom)
+        except RuntimeError:
+            return True
+        return False
+
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        raised = list(pool.map(call, range(n)))
+    return all(raised) and flight.stats()["errors"] == 1
+
+
+def _impatient_waiter() -> bool:
+    """Leader takes 0.5 s; a waiter with timeout=0.1 raises TimeoutError after ~0.1 s (sync and async)."""
+    flight = SingleFlight("check_timeout")
+
+    def slow():
+        time.sleep(0.5)
+        return "done"
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(flight.do, "k", slow)
+        time.sleep(0.05)
+        t0 = time.perf_counter()
+        try:
+            flight.do("k", slow, timeout=0.1)
+            gave_up = False
+        except TimeoutError:
+            gave_up = time.perf_counter() - t0 < 0.3
+        sync_ok = gave_up and leader.result() == ("done", False)
+
+    async def aslow():
+        await asyncio.sleep(0.5)
+        return "done"
+
+    async def both():
+        leader = asyncio.ensure_future(flight.ado("k", aslow))
+        await asyncio.sleep(0.05)
+        try:
+            await flight.ado("k", aslow, timeout=0.1)
+            return False
+        except TimeoutError:
+            return await leader == ("done", False)
+
+    return sync_ok and asyncio.run(both())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check single-flight coalescing of BI questions.")
+    ap.add_argument("--callers", type=int, default=8, help="Concurrent identical callers.")
+    ap.add_argument("--llm-ms", type=float, default=300.0, help="Stub Claude latency per call.")
+    args = ap.parse_args()
+    n = args.callers
+
+    _seed()
+    os.environ.setdefault("ANTHROPIC_API_KEY", "check-key")
+    checks = []
+    with FakeAnthropicServer(reply_text=REPLY, delay_s=args.llm_ms / 1000) as srv:
+        os.environ["ANTHROPIC_BASE_URL"] = srv.base_url
+        runner.exec_bi("warm-up question about p1")  # client pool, template index
+
+        before = srv.requests
+        results, coalesced_s = _together(n, runner.exec_bi)
+        made = srv.requests - before
+        checks.append((f"{n} identical exec_bi calls -> 1 Claude request (got {made})", made == 1))
+        checks.append(("every caller gets the same answer",
+                       all(r["rows"] == results[0]["rows"] and r["explanation"] == REPLY for r in results)))
+        checks.append(("all but one are marked coalesced", sum(r["coalesced"] for r in results) == n - 1))
+        checks.append(_usage_once("exec_bi", results))
+        checks.append(("each exec_bi caller owns its rows, timings and trace", _own_copies(results)))
+
+        before = srv.requests
+        results, _ = _together(n, _streamed)
+        made = srv.requests - before
+        checks.append((f"{n} identical exec_bi_stream calls -> 1 Claude stream (got {made})", made == 1))
+        checks.append(("every stream reader gets the whole summary", all(r["explanation"] == REPLY for r in results)))
+        checks.append(_usage_once("exec_bi_stream", results))
+        checks.append(("each stream reader owns its rows, timings and trace", _own_copies(results)))
+
+        before = srv.requests
+        aresults = asyncio.run(_agather(n))
+        made = srv.requests - before
+        checks.append((f"{n} identical aexec_bi calls -> 1 Claude request (got {made})", made == 1))
+        checks.append(("async callers get the same answer", all(r["explanation"] == REPLY for r in aresults)))
+        checks.append(_usage_once("aexec_bi", aresults))
+
+        before = srv.requests
+        _together(n, runner.exec_bi, [f"{QUESTION} ({i})" for i in range(n)])
+        made = srv.requests - before
+        checks.append((f"{n} different questions are not coalesced (got {made} requests)", made == n))
+
+        checks.append(("a failed run fails every waiter", _failing_waiters(n)))
+        checks.append(("a waiter's timeout stops its wait, not the run", _impatient_waiter()))
+
+        runner.COALESCE = False
+        before = srv.requests
+        _, solo_s = _together(n, runner.exec_bi)
+        made = srv.requests - before
+        runner.COALESCE = True
+        checks.append((f"SINGLE_FLIGHT=0: every caller pays (got {made} requests)", made == n))
+
+    failures = 0
+    for label, ok in checks:
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {label}")
+    print(f"→ {n} callers: coalesced wall {coalesced_s * 1000:.0f} ms vs {solo_s * 1000:.0f} ms uncoalesced")
+    print(f"→ stats: {stats()}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# check_template_indexes.py
+"""
+EXPLAIN check: every approved BI template (and the other hot lookups) must
+be answered from an index once schema.apply_indexes() has run.
+
+Seeds a throwaway SQLite file with synthetic customer_features (including a
+`segment` column) and transactions, applies the Day 2 schema indexes, then
+reads EXPLAIN QUERY PLAN for each query. Exits nonzero if any plan scans a
+table without an index. No API key needed.
+
+Run:
+  python check_template_indexes.py --rows 20000
+"""
+from __future__ import annotations
+import argparse, os, sys, tempfile
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from course.week1.day2.bulk_write import bulk_transaction, write_frame
+from course.week1.day2.db_engine import get_engine
+from course.week1.day2.schema import apply_indexes
+from course.week1.day2.segment_samples import refresh_segment_samples
+from sql_templates import TEMPLATES
+
+# Lookups outside the template registry that run on every request / build
+EXTRA_QUERIES: Dict[str, Dict[str, Any]] = {
+    "sample_segment_rows (day3)": {
+        "sql": text("SELECT p1, member_rating, purchase_frequency, recency_days FROM customer_features_sample "
+                    "WHERE segment = :sid AND sample_rank <= :lim ORDER BY sample_rank"),
+        "params": {"sid": 2, "lim": 50},
+    },
+    "incremental delta scan (day2)": {
+        "sql": text("SELECT user_email, ts FROM transactions WHERE ts >= :hwm"),
+        "params": {"hwm": "2099-01-01 00:00:00.000000"},
+    },
+    "history lookup (day2)": {
+        "sql": text("SELECT user_email, COUNT(product_id), MAX(ts) FROM transactions WHERE user_email = :e "
+                    "GROUP BY user_email"),
+        "params": {"e": "user1@example.com"},
+    },
+}
+
+
+def _seed(url: str, rows: int, seed: int = 7) -> None:
+    rng = np.random.default_rng(seed)
+    feats = pd.DataFrame({
+        "user_email": [f"user{i}@example.com" for i in range(rows)],
+        "p1": rng.beta(2.0, 3.0, rows).round(4),
+        "member_rating": rng.integers(1, 6, rows),
+        "purchase_frequency": rng.poisson(4, rows),
+        "recency_days": rng.integers(0, 365, rows),
+        "segment": rng.integers(0, 5, rows),
+    })
+    n_tx = rows * 5
+    tx = pd.DataFrame({
+        "user_email": feats["user_email"].to_numpy()[rng.integers(0, rows, n_tx)],
+        "product_id": [f"SKU-{i:03d}" for i in rng.integers(1, 51, n_tx)],
+        "ts": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 180 * 86400, n_tx), unit="s"),
+    })
+    with bulk_transaction(get_engine(url)) as conn:
+        write_frame(feats, "customer_features", conn)
+        write_frame(tx, "transactions", conn)
+        apply_indexes(conn)
+        refresh_segment_samples(conn)
+
+
+def _plan(conn, sql, params: Dict[str, Any]) -> List[str]:
+    compiled = sql.compile(dialect=conn.dialect)
+    ordered = tuple(params[name] for name in compiled.positiontup)
+    return [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled.string}", ordered)]
+
+
+def _uses_index(plan: List[str]) -> bool:
+    """Every table access is an index search/scan (temp b-trees for ORDER BY are fine)."""
+    access = [p for p in plan if p.startswith(("SCAN", "SEARCH"))]
+    return bool(access) and all("INDEX" in p for p in access)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Assert every BI template is served by an index (SQLite EXPLAIN).")
+    ap.add_argument("--rows", type=int, default=20_000, help="Synthetic customer_features rows.")
+    args = ap.parse_args()
+
+    cases = [(f"{name} (days={d})", t["sql"], {"days": d}) for name, t in TEMPLATES.items() for d in (None, 30)]
+    cases += [(name, q["sql"], q["params"]) for name, q in EXTRA_QUERIES.items()]
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'check.db')}"
+        _seed(url, args.rows)
+        with get_engine(url).connect() as conn:
+            for label, sql, params in cases:
+                plan = _plan(conn, sql, params)
+                ok = _uses_index(plan)
+                failures += not ok
+                print(f"{'✅' if ok else '❌'} {label}: {' | '.join(plan)}")
+        get_engine(url).dispose()
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
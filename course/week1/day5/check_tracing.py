@@ -0,0 +1,153 @@
+# check_tracing.py
+"""
+Check request tracing (course/week1/day1/tracing.py) on the BI runner:
+
+- exec_bi / aexec_bi results carry a "trace" span tree: param extraction,
+  template selection (with the Claude pick and the speculative SQL under
+  it), SQL execution, DataFrame conversion and the explanation call
+- exec_bi_stream's tree gains the streamed explanation (with a
+  first_token event) in place once the stream has been read
+- a retried Claude call shows its retries as span events
+- every finished trace reaches the in-memory exporter, and its OTLP/JSON
+  spans all point at parents inside the same trace
+- cost of one span
+
+Claude is the local stub server; customer_features is a throwaway SQLite
+file. Exits nonzero on any failure. No API key needed.
+
+Run:
+  python check_tracing.py
+"""
+from __future__ import annotations
+import asyncio, os, sys, tempfile, time
+from pathlib import Path
+
+# Scratch database; Claude picks every template, with speculative SQL - set *before* importing the runner
+_TMP = tempfile.mkdtemp(prefix="tracing_check_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'check.db')}"
+os.environ["BI_SELECTOR"] = "claude"
+os.environ["BI_PIPELINE"] = "1"
+os.environ.setdefault("ANTHROPIC_API_KEY", "check-key")
+
+DAY1 = Path(__file__).resolve().parents[1] / "day1"
+if str(DAY1) not in sys.path:
+    sys.path.insert(0, str(DAY1))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from fake_anthropic_server import FakeAnthropicServer  # noqa: E402
+from course.week1.day1.anthropic_client import ClaudeClient  # noqa: E402
+from course.week1.day1.resilience import RetryPolicy  # noqa: E402
+from course.week1.day1.tracing import EXPORTER, format_trace, span, trace_summary  # noqa: E402
+from course.week1.day2.bulk_write import bulk_transaction, write_frame  # noqa: E402
+from course.week1.day2.db_engine import get_engine  # noqa: E402
+from course.week1.day2.feature_version import bump_feature_version  # noqa: E402
+import bi_templates_runner as runner  # noqa: E402
+
+QUESTION = "What's the average p1 by segment?"
+REPLY = '{"template": "avg_p1_by_segment"}'
+
+
+def _seed(rows: int = 2000, seed: int = 7) -> None:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "user_email": [f"user{i}@example.com" for i in range(rows)],
+        "p1": rng.beta(2.0, 3.0, rows).round(4),
+        "member_rating": rng.integers(1, 6, rows),
+        "purchase_frequency": rng.poisson(4, rows),
+        "recency_days": rng.integers(0, 365, rows),
+        "segment": rng.integers(0, 5, rows),
+    })
+    with bulk_transaction(get_engine(runner.DB_URL)) as conn:
+        write_frame(df, "customer_features", conn)
+        bump_feature_version(conn)
+
+
+def _names(tree: dict) -> list:
+    return [c["name"] for c in tree.get("children", [])]
+
+
+def _find(tree: dict, name: str) -> list:
+    found = [tree] if tree.get("name") == name else []
+    for child in tree.get("children", []):
+        found += _find(child, name)
+    return found
+
+
+def _bi_tree_ok(tree: dict, root: str) -> bool:
+    select = (_find(tree, "bi.select_template") or [{}])[0]
+    return (tree["name"] == root
+            and {"bi.extract_params", "bi.select_template", "llm.bi_explain"} <= set(_names(tree))
+            and "llm.pick_template" in _names(select)
+            and bool(_find(tree, "sql.bind_and_run")) and bool(_find(tree, "bi.to_records"))
+            and all(n["duration_ms"] is not None for n in _find(tree, "sql.bind_and_run")))
+
+
+def main():
+    _seed()
+    checks = []
+    with FakeAnthropicServer(reply_text=REPLY, delay_s=0.02) as srv:
+        os.environ["ANTHROPIC_BASE_URL"] = srv.base_url
+        EXPORTER.clear()
+
+        tree = runner.exec_bi(QUESTION)["trace"]
+        checks.append((f"exec_bi trace: {' > '.join(_names(tree))}", _bi_tree_ok(tree, "bi.exec_bi")))
+        specs = _find(tree, "bi.speculative_sql")
+        checks.append((f"speculative SQL traced under the pick ({len(specs)} runs)",
+                       len(specs) == runner.SPECULATE_K
+                       and all(s in _find(tree, "bi.select_template")[0]["children"] for s in specs)))
+        llm = _find(tree, "llm.bi_explain")[0]["attributes"]
+        checks.append(("LLM spans carry tokens and model",
+                       llm["gen_ai.usage.input_tokens"] > 0 and llm["gen_ai.request.model"]))
+
+        result = runner.exec_bi_stream(f"{QUESTION} (stream)")
+        before = _names(result["trace"])
+        for _chunk in result["explanation_stream"]:
+            pass
+        streamed = (_find(result["trace"], "llm.bi_explain") or [{}])[0]
+        checks.append(("exec_bi_stream trace gains the streamed explanation",
+                       "llm.bi_explain" not in before and streamed.get("duration_ms") is not None
+                       and [e["name"] for e in streamed.get("events", [])] == ["first_token"]
+                       and _bi_tree_ok(result["trace"], "bi.exec_bi_stream")))
+
+        tree = asyncio.run(runner.aexec_bi(f"{QUESTION} (async)"))["trace"]
+        checks.append(("aexec_bi trace", _bi_tree_ok(tree, "bi.exec_bi")))
+        print(format_trace(tree))
+        print(f"→ {trace_summary(tree)}")
+
+    with FakeAnthropicServer(reply_text=REPLY, fail_first=1) as srv:
+        claude = ClaudeClient(api_key="check-key", base_url=srv.base_url,
+                              policy=RetryPolicy(backoff_base_s=0.01, backoff_max_s=0.01))
+        with span("check.retry") as root:
+            claude.json_call("system", "retried question", node="retry_check")
+        events = [e["name"] for e in _find(root.tree(), "llm.retry_check")[0].get("events", [])]
+        checks.append((f"retries are span events ({events})", events == ["retry"]))
+
+    traces = EXPORTER.traces()
+    checks.append((f"exporter holds the finished traces ({len(traces)})", len(traces) == 4))
+    ok = True
+    for trace in traces:
+        spans = trace.to_otlp()["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        ids = {s["spanId"] for s in spans}
+        ok &= all(s["traceId"] == trace.trace_id and (s["parentSpanId"] in ids or not s["parentSpanId"]) for s in spans)
+        ok &= sum(not s["parentSpanId"] for s in spans) == 1
+    checks.append(("OTLP export: one root per trace, every parent inside it", ok))
+
+    n = 20000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        with span("check.overhead"):
+            pass
+    per_span_us = (time.perf_counter() - t0) / n * 1e6
+    checks.append((f"one span costs {per_span_us:.1f} µs", per_span_us < 100))
+
+    failures = 0
+    for label, ok in checks:
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {label}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,45 +2,140 @@
 """
 Tiny evaluation harness:
 - Golden cases (question -> expected template)
-- Measures template selection accuracy and latency
+- Measures template selection accuracy and latency for the Claude selector,
+  the local TF-IDF selector, and the hybrid (local, Claude when unsure)
+- Router goldens: how much traffic the local fast path short-circuits,
+  and the Claude latency it saves
 
 Run:
   python eval_harness.py
 """
 from __future__ import annotations
-import time, json
+import sys, time, json
+from pathlib import Path
 from typing import List, Dict
 
-from bi_templates_runner import pick_template, exec_bi
+from bi_templates_runner import exec_bi, pick_template_llm
+from template_selector import MARGIN, MIN_SCORE, select_local
+
+# router_node imports its sibling router_state by bare name; both Day 4 modules
+# are imported by package name here, as router_node imports intent_rules, so
+# each is loaded once
+DAY4 = Path(__file__).resolve().parents[1] / "day4"
+if str(DAY4) not in sys.path:
+    sys.path.insert(0, str(DAY4))
+from course.week1.day4.intent_rules import preclassify, FASTPATH_CONF
+from course.week1.day4.router_node import llm_route
 
 GOLDENS: List[Dict[str, str]] = [
     {"q": "What's the average p1 by segment for the last 60 days?", "expected": "avg_p1_by_segment"},
     {"q": "How many users per member rating?", "expected": "count_by_member_rating"},
     {"q": "Show top purchase frequency by segment in the last 30 days", "expected": "top_purchase_frequency_by_segment"},
     {"q": "Average p1 by member rating over recent users", "expected": "avg_p1_by_member_rating"},
+    {"q": "Which segment purchases the most frequently?", "expected": "top_purchase_frequency_by_segment"},
+    {"q": "Break down our member ratings by count", "expected": "count_by_member_rating"},
+    {"q": "Is p1 higher for better-rated members?", "expected": "avg_p1_by_member_rating"},
+    {"q": "Rank segments by mean p1 since last quarter", "expected": "avg_p1_by_segment"},
 ]
 
-def main():
-    correct = 0
-    latencies = []
-    results = []
+ROUTER_GOLDENS: List[Dict[str, str]] = [
+    {"q": "What's the average p1 by segment for the last 90 days?", "expected": "BI"},
+    {"q": "How many users per member rating?", "expected": "BI"},
+    {"q": "Write three subject lines for the Segment 2 renewal email", "expected": "Email"},
+    {"q": "Draft a short outreach email to Segment 2 about renewals.", "expected": "Email"},
+    {"q": "What value props should we lead with for high-rating members?", "expected": "Product"},
+    {"q": "Give me a quick summary of Segment 1 behavior.", "expected": "Analyst"},
+    {"q": "Should we email the customers with the highest average p1?", "expected": "Email"},
+    {"q": "Anything interesting going on lately?", "expected": "Analyst"},
+]
+
+def eval_router():
+    """
+    For every router golden, time the local pre-classifier and the Claude router.
+    Short-circuited cases would have skipped Claude, so their saving is
+    (llm latency - local latency).
+    """
+    rows = []
+    for case in ROUTER_GOLDENS:
+        t0 = time.perf_counter()
+        fast = preclassify(case["q"])
+        fast_dt = time.perf_counter() - t0
 
+        t0 = time.perf_counter()
+        llm = llm_route(case["q"])
+        llm_dt = time.perf_counter() - t0
+
+        short = fast.confidence >= FASTPATH_CONF
+        rows.append({
+            "q": case["q"],
+            "expected": case["expected"],
+            "short_circuit": short,
+            "fast": fast.intent, "fast_conf": fast.confidence,
+            "llm": llm["intent"],
+            "routed": fast.intent if short else llm["intent"],
+            "fast_latency_us": round(fast_dt * 1e6, 1),
+            "llm_latency_s": round(llm_dt, 3),
+        })
+
+    n = len(rows)
+    shorts = [r for r in rows if r["short_circuit"]]
+    saved = sum(r["llm_latency_s"] - r["fast_latency_us"] / 1e6 for r in shorts)
+    print(f"\nRouter fast path (threshold {FASTPATH_CONF}):")
+    print(f"  short-circuited: {len(shorts)}/{n} ({len(shorts)/n:.0%})")
+    print(f"  routed accuracy: {sum(r['routed'] == r['expected'] for r in rows)/n:.2%}"
+          f"  (LLM-only: {sum(r['llm'] == r['expected'] for r in rows)/n:.2%})")
+    if shorts:
+        print(f"  fast-path accuracy on short-circuited: {sum(r['fast'] == r['expected'] for r in shorts)/len(shorts):.2%}")
+    print(f"  avg local latency (us): {sum(r['fast_latency_us'] for r in rows)/n:.1f}")
+    print(f"  avg LLM latency (s): {sum(r['llm_latency_s'] for r in rows)/n:.3f}")
+    print(f"  Claude latency saved: {saved:.3f}s total, {saved/n:.3f}s per question")
+    for r in rows:
+        print(json.dumps(r, ensure_ascii=False))
+
+def eval_templates():
+    """
+    Run both selectors on every golden. The hybrid's choice and latency
+    follow from those measurements: local when confident, else Claude
+    (local latency + Claude latency).
+    """
+    rows = []
     for case in GOLDENS:
-        t0 = time.time()
-        chosen = pick_template(case["q"])
-        dt = time.time() - t0
-        latencies.append(dt)
-        ok = int(chosen == case["expected"])
-        correct += ok
-        results.append({"q": case["q"], "expected": case["expected"], "chosen": chosen, "ok": ok, "latency_s": round(dt, 3)})
-
-    acc = correct / len(GOLDENS)
-    print(f"\nTemplate selection accuracy: {acc:.2%}")
-    print("Avg selection latency (s):", round(sum(latencies)/len(latencies), 3))
+        t0 = time.perf_counter()
+        local = select_local(case["q"])
+        local_dt = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        llm = pick_template_llm(case["q"])
+        llm_dt = time.perf_counter() - t0
+
+        rows.append({
+            "q": case["q"],
+            "expected": case["expected"],
+            "claude": llm, "claude_latency_s": round(llm_dt, 3),
+            "local": local.template, "local_score": local.score, "local_margin": local.margin,
+            "local_latency_us": round(local_dt * 1e6, 1),
+            "escalated": not local.confident,
+            "hybrid": llm if not local.confident else local.template,
+            "hybrid_latency_s": round(local_dt + (llm_dt if not local.confident else 0.0), 6),
+        })
+
+    n = len(rows)
+    acc = lambda key: sum(r[key] == r["expected"] for r in rows) / n  # noqa: E731
+    avg = lambda key: sum(r[key] for r in rows) / n  # noqa: E731
+    escalated = sum(r["escalated"] for r in rows)
+    print(f"\nTemplate selection on {n} goldens (local escalates below score {MIN_SCORE} / margin {MARGIN}):")
+    print(f"  claude : accuracy {acc('claude'):.2%}  avg latency {avg('claude_latency_s'):.3f}s")
+    print(f"  local  : accuracy {acc('local'):.2%}  avg latency {avg('local_latency_us') / 1e6:.6f}s")
+    print(f"  hybrid : accuracy {acc('hybrid'):.2%}  avg latency {avg('hybrid_latency_s'):.3f}s"
+          f"  (escalated {escalated}/{n})")
     print("\nPer-case results:")
-    for r in results:
+    for r in rows:
         print(json.dumps(r, ensure_ascii=False))
 
+def main():
+    eval_templates()
+    eval_router()
+
     # Optional: run one full BI execution to ensure E2E works
     print("\n--- E2E Sample ---")
     sample = exec_bi("What's the average p1 by segment for the last 90 days?")
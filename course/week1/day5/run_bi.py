@@ -18,6 +18,7 @@ def main():
     print("\n=== TEMPLATE ===", result["template"])
     print("=== PARAMS ===", result["params"])
     print("=== LATENCY (s) ===", result["latency_s"])
+    print("=== CACHE ===", result["cache"])
     print("\n=== ROWS (JSON) ===")
     print(json.dumps(result["rows"], indent=2, ensure_ascii=False))
     print("\n=== EXEC SUMMARY ===\n", result["explanation"])
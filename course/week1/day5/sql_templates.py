@@ -0,0 +1,151 @@
+# sql_templates.py
+"""
+Approved BI query templates (no free-form SQL).
+All templates MUST:
+  - Use bound parameters
+  - Return compact, aggregatable results
+
+Each template also has a "rollup_sql" twin that answers the same question
+from customer_features_rollup (Day 2 rollup.py): same columns and :days
+semantics, but it reads one cumulative row per group (recency_bucket = days,
+-1 = no filter) instead of scanning customers. Valid for days=None or
+0 <= days <= RECENCY_BUCKET_CAP. check_rollup.py keeps the two in agreement.
+"""
+
+from __future__ import annotations
+from typing import Dict, Any
+from sqlalchemy.sql import text
+
+# Template registry
+# name -> (description, example questions, sqlalchemy.text template, rollup twin, required_params)
+# "examples" feed the local template selector (template_selector.py); keep them
+# distinct from eval_harness GOLDENS so the eval stays honest.
+TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "avg_p1_by_segment": {
+        "description": "Average p1 by segment (optionally filter by recency_days <= days)",
+        "examples": [
+            "avg p1 per segment",
+            "mean purchase probability for each segment",
+            "which segment has the highest p1",
+            "compare segments on average p1 over the past month",
+        ],
+        "sql": text("""
+            SELECT
+                COALESCE(segment, -1) AS segment,
+                AVG(p1) AS avg_p1,
+                COUNT(*) AS n
+            FROM customer_features
+            WHERE (:days IS NULL OR recency_days <= :days)
+            GROUP BY segment
+            ORDER BY avg_p1 DESC
+        """),
+        "rollup_sql": text("""
+            SELECT
+                segment,
+                SUM(sum_p1) / NULLIF(SUM(n_p1), 0) AS avg_p1,
+                SUM(n) AS n
+            FROM customer_features_rollup
+            WHERE recency_bucket = COALESCE(:days, -1)
+            GROUP BY segment
+            HAVING SUM(n) > 0
+            ORDER BY avg_p1 DESC
+        """),
+        "params": ["days"],  # nullable
+    },
+    "count_by_member_rating": {
+        "description": "Row counts grouped by member_rating (optionally filter by days)",
+        "examples": [
+            "how many members in each rating",
+            "number of users by rating",
+            "count of members per rating bucket",
+            "member rating distribution",
+        ],
+        "sql": text("""
+            SELECT
+                member_rating,
+                COUNT(*) AS n
+            FROM customer_features
+            WHERE (:days IS NULL OR recency_days <= :days)
+            GROUP BY member_rating
+            ORDER BY member_rating DESC
+        """),
+        "rollup_sql": text("""
+            SELECT
+                member_rating,
+                SUM(n) AS n
+            FROM customer_features_rollup
+            WHERE recency_bucket = COALESCE(:days, -1)
+            GROUP BY member_rating
+            HAVING SUM(n) > 0
+            ORDER BY member_rating DESC
+        """),
+        "params": ["days"],  # nullable
+    },
+    "top_purchase_frequency_by_segment": {
+        "description": "Top purchase_frequency by segment (optionally filter by days)",
+        "examples": [
+            "max purchase frequency in each segment",
+            "which segment buys most often",
+            "highest purchase frequency by segment",
+            "top buyers' order frequency per segment",
+        ],
+        "sql": text("""
+            SELECT
+                COALESCE(segment, -1) AS segment,
+                MAX(purchase_frequency) AS max_purchase_frequency,
+                AVG(purchase_frequency) AS avg_purchase_frequency,
+                COUNT(*) AS n
+            FROM customer_features
+            WHERE (:days IS NULL OR recency_days <= :days)
+            GROUP BY segment
+            ORDER BY max_purchase_frequency DESC
+        """),
+        "rollup_sql": text("""
+            SELECT
+                segment,
+                MAX(max_purchase_frequency) AS max_purchase_frequency,
+                1.0 * SUM(sum_purchase_frequency) / NULLIF(SUM(n_purchase_frequency), 0) AS avg_purchase_frequency,
+                SUM(n) AS n
+            FROM customer_features_rollup
+            WHERE recency_bucket = COALESCE(:days, -1)
+            GROUP BY segment
+            HAVING SUM(n) > 0
+            ORDER BY max_purchase_frequency DESC
+        """),
+        "params": ["days"],  # nullable
+    },
+    "avg_p1_by_member_rating": {
+        "description": "Average p1 grouped by member_rating (optionally filter by days)",
+        "examples": [
+            "avg p1 per member rating",
+            "mean purchase probability for each rating",
+            "does p1 go up with member rating",
+            "compare ratings on average p1",
+        ],
+        "sql": text("""
+            SELECT
+                member_rating,
+                AVG(p1) AS avg_p1,
+                COUNT(*) AS n
+            FROM customer_features
+            WHERE (:days IS NULL OR recency_days <= :days)
+            GROUP BY member_rating
+            ORDER BY member_rating DESC
+        """),
+        "rollup_sql": text("""
+            SELECT
+                member_rating,
+                SUM(sum_p1) / NULLIF(SUM(n_p1), 0) AS avg_p1,
+                SUM(n) AS n
+            FROM customer_features_rollup
+            WHERE recency_bucket = COALESCE(:days, -1)
+            GROUP BY member_rating
+            HAVING SUM(n) > 0
+            ORDER BY member_rating DESC
+        """),
+        "params": ["days"],  # nullable
+    },
+}
+
+def list_templates() -> Dict[str, str]:
+    return {k: v["description"] for k, v in TEMPLATES.items()}
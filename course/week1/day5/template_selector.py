@@ -0,0 +1,126 @@
+# template_selector.py
+"""
+Local (offline) template selector for the BI runner.
+
+pick_template() used to spend a Claude round-trip choosing among four
+template names. This module scores the question against each template's
+description + example questions (sql_templates.TEMPLATES) with character
+n-gram TF-IDF and cosine similarity, in well under a millisecond and with
+no extra dependencies. The index is built once per process.
+
+A template's score is the question's similarity to the centroid of its
+documents; the margin is the gap between the top two templates. bi_templates_runner only escalates to
+Claude when the local pick is unsure:
+
+  score < BI_SELECTOR_MIN_SCORE  or  margin < BI_SELECTOR_MARGIN
+
+Try it:
+  python template_selector.py "How many users per member rating?"
+"""
+from __future__ import annotations
+import argparse, math, os, re
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from sql_templates import TEMPLATES
+
+MIN_SCORE = float(os.getenv("BI_SELECTOR_MIN_SCORE", "0.4"))
+MARGIN = float(os.getenv("BI_SELECTOR_MARGIN", "0.1"))
+NGRAM_RANGE = (2, 4)
+
+_WORD = re.compile(r"[a-z][a-z0-9_]*")  # numbers (day windows) carry no template signal
+# Filler that every question shares; dropping it keeps short questions from
+# matching on "what is the ... for the last ... days"
+STOPWORDS = frozenset("""
+    a an and are by can day days do does each for from give in is last me of on our over past
+    per please show tell the to we what whats with
+""".split())
+
+
+@dataclass
+class Selection:
+    template: str
+    score: float
+    margin: float
+    source: str  # "local" | "claude"
+
+    @property
+    def confident(self) -> bool:
+        return self.score >= MIN_SCORE and self.margin >= MARGIN
+
+
+def _ngrams(text: str) -> Counter:
+    """Character n-grams inside word boundaries (like sklearn's analyzer="char_wb")."""
+    grams: Counter = Counter()
+    lo, hi = NGRAM_RANGE
+    for word in _WORD.findall(text.lower().replace("'", "")):
+        if word in STOPWORDS:
+            continue
+        padded = f" {word} "
+        for n in range(lo, hi + 1):
+            for i in range(len(padded) - n + 1):
+                grams[padded[i:i + n]] += 1
+    return grams
+
+
+class TemplateIndex:
+    """
+    TF-IDF (sublinear tf, smoothed idf, L2-normalised) over (template, text)
+    documents. Each template is the normalised centroid of its documents, so
+    one odd example can't outvote the rest.
+    """
+
+    def __init__(self, docs: List[Tuple[str, str]]):
+        counts = [(name, _ngrams(text)) for name, text in docs]
+        df: Counter = Counter()
+        for _, grams in counts:
+            df.update(grams.keys())
+        n = len(counts)
+        self.idf = {g: math.log((1 + n) / (1 + c)) + 1.0 for g, c in df.items()}
+
+        sums: Dict[str, Dict[str, float]] = {}
+        for name, grams in counts:
+            acc = sums.setdefault(name, {})
+            for g, w in self._vector(grams).items():
+                acc[g] = acc.get(g, 0.0) + w
+        self.centroids = {name: _normalise(vec) for name, vec in sums.items()}
+
+    def _vector(self, grams: Counter) -> Dict[str, float]:
+        return _normalise({g: (1.0 + math.log(c)) * self.idf[g] for g, c in grams.items() if g in self.idf})
+
+    def scores(self, question: str) -> Dict[str, float]:
+        """Cosine similarity of the question to each template."""
+        q = self._vector(_ngrams(question))
+        return {name: sum(w * vec.get(g, 0.0) for g, w in q.items()) for name, vec in self.centroids.items()}
+
+
+def _normalise(vec: Dict[str, float]) -> Dict[str, float]:
+    norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+    return {g: v / norm for g, v in vec.items()}
+
+
+@lru_cache(maxsize=1)
+def get_index() -> TemplateIndex:
+    docs = []
+    for name, tpl in TEMPLATES.items():
+        docs.append((name, tpl["description"]))
+        docs.extend((name, q) for q in tpl.get("examples", []))
+    return TemplateIndex(docs)
+
+
+def select_local(question: str) -> Selection:
+    ranked = sorted(get_index().scores(question or "").items(), key=lambda kv: kv[1], reverse=True)
+    (name, best), second = ranked[0], (ranked[1][1] if len(ranked) > 1 else 0.0)
+    return Selection(name, round(best, 3), round(best - second, 3), "local")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Score a question against the BI templates (no Claude).")
+    ap.add_argument("question", type=str)
+    args = ap.parse_args()
+    for name, score in sorted(get_index().scores(args.question).items(), key=lambda kv: kv[1], reverse=True):
+        print(f"{score:.3f}  {name}")
+    sel = select_local(args.question)
+    print(f"→ {sel.template} (score {sel.score}, margin {sel.margin}, {'local' if sel.confident else 'escalate to Claude'})")
@@ -3,7 +3,11 @@
 Day 6 — Executive Dashboard with Streamlit
 - Tabs for Router, BI, Product, Email, Analyst
 - Calls Day 4 router (build_router_app)
-- Calls Day 5 BI Expert (exec_bi)
+- Calls Day 5 BI Expert (exec_bi_stream: rows first, summary streamed)
+- Product / Analyst tabs stream their co-bot's answer; captions show
+  time-to-first-token (TTFT)
+- Router / BI captions summarise the request's trace (slowest spans);
+  the full span tree is in the "Trace" expander
 """
 
 import os
@@ -21,8 +25,14 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import router + BI runner
-from course.week1.day4.build_router import build_router_app
-from course.week1.day5.bi_templates_runner import exec_bi
+from course.week1.day1.tracing import format_trace, trace_summary
+from course.week1.day4.build_router import invoke_router, warmup
+from course.week1.day4.analyst_node import analyst_node_stream
+from course.week1.day4.product_node import product_node_stream
+from course.week1.day5.bi_templates_runner import exec_bi_stream
+
+# Compile the router graph once per process (Streamlit reruns reuse it)
+warmup()
 
 # Streamlit config
 st.set_page_config(
@@ -46,9 +56,7 @@ with tabs[0]:
     st.header("🔀 Router Q&A")
     q = st.text_input("Ask me anything (router will decide intent):")
     if q:
-        app = build_router_app()
-        state = {"question": q, "intent": "", "confidence": 0.0, "answer": ""}
-        result = app.invoke(state)
+        result = invoke_router(q)  # identical questions in flight share one run
 
         st.subheader(f"Intent: {result.get('intent')} (conf: {result.get('confidence')})")
 
@@ -64,34 +72,43 @@ with tabs[0]:
                 st.json(answer)
             else:
                 st.write(answer)
+        st.caption(trace_summary(result.get("trace", {})))
+        with st.expander("Trace"):
+            st.code(format_trace(result.get("trace", {})), language=None)
 
 # BI tab
 with tabs[1]:
     st.header("📊 BI Expert")
     q_bi = st.text_input("Ask a BI-specific question:")
     if q_bi:
-        result = exec_bi(q_bi)
+        result = exec_bi_stream(q_bi)
         df = pd.DataFrame(result.get("rows", []))
         if not df.empty:
             st.dataframe(df, use_container_width=True)
-        st.markdown(f"**Summary:** {result.get('explanation','')}")
+        st.markdown("**Summary:**")
+        st.write_stream(result["explanation_stream"])
+        t = result["timings"]
+        st.caption(f"Rows: {t['result_s']}s • First summary text: {t['ttft_s']}s • Total: {t['total_s']}s"
+                   + (" • shared with an identical in-flight question" if result["coalesced"] else ""))
+        st.caption(trace_summary(result["trace"]))
+        with st.expander("Trace"):
+            st.code(format_trace(result["trace"]), language=None)
 
 # Product tab
 with tabs[2]:
     st.header("📦 Product Expert")
     q_prod = st.text_input("Ask about product positioning:")
     if q_prod:
-        app = build_router_app()
-        result = app.invoke({"question": q_prod, "intent": "", "confidence": 0.0, "answer": ""})
-        st.write(result.get("answer", ""))
+        stream = product_node_stream({"question": q_prod})
+        st.write_stream(stream)
+        st.caption(f"Time to first token: {stream.ttft_s:.2f}s • Total: {stream.stream_s:.2f}s")
 
 # Email tab
 with tabs[3]:
     st.header("✉️ Email Writer")
     q_email = st.text_input("Ask for an outreach email:")
     if q_email:
-        app = build_router_app()
-        result = app.invoke({"question": q_email, "intent": "", "confidence": 0.0, "answer": ""})
+        result = invoke_router(q_email)
         st.write(result.get("answer", ""))
 
 # Analyst tab
@@ -99,6 +116,6 @@ with tabs[4]:
     st.header("🧑‍💼 Analyst")
     q_analyst = st.text_input("Ask for an executive summary:")
     if q_analyst:
-        app = build_router_app()
-        result = app.invoke({"question": q_analyst, "intent": "", "confidence": 0.0, "answer": ""})
-        st.write(result.get("answer", ""))
+        stream = analyst_node_stream({"question": q_analyst})
+        st.write_stream(stream)
+        st.caption(f"Time to first token: {stream.ttft_s:.2f}s • Total: {stream.stream_s:.2f}s")
@@ -5,6 +5,9 @@ Thin wrapper that calls Day 5's exec_bi(question) and returns:
 - fig (plotly figure suited for the chosen template)
 - explanation (Claude's exec summary)
 
+run_bi_with_chart_stream() returns as soon as the rows are in, with the
+summary as a stream, so the table and chart can render first.
+
 If the template is unknown, we fall back to a generic bar chart.
 """
 
@@ -14,7 +17,7 @@ import pandas as pd
 import plotly.express as px
 
 # Import the BI runner from Day 5
-from course.week1.day5.bi_templates_runner import exec_bi
+from course.week1.day5.bi_templates_runner import exec_bi, exec_bi_stream
 from .chart_utils import bar_from_rows
 
 
@@ -53,3 +56,26 @@ def run_bi_with_chart(question: str) -> Tuple[pd.DataFrame, "plotly.graph_objs.F
         "params": result.get("params"),
         "latency_s": result.get("latency_s"),
     }
+
+
+def run_bi_with_chart_stream(question: str) -> Tuple[pd.DataFrame, "plotly.graph_objs.Figure", "TextStream", dict]:
+    """
+    Like run_bi_with_chart, but the explanation is a TextStream to iterate
+    (e.g. st.write_stream). meta["timings"] is exec_bi's timings dict; its
+    ttft_s / total_s are filled in once the stream has been consumed.
+    meta["coalesced"] is True when an identical question was already running.
+    meta["trace"] is the run's span tree (course/week1/day1/tracing.py),
+    completed in place with the summary's span once the stream ends.
+    """
+    result = exec_bi_stream(question)
+    rows = result.get("rows", [])
+    df = pd.DataFrame(rows)
+    fig = _figure_for_template(result.get("template"), rows)
+    return df, fig, result["explanation_stream"], {
+        "template": result.get("template"),
+        "params": result.get("params"),
+        "latency_s": result.get("latency_s"),
+        "timings": result["timings"],
+        "coalesced": result.get("coalesced", False),
+        "trace": result.get("trace", {}),
+    }
@@ -1,7 +1,9 @@
 # dashboard_charts.py
 """
 Day 7 — Streamlit dashboard with charts:
-- BI tab renders table + Plotly figure + summary
+- BI tab renders table + Plotly figure, then streams the summary
+  (caption shows time-to-first-token and where the time went, from the
+  request's trace)
 - Router tab still supported via Day 4 (optional)
 """
 
@@ -18,13 +20,15 @@ if str(ROOT) not in sys.path:
 from dotenv import load_dotenv
 load_dotenv()
 
-# Reuse Day 4 router (optional tab)
-from course.week1.day4.build_router import build_router_app
+# Reuse Day 4 router (optional tab); compiled once per process
+from course.week1.day1.tracing import format_trace, trace_summary
+from course.week1.day4.build_router import invoke_router, warmup
 
 # Day 7 BI chart flow
-from .bi_charts import run_bi_with_chart
+from .bi_charts import run_bi_with_chart_stream
 
 st.set_page_config(page_title="AI Marketing Agents — Charts", layout="wide")
+warmup()
 
 # Optional: reuse Day 6 CSS if you like
 css_path = Path(__file__).parent / "style.css"
@@ -39,7 +43,7 @@ with tabs[0]:
     q = st.text_input("Ask a BI question (e.g., 'What's the average p1 by segment for the last 90 days?')",
                       "What's the average p1 by segment?")
     if q:
-        df, fig, summary, meta = run_bi_with_chart(q)
+        df, fig, summary_stream, meta = run_bi_with_chart_stream(q)
         col1, col2 = st.columns([1, 1])
         with col1:
             st.subheader("Results Table")
@@ -52,13 +56,18 @@ with tabs[0]:
             st.plotly_chart(fig, use_container_width=True)
 
         st.markdown("**Executive Summary**")
-        st.write(summary)
-        st.caption(f"Template: {meta['template']} • Params: {meta['params']} • Latency: {meta['latency_s']}s")
+        st.write_stream(summary_stream)
+        t = meta["timings"]
+        st.caption(f"Template: {meta['template']} • Params: {meta['params']} • Latency: {meta['latency_s']}s"
+                   f" • First summary text: {t['ttft_s']}s • Total: {t['total_s']}s"
+                   + (" • shared with an identical in-flight question" if meta["coalesced"] else ""))
+        st.caption(trace_summary(meta["trace"]))
+        with st.expander("Trace"):
+            st.code(format_trace(meta["trace"]), language=None)
 
 with tabs[1]:
     st.header("🔀 Router (Optional)")
     q = st.text_input("Free-form question (router decides intent):", "Draft a renewal email for Segment 2.")
     if q:
-        app = build_router_app()
-        result = app.invoke({"question": q, "intent": "", "confidence": 0.0, "answer": ""})
+        result = invoke_router(q)
         st.json(result)